@@ -0,0 +1,145 @@
+"""
+Startup time of the image editor and the tank game.
+
+For each app this measures, over several launches:
+- time to first frame: from starting the process to the first window contents being drawn,
+- time to ready: until the background imports (editor) or image decoding (game) are done,
+and prints a `python -X importtime` breakdown of what the entry module imports,
+slowest first. For the editor it also breaks down the image modules that are now
+imported in the background.
+
+The apps report the two moments when IMAGE_EDITOR_STARTUP_PROBE or
+GAME_STARTUP_PROBE is set, and quit right after being ready. The editor needs a
+display; the game uses SDL's dummy video driver when there is none.
+
+Example:
+    python benchStartup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# name: (directory, script, probe variable, entry module, modules imported in the background)
+APPS = {
+    "imageEditor": ("imageEditor", "imageEditor.py", "IMAGE_EDITOR_STARTUP_PROBE", "imageEditor",
+                    ["imageCore", "editGraph", "imageCache", "viewport", "canvasImage", "filters", "autoCrop",
+                     "regionStats"]),
+    "game": ("game", "main.py", "GAME_STARTUP_PROBE", "main", []),
+}
+TIMEOUT = 60
+
+
+def app_env(name, probe=None):
+    """
+    Environment for launching an app, with the probe variable set if given.
+    """
+    env = dict(os.environ)
+    if probe:
+        env[probe] = "1"
+    if name == "game" and not env.get("DISPLAY"):
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+        env.setdefault("SDL_AUDIODRIVER", "dummy")
+    return env
+
+
+def launch(name):
+    """
+    Start an app once and time its startup.
+    Returns:
+        dict: "first_frame" and "ready" in ms since the process was started.
+    """
+    directory, script, probe, _, _ = APPS[name]
+    times = {}
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script], cwd=os.path.join(ROOT, directory), env=app_env(name, probe),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        for line in process.stdout:
+            line = line.strip()
+            if line in ("first frame", "ready"):
+                times[line.replace(" ", "_")] = (time.perf_counter() - start) * 1000
+            if line == "ready":
+                break
+        process.wait(TIMEOUT)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    if "ready" not in times:
+        error = process.stderr.read().strip().splitlines()
+        raise RuntimeError(f"{name} did not report startup: {error[-1] if error else 'no output'}")
+    return times
+
+
+def import_times(name, modules):
+    """
+    Import modules in a fresh interpreter with -X importtime.
+    Args:
+        name (str): The app whose directory to import from.
+        modules (list): Module names, imported in order.
+    Returns:
+        list: (module, cumulative ms, direct imports as (module, cumulative ms) pairs), one per module.
+    """
+    directory = os.path.join(ROOT, APPS[name][0])
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                            cwd=directory, env=app_env(name), capture_output=True, text=True, timeout=TIMEOUT)
+    top, children = [], []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line.split("|")
+        depth = (len(package) - len(package.lstrip()) - 1) // 2
+        entry = (package.strip(), int(cumulative) / 1000)
+        if depth == 1:
+            children.append(entry)
+        elif depth == 0:
+            # A module's direct imports are printed before it
+            top.append((entry[0], entry[1], children))
+            children = []
+    return [entry for entry in top if entry[0] in modules]
+
+
+def print_imports(title, entries, limit):
+    """
+    Print each module's import time and its slowest direct imports.
+    """
+    print(title)
+    for module, total, children in entries:
+        print(f"  {module:<32}{total:>9.1f} ms")
+        for child, ms in sorted(children, key=lambda c: -c[1])[:limit]:
+            print(f"    {child:<30}{ms:>9.1f} ms")
+
+
+def main():
+    """
+    Time the apps' startup and print the import breakdowns.
+    """
+    parser = argparse.ArgumentParser(description="Time to first frame and import times of both apps.")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--runs", type=int, default=5, help="launches per app; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="direct imports to list per module")
+    args = parser.parse_args()
+
+    print(f"{'app':<14}{'first frame':>14}{'ready':>12}")
+    for name in args.apps:
+        if name == "imageEditor" and sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+            print(f"{name:<14}{'skipped, needs a display':>26}")
+            continue
+        runs = [launch(name) for _ in range(args.runs)]
+        first = statistics.median(r["first_frame"] for r in runs)
+        ready = statistics.median(r["ready"] for r in runs)
+        print(f"{name:<14}{first:>11.0f} ms{ready:>9.0f} ms")
+
+    for name in args.apps:
+        _, _, _, module, deferred = APPS[name]
+        print()
+        print_imports(f"{name}: import {module}", import_times(name, [module]), args.top)
+        if deferred:
+            print_imports(f"{name}: imported in the background", import_times(name, deferred), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Scrolling battlefield background for the tank game.
+
+Each layer of the background is a strip of tiles composited once, converted to
+the screen's pixel format, and long enough to loop: the last tile joins the
+first seamlessly. Scrolling only moves an offset into the strip, and draw()
+fills the screen with at most two sub-blits of it, the part below the offset
+and the part that wrapped around to the top. The tiles are all built up front,
+so the world scrolls forever with a fixed amount of memory and no per-frame
+allocations.
+
+Layers scroll at different speeds for parallax: the ground moves with the
+landmines lying on it, and an optional layer of cloud shadows moves faster.
+"""
+import numpy as np
+import pygame
+
+import sprites
+from ecs import ARCHETYPES, MINE, SCREEN_H, SCREEN_W
+
+GROUND_SPEED = ARCHETYPES[MINE]["vy"]  # Mines lie on the ground, so they scroll with it
+SHADOW_SPEED = 3.5
+SHADOW_ALPHA = 60
+SHADOW_KEY = (255, 0, 255)
+
+
+def ground_tiles(name, width=SCREEN_W):
+    """
+    Build the tiles of a seamless ground loop from one image: the image scaled to the
+    screen width and its vertical mirror, whose top row is the image's bottom row.
+    Args:
+        name (str): File name in assets/images.
+        width (int, optional): Width of the tiles. Defaults to SCREEN_W.
+    Returns:
+        list: The tiles, top to bottom.
+    """
+    image = sprites.load(name)
+    height = round(image.get_height() * width / image.get_width())
+    tile = pygame.transform.smoothscale(image, (width, height))
+    return [tile, pygame.transform.flip(tile, False, True)]
+
+
+def shadow_tiles(size=(SCREEN_W, 2 * SCREEN_H), clouds=10, seed=None):
+    """
+    Generate a tile of cloud shadows on a transparent colour key. Clouds that
+    cross the bottom edge continue at the top, so the tile loops on its own.
+    Args:
+        size (tuple, optional): (width, height) of the tile. Defaults to two screens tall.
+        clouds (int, optional): Number of clouds. Defaults to 10.
+        seed (int, optional): Seed for the cloud shapes.
+    Returns:
+        list: The tile.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    tile = pygame.Surface(size)
+    tile.fill(SHADOW_KEY)
+    for _ in range(clouds):
+        # A cloud is a cluster of overlapping ellipses
+        cx, cy = rng.integers(0, w), rng.integers(0, h)
+        for _ in range(int(rng.integers(3, 7))):
+            ew, eh = int(rng.integers(60, 180)), int(rng.integers(40, 110))
+            x, y = int(cx + rng.integers(-80, 81)), int(cy + rng.integers(-40, 41))
+            for dy in (-h, 0, h):
+                pygame.draw.ellipse(tile, (0, 0, 0), (x - ew // 2, y + dy - eh // 2, ew, eh))
+    return [tile]
+
+
+class Layer:
+    """
+    One looping strip of tiles and its scroll position.
+    """
+    def __init__(self, tiles, speed, colorkey=None, alpha=None):
+        """
+        Args:
+            tiles (list): Surfaces of the same width, top to bottom. Together they must be
+                at least as tall as the screen.
+            speed (float): Scroll speed in pixels per frame, downward.
+            colorkey (tuple, optional): Colour drawn as transparent.
+            alpha (int, optional): Opacity of the whole layer, 0-255.
+        """
+        width = tiles[0].get_width()
+        height = sum(tile.get_height() for tile in tiles)
+        self.strip = pygame.Surface((width, height))
+        y = 0
+        for tile in tiles:
+            self.strip.blit(tile, (0, y))
+            y += tile.get_height()
+        if pygame.display.get_surface() is not None:
+            self.strip = self.strip.convert()
+        if colorkey is not None:
+            # Run-length encoding lets blits skip the transparent runs
+            self.strip.set_colorkey(colorkey, pygame.RLEACCEL)
+        if alpha is not None:
+            self.strip.set_alpha(alpha, pygame.RLEACCEL)
+        self.speed = speed
+        self.offset = 0.0
+
+    def step(self):
+        """
+        Scroll by one frame.
+        """
+        self.offset = (self.offset + self.speed) % self.strip.get_height()
+
+    def draw(self, screen):
+        """
+        Fill the screen with the visible part of the strip.
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+        """
+        width, height = self.strip.get_size()
+        screen_h = screen.get_height()
+        # Scrolling down: screen row y shows strip row (y - offset), wrapped
+        top = -int(self.offset) % height
+        first = min(screen_h, height - top)
+        screen.blit(self.strip, (0, 0), (0, top, width, first))
+        if first < screen_h:
+            screen.blit(self.strip, (0, first), (0, 0, width, screen_h - first))
+
+
+class Background:
+    """
+    Layers drawn back to front, each scrolling at its own speed.
+    """
+    def __init__(self, layers):
+        """
+        Args:
+            layers (list): Layer instances, back to front.
+        """
+        self.layers = layers
+
+    def step(self):
+        """
+        Scroll every layer by one frame.
+        """
+        for layer in self.layers:
+            layer.step()
+
+    def draw(self, screen):
+        """
+        Draw every layer.
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+        """
+        for layer in self.layers:
+            layer.draw(screen)
+
+
+def battlefield(name, parallax=True, seed=None):
+    """
+    Build the scrolling background of a round.
+    Args:
+        name (str): File name of the ground image in assets/images.
+        parallax (bool, optional): Add a faster layer of cloud shadows over the ground. Defaults to True.
+        seed (int, optional): Seed for the cloud shapes.
+    Returns:
+        Background: The background.
+    """
+    layers = [Layer(ground_tiles(name), GROUND_SPEED)]
+    if parallax:
+        layers.append(Layer(shadow_tiles(seed=seed), SHADOW_SPEED, SHADOW_KEY, SHADOW_ALPHA))
+    return Background(layers)
@@ -0,0 +1,274 @@
+"""
+One round of the tank game, from the first enemy wave to the boss fight.
+
+A Battle owns an ecs.World and an effects.Effects list and advances them one
+frame per step() call. It has no event loop and no clock of its own, so main.py
+drives it at 60 FPS and scripts can drive it headless as fast as it runs.
+"""
+import numpy as np
+import pygame
+
+import sprites
+from background import battlefield
+from ecs import (BOSS, BOSS_BULLET, ENEMY, ENEMY_BULLET, MINE, PLAYER, PLAYER_BULLET, World, bounce, cull, fire,
+                 move, overlaps)
+from effects import Effects
+
+BOSS_AFTER = 40  # Enemies to remove before the boss appears
+ENEMY_WAVE = 5  # Enemies kept on screen until then
+MINE_COUNT = 5
+KILL_SCORE, PASS_SCORE, BOSS_SCORE = 10, 1, 1000
+# Every image a round uses besides the player's tank, for sprites.preload()
+IMAGES = ["top-view-city-with-desert_70347-2005.jpg", "enemyTank.png", "jet-plane.png", "mine.png", "playerBullet.png",
+          "atomic-bomb.png", "bigExplosion.png", "smallExplosion.png"]
+# Explosion left behind by each kind: (image, size, frames, y offset)
+EXPLOSIONS = {ENEMY: ("bigExplosion.png", (64, 64), 60, 0), BOSS: ("bigExplosion.png", (64, 64), 30, 0),
+              MINE: ("bigExplosion.png", None, 15, 20)}
+HIT_FRAMES = 30  # Frames the small explosion follows a tank after a hit
+SPARKS = 12  # Particles thrown out by each explosion
+# Draw order, back to front
+LAYERS = {MINE: 0, PLAYER: 1, ENEMY: 2, BOSS: 2, ENEMY_BULLET: 3, BOSS_BULLET: 3, PLAYER_BULLET: 4}
+
+
+class Battle:
+    """
+    The state of one round: the world, the player's input and the score.
+    """
+    def __init__(self, player_image, hp=100, power=20, speed_factor=3, seed=None, parallax=True):
+        """
+        Args:
+            player_image (str): File name of the player's tank in assets/images.
+            hp (int, optional): Player health points. Defaults to 100.
+            power (int, optional): Damage of the player's bullets. Defaults to 20.
+            speed_factor (int, optional): Player speed in pixels per frame. Defaults to 3.
+            seed (int, optional): Seed for spawn positions and enemy fire, for repeatable rounds.
+            parallax (bool, optional): Scroll cloud shadows over the ground. Defaults to True.
+        """
+        self.world = World(seed=seed)
+        self.world.sprites = {
+            PLAYER: sprites.sprite_id(player_image),
+            ENEMY: sprites.sprite_id("enemyTank.png", angle=180),
+            BOSS: sprites.sprite_id("jet-plane.png", angle=180),
+            MINE: sprites.sprite_id("mine.png", (32, 32)),
+            PLAYER_BULLET: sprites.sprite_id("playerBullet.png"),
+            ENEMY_BULLET: sprites.sprite_id("playerBullet.png", angle=180),
+            BOSS_BULLET: sprites.sprite_id("atomic-bomb.png", angle=180),
+        }
+        self.effects = Effects(seed=seed)
+        # Explosion sprite, frames and y offset indexed by entity kind
+        self.explosions = np.zeros((3, max(LAYERS) + 1), np.int16)
+        for kind, (name, size, frames, dy) in EXPLOSIONS.items():
+            self.explosions[:, kind] = sprites.sprite_id(name, size), frames, dy
+        self.hit_sprite = sprites.sprite_id("smallExplosion.png", (32, 32))
+        self.spark_sprite = sprites.solid((3, 3), (255, 200, 60))
+        self.background = battlefield("top-view-city-with-desert_70347-2005.jpg", parallax, seed)
+        self.player = int(self.world.spawn(PLAYER, 380, 500, hp=hp)[0])
+        self.power = power
+        self.speed_factor = speed_factor
+        self.x_speed = 0
+        self.y_speed = 0
+        self.score = 0
+        self.boss_coming = BOSS_AFTER
+        self.boss = None
+        self.victory_in = None  # Frames until the round ends after the boss is destroyed
+        self.running = True
+        self.frame = 0
+        self.spawn_enemies(ENEMY_WAVE)
+        self.spawn_mines(MINE_COUNT)
+        self._fonts = None
+
+    @property
+    def hp(self):
+        """
+        int: The player's health points.
+        """
+        return int(self.world.health.hp[self.player])
+
+    def spawn_enemies(self, n):
+        """
+        Add n enemy tanks at random positions above the screen.
+        """
+        rng = self.world.rng
+        self.world.spawn(ENEMY, rng.integers(0, 737, n), rng.integers(-200, -49, n))
+
+    def spawn_mines(self, n):
+        """
+        Add n landmines at random positions above the screen.
+        """
+        rng = self.world.rng
+        self.world.spawn(MINE, rng.integers(0, 737, n), rng.integers(-200, -49, n))
+
+    def handle_input(self, event):
+        """
+        Handle keydown and keyup events for player movement and firing.
+        Args:
+            event (pygame.event.Event): The event to handle.
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RIGHT:
+                self.x_speed = self.speed_factor
+            elif event.key == pygame.K_LEFT:
+                self.x_speed = -self.speed_factor
+            elif event.key == pygame.K_DOWN:
+                self.y_speed = self.speed_factor
+            elif event.key == pygame.K_UP:
+                self.y_speed = -self.speed_factor
+            elif event.key == pygame.K_SPACE:
+                self.fire_bullet()
+
+        if event.type == pygame.KEYUP:
+            if event.key in [pygame.K_RIGHT, pygame.K_LEFT]:
+                self.x_speed = 0
+            if event.key in [pygame.K_UP, pygame.K_DOWN]:
+                self.y_speed = 0
+
+    def fire_bullet(self):
+        """
+        Fire a bullet from the player's current position.
+        """
+        t = self.world.transform
+        self.world.spawn(PLAYER_BULLET, t.x[self.player] + t.w[self.player] // 2 - 5, t.y[self.player],
+                         damage=self.power)
+
+    def step(self):
+        """
+        Advance the round by one frame.
+        Returns:
+            bool: True while the round goes on, False once the player or the boss is dead.
+        """
+        world, player = self.world, self.player
+        t, v = world.transform, world.velocity
+        self.frame += 1
+
+        # Stop at the edges of the screen
+        x, y = t.x[player], t.y[player]
+        if x <= 5 and self.x_speed < 0 or x >= 730 and self.x_speed > 0: self.x_speed = 0
+        if y <= 5 and self.y_speed < 0 or y >= 530 and self.y_speed > 0: self.y_speed = 0
+        v.vx[player], v.vy[player] = self.x_speed, self.y_speed
+
+        self.background.step()
+        move(world)
+        bounce(world)
+        fire(world)
+        self.effects.step()
+        self._collide()
+
+        for kind in world.kind[cull(world)]:
+            if kind == MINE:
+                self._replace_mine()
+            else:
+                self._remove_enemy(PASS_SCORE)
+
+        if self.boss_coming > 0:
+            alive = len(world.ids(ENEMY))
+            if alive < ENEMY_WAVE:
+                self.spawn_enemies(ENEMY_WAVE - alive)
+        elif self.boss is None and self.victory_in is None:
+            # The boss arrives alone
+            world.despawn(world.ids(ENEMY, ENEMY_BULLET))
+            self.boss = int(world.spawn(BOSS, 300, 50)[0])
+        elif self.victory_in is not None:
+            # Let the boss's explosion play out
+            self.victory_in -= 1
+            if self.victory_in <= 0:
+                self.score += BOSS_SCORE
+                self.running = False
+
+        if self.hp <= 0:
+            self.running = False
+        return self.running
+
+    def explode(self, ids):
+        """
+        Despawn entities and leave an explosion and sparks where each one was.
+        Args:
+            ids (numpy.ndarray): Entity ids of kinds listed in EXPLOSIONS.
+        """
+        world = self.world
+        t = world.transform
+        sprite, frames, dy = self.explosions[:, world.kind[ids]]
+        self.effects.add(sprite, t.x[ids], t.y[ids] + dy, frames)
+        self.effects.burst(self.spark_sprite, t.x[ids] + t.w[ids] / 2, t.y[ids] + t.h[ids] / 2, SPARKS)
+        world.despawn(ids)
+
+    def _collide(self):
+        """
+        Apply bullet and mine hits for this frame.
+        """
+        world, player = self.world, self.player
+        t, v, w = world.transform, world.velocity, world.weapon
+        me = np.array([player])
+
+        hostile = world.ids(ENEMY_BULLET, BOSS_BULLET)
+        hits = hostile[overlaps(world, hostile, me)[:, 0]]
+        mines = world.ids(MINE)
+        stepped = mines[overlaps(world, mines, me)[:, 0]]
+        world.health.hp[player] -= int(w.damage[hits].sum()) + int(w.damage[stepped].sum())
+        world.despawn(hits)
+        self.explode(stepped)
+        for _ in range(len(stepped)):
+            self._replace_mine()
+
+        # Each bullet hits the first target it overlaps
+        bullets = world.ids(PLAYER_BULLET)
+        targets = world.ids(ENEMY, BOSS)
+        if len(bullets) and len(targets):
+            matrix = overlaps(world, bullets, targets)
+            hit = matrix.any(axis=1)
+            struck = targets[matrix[hit].argmax(axis=1)]
+            # The small explosion moves along with the tank it hit
+            self.effects.add(self.hit_sprite, t.x[struck] + t.w[struck] // 2 - 16, t.y[struck], HIT_FRAMES,
+                             v.vx[struck], v.vy[struck])
+            died = world.damage(struck, w.damage[bullets[hit]])
+            world.despawn(bullets[hit])
+            kinds = world.kind[died]
+            self.explode(died)
+            for _ in range(int(np.count_nonzero(kinds == ENEMY))):
+                self._remove_enemy(KILL_SCORE + PASS_SCORE)
+            if np.any(kinds == BOSS):
+                self.boss = None
+                self.victory_in = int(self.explosions[1, BOSS])
+
+    def _remove_enemy(self, score):
+        """
+        Count an enemy that was killed or got past, and send two more.
+        """
+        self.score += score
+        if self.boss_coming > 0:
+            self.boss_coming -= 1
+            self.spawn_enemies(2)
+
+    def _replace_mine(self):
+        """
+        Replace a landmine that exploded or got past, with a small chance of an extra one.
+        """
+        self.score += PASS_SCORE
+        self.spawn_mines(2 if self.world.rng.integers(1, 21) == 17 else 1)
+
+    def draw(self, screen):
+        """
+        Draw the background, every entity and effect, the health bars and the player's HP and score.
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+        """
+        world = self.world
+        t, r = world.transform, world.render
+        self.background.draw(screen)
+
+        ids = world.ids()
+        ids = ids[np.argsort([LAYERS[k] for k in world.kind[ids].tolist()], kind="stable")]
+        screen.blits([(sprites.surface(s), (x, y)) for s, x, y in zip(r.sprite[ids].tolist(), t.x[ids].tolist(),
+                                                                        t.y[ids].tolist())], doreturn=False)
+        self.effects.draw(screen)
+
+        tanks = world.ids(ENEMY, BOSS)
+        health = world.health
+        fill = (50 * health.hp[tanks] / health.max_hp[tanks]).astype(int)
+        for x, y, f in zip(t.x[tanks].tolist(), t.y[tanks].tolist(), fill.tolist()):
+            pygame.draw.rect(screen, (255, 0, 0), (x, y - 10, f, 5))
+            pygame.draw.rect(screen, (255, 255, 255), (x, y - 10, 50, 5), 1)
+
+        if self._fonts is None:
+            self._fonts = pygame.font.Font(None, 36), pygame.font.Font(None, 24)
+        screen.blit(self._fonts[0].render(f"HP: {self.hp}", True, (230, 30, 30)), (700, 10))
+        screen.blit(self._fonts[1].render(f"Score: {self.score}", True, (30, 30, 230)), (65, 30))
@@ -0,0 +1,180 @@
+"""
+Memory and update cost of the entity-component model against the old per-object classes.
+
+The legacy classes below have the same shape as the GameObject, Enemy and Bullet
+classes that main.py used before ecs.py: a __dict__ per instance, an image loaded
+from disk per instance, a Rect and the x/y floats, and an update() method per
+object. Both sides run the same enemy behaviour (move, bounce, fire, bullets
+flying off the screen) for the same number of frames.
+
+Example:
+    python benchEntities.py --entities 10000 --frames 100
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+import ecs
+
+ENEMY_IMAGE = "assets/images/enemyTank.png"
+BULLET_IMAGE = "assets/images/playerBullet.png"
+
+
+class LegacyObject:
+    def __init__(self, x, y, image_path):
+        self.x = x
+        self.y = y
+        self.image = pygame.image.load(image_path)
+        self.rect = self.image.get_rect()
+        self.rect.topleft = (self.x, self.y)
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+        self.rect.topleft = (self.x, self.y)
+
+
+class LegacyBullet(LegacyObject):
+    def __init__(self, x, y, image_path, speed=7):
+        super().__init__(x, y, image_path)
+        self.speed = speed
+        self.image = pygame.transform.rotate(self.image, 180)
+
+    def update(self):
+        self.move(0, self.speed)
+
+    def is_off_screen(self):
+        return self.y < 0 or self.y > 600
+
+
+class LegacyEnemy(LegacyObject):
+    def __init__(self, x, y, image_path, x_speed, y_speed, health):
+        super().__init__(x, y, image_path)
+        self.image = pygame.transform.rotate(self.image, 180)
+        self.x_speed = x_speed
+        self.y_speed = y_speed
+        self.health = health
+        self.max_health = health
+        self.is_dead = False
+        self.damage = 5
+        self.small_explosion = None
+        self.explosion_timer = 0
+        self.death_timer = 0
+        self.bullets = []
+        self.fire_cooldown = random.randint(60, 120)
+        self.is_off_screen = False
+
+    def update(self):
+        self.move(self.x_speed, self.y_speed)
+        if self.x <= 0 or self.x >= 736:
+            self.x_speed *= -1
+        if self.y >= 650:
+            self.is_off_screen = True
+        if self.fire_cooldown <= 0:
+            self.bullets.append(LegacyBullet(self.x + self.rect.width // 2 - 5, self.y + self.rect.height,
+                                             BULLET_IMAGE))
+            self.fire_cooldown = random.randint(60, 120)
+        else:
+            self.fire_cooldown -= 1
+
+
+def surface_bytes(surface):
+    """
+    Returns:
+        int: Pixel bytes of a Surface, which SDL allocates outside tracemalloc's view.
+    """
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def spawn_positions(n, seed):
+    """
+    Returns:
+        tuple: Arrays of n x and y positions on screen.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 737, n), rng.integers(0, 500, n)
+
+
+def bench_legacy(n, frames, seed):
+    """
+    Build n legacy enemies and update them and their bullets for some frames.
+    Returns:
+        dict: "python_bytes", "pixel_bytes", "build_s" and "frame_ms".
+    """
+    random.seed(seed)
+    xs, ys = spawn_positions(n, seed)
+    tracemalloc.start()
+    start = time.perf_counter()
+    enemies = [LegacyEnemy(int(x), int(y), ENEMY_IMAGE, 1, 0.5, 100) for x, y in zip(xs, ys)]
+    build = time.perf_counter() - start
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    pixel_bytes = sum(surface_bytes(e.image) for e in enemies)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for enemy in enemies:
+            enemy.update()
+            for bullet in list(enemy.bullets):
+                bullet.update()
+                if bullet.is_off_screen():
+                    enemy.bullets.remove(bullet)
+    frame_ms = (time.perf_counter() - start) / frames * 1000
+    return {"python_bytes": python_bytes, "pixel_bytes": pixel_bytes, "build_s": build, "frame_ms": frame_ms}
+
+
+def bench_ecs(n, frames, seed):
+    """
+    Build n enemies in an ecs.World and run the same systems for some frames.
+    Returns:
+        dict: "python_bytes", "pixel_bytes", "build_s" and "frame_ms".
+    """
+    xs, ys = spawn_positions(n, seed)
+    tracemalloc.start()
+    start = time.perf_counter()
+    world = ecs.World(capacity=n, seed=seed)
+    world.spawn(ecs.ENEMY, xs, ys)
+    build = time.perf_counter() - start
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # One shared Surface per sprite, as sprites.py loads them
+    pixel_bytes = surface_bytes(pygame.image.load(ENEMY_IMAGE)) + surface_bytes(pygame.image.load(BULLET_IMAGE))
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        ecs.move(world)
+        ecs.bounce(world)
+        ecs.fire(world)
+        ecs.cull(world)
+    frame_ms = (time.perf_counter() - start) / frames * 1000
+    return {"python_bytes": python_bytes, "pixel_bytes": pixel_bytes, "build_s": build, "frame_ms": frame_ms}
+
+
+def main():
+    """
+    Print memory per entity and update time per frame for both models.
+    """
+    parser = argparse.ArgumentParser(description="Compare the entity-component model with the legacy classes.")
+    parser.add_argument("--entities", type=int, default=10000, help="number of enemy tanks")
+    parser.add_argument("--frames", type=int, default=100, help="frames to update")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {"legacy classes": bench_legacy(args.entities, args.frames, args.seed),
+               "ecs": bench_ecs(args.entities, args.frames, args.seed)}
+    print(f"{args.entities} enemies, {args.frames} frames")
+    print(f"{'model':<16}{'bytes/entity':>14}{'+ pixels':>12}{'build':>10}{'update/frame':>15}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['python_bytes'] / args.entities:>14.0f}{r['pixel_bytes'] / args.entities:>12.0f}"
+              f"{r['build_s'] * 1000:>7.0f} ms{r['frame_ms']:>12.2f} ms")
+    legacy, new = results["legacy classes"], results["ecs"]
+    memory = (legacy["python_bytes"] + legacy["pixel_bytes"]) / (new["python_bytes"] + new["pixel_bytes"])
+    print(f"update speedup {legacy['frame_ms'] / new['frame_ms']:.0f}x, memory {memory:.0f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Load test for the leaderboard service and the game's score client.
+
+Starts leaderboard.py in its own process on a free port and measures:
+- raw service throughput: many connections at once, each sending batches of
+  scores back to back, with submissions/sec and request latency percentiles,
+- the ScoreClient as the game uses it: several clients (one per simulated kiosk)
+  submitting scores, with the time of each submit() call, which runs on the
+  game's thread, and the time until every score has reached the service,
+- submit() with the service unreachable, which must not be slower.
+
+Exits with status 1 if the service handles fewer than --min-rate submissions/sec,
+if any submission is lost or counted twice, or if submit() ever takes longer than
+--max-submit-ms.
+
+Example:
+    python benchLeaderboard.py --connections 50 --batches 200 --batch-size 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from scoreClient import ScoreClient
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_service():
+    """
+    Start the leaderboard service on a free port.
+    Returns:
+        tuple: The process and its port.
+    """
+    process = subprocess.Popen([sys.executable, "leaderboard.py", "--port", "0"], cwd=HERE,
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    return process, int(line.rsplit(":", 1)[1])
+
+
+async def request(reader, writer, message):
+    """
+    Send one request and read its reply.
+    """
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def hammer(port, batches, batch_size, latencies):
+    """
+    Send batches of scores over one connection, one request at a time.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(batches):
+        scores = [{"id": uuid.uuid4().hex, "name": "load", "score": int(s)}
+                  for s in np.random.randint(0, 10000, batch_size)]
+        start = time.perf_counter()
+        reply = await request(reader, writer, {"op": "submit", "scores": scores})
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert reply["ok"], reply
+    writer.close()
+
+
+async def submitted(port):
+    """
+    Returns:
+        int: Number of scores the service has counted.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    reply = await request(reader, writer, {"op": "top", "n": 1})
+    writer.close()
+    return reply["submitted"]
+
+
+async def bench_service(port, connections, batches, batch_size):
+    """
+    Returns:
+        dict: "rate" (submissions/sec), "latency_ms" (p50, p95, p99) and "counted".
+    """
+    before = await submitted(port)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(hammer(port, batches, batch_size, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    return {"rate": connections * batches * batch_size / elapsed,
+            "latency_ms": np.percentile(latencies, [50, 95, 99]),
+            "counted": await submitted(port) - before}
+
+
+def bench_client(port, kiosks, scores):
+    """
+    Submit scores through ScoreClients, as the game does.
+    Returns:
+        dict: "submit_us" (p50, p99, max of one submit() call), "delivered_s" and "sent".
+    """
+    clients = [ScoreClient("127.0.0.1", port, f"kiosk-{i}") for i in range(kiosks)]
+    calls = []
+    start = time.perf_counter()
+    for i in range(scores):
+        client = clients[i % kiosks]
+        t = time.perf_counter()
+        client.submit(i)
+        calls.append((time.perf_counter() - t) * 1e6)
+    while sum(c.sent for c in clients) < scores and time.perf_counter() - start < 30:
+        time.sleep(0.01)
+    delivered = time.perf_counter() - start
+    for client in clients:
+        client.close()
+    return {"submit_us": (*np.percentile(calls, [50, 99]), max(calls)), "delivered_s": delivered,
+            "sent": sum(c.sent for c in clients)}
+
+
+def bench_offline(scores):
+    """
+    Time submit() calls while nothing listens on the client's port.
+    Returns:
+        tuple: p50, p99 and max of one call, in microseconds.
+    """
+    client = ScoreClient("127.0.0.1", 9, "offline")  # The discard port; nothing listens on it here
+    calls = []
+    for i in range(scores):
+        t = time.perf_counter()
+        client.submit(i)
+        calls.append((time.perf_counter() - t) * 1e6)
+    client.close(timeout=0.1)
+    return (*np.percentile(calls, [50, 99]), max(calls))
+
+
+def main():
+    """
+    Run the load test against a fresh service.
+    """
+    parser = argparse.ArgumentParser(description="Load test for the leaderboard service and score client.")
+    parser.add_argument("--connections", type=int, default=50, help="concurrent connections")
+    parser.add_argument("--batches", type=int, default=100, help="batches per connection")
+    parser.add_argument("--batch-size", type=int, default=20, help="scores per batch")
+    parser.add_argument("--kiosks", type=int, default=20, help="ScoreClients")
+    parser.add_argument("--scores", type=int, default=20000, help="scores submitted through the clients")
+    parser.add_argument("--min-rate", type=float, default=2000, help="required submissions/sec")
+    # A frame at 60 FPS; a call can wait up to one thread switch interval (5 ms) for the GIL
+    parser.add_argument("--max-submit-ms", type=float, default=1000 / 60, help="allowed time of one submit() call")
+    args = parser.parse_args()
+
+    process, port = start_service()
+    try:
+        service = asyncio.run(bench_service(port, args.connections, args.batches, args.batch_size))
+        client = bench_client(port, args.kiosks, args.scores)
+    finally:
+        process.terminate()
+        process.wait()
+    offline = bench_offline(args.scores)
+
+    total = args.connections * args.batches * args.batch_size
+    p50, p95, p99 = service["latency_ms"]
+    print(f"service: {total} scores over {args.connections} connections in batches of {args.batch_size}")
+    print(f"  {service['rate']:,.0f} submissions/sec, request latency p50/p95/p99 {p50:.2f}/{p95:.2f}/{p99:.2f} ms")
+    print(f"client: {args.scores} scores from {args.kiosks} clients, all delivered after {client['delivered_s']:.2f} s")
+    print("  submit() p50/p99/max {:.1f}/{:.1f}/{:.1f} us".format(*client["submit_us"]))
+    print("offline: submit() p50/p99/max {:.1f}/{:.1f}/{:.1f} us".format(*offline))
+
+    failures = []
+    if service["rate"] < args.min_rate:
+        failures.append(f"service handled {service['rate']:.0f} submissions/sec, below {args.min_rate:.0f}")
+    if service["counted"] != total:
+        failures.append(f"service counted {service['counted']} of {total} submissions")
+    if client["sent"] != args.scores:
+        failures.append(f"clients delivered {client['sent']} of {args.scores} scores")
+    slowest = max(client["submit_us"][2], offline[2]) / 1000
+    if slowest > args.max_submit_ms:
+        failures.append(f"a submit() call took {slowest:.1f} ms")
+    for message in failures:
+        print("FAIL " + message)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Frame-time and allocation regression checks for the tank game.
+
+Drives the home page and Battle headlessly through scripted scenarios and
+measures, for every scenario:
+- tick time percentiles (one tick is a step() plus a draw(), without the 60 FPS cap),
+- bytes allocated per tick, as tracemalloc's peak growth during the tick (measured in
+  a second, identical run, because tracemalloc slows Python code down),
+- the peak number of enemies, bullets, landmines and effects alive at once,
+- the damage the player took. Every combat scenario must hurt the player, and the
+  damage must match the baseline exactly, so enemy fire that stops doing damage
+  shows up as a regression. Update the baseline when the combat rules change.
+
+Results are compared with the baseline committed in baselines/scenarios.json, and
+the script exits with status 1 if any scenario got slower, allocates more or keeps
+more entities alive than allowed:
+
+    python benchScenarios.py                 # check against the baseline
+    python benchScenarios.py --update        # accept the current results as the new baseline
+
+test_scenarios.py runs the same checks under pytest, except for tick times.
+Entity counts and allocations do not depend on the machine. Tick times do, so they
+are only checked against a loose threshold; update the baseline from a quiet machine.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from battle import Battle
+from ecs import BOSS_BULLET, ENEMY, ENEMY_BULLET, MINE, PLAYER_BULLET
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "scenarios.json")
+TICKS = 600
+SEED = 1234
+TIME_THRESHOLD = 0.5  # Allowed relative slowdown of the tick time percentiles
+MIN_REGRESSION_MS = 0.5  # Ignore slowdowns smaller than this, they are timer noise
+ALLOC_THRESHOLD = 0.25  # Allowed relative growth of allocations per tick
+MIN_REGRESSION_KB = 4.0
+COUNT_THRESHOLD = 0.1  # Allowed relative growth of the peak entity counts
+
+
+def key(kind):
+    """
+    Build a key press event for scripted input.
+    """
+    return pygame.event.Event(pygame.KEYDOWN, key=kind)
+
+
+def menu_idle(screen):
+    """
+    The home page redrawn every tick, toggling the tank choice twice a second.
+    """
+    from main import draw_home
+    font = pygame.font.Font(None, 36)
+
+    def tick(i):
+        draw_home(screen, font, 1234, i % 60 < 30, i % 60 >= 30)
+    return tick, None
+
+
+def early_waves(screen):
+    """
+    The start of a round: the player sweeps left and right, firing every 10 ticks.
+    """
+    battle = Battle("playerTank.png", hp=200, power=20, seed=SEED)
+
+    def tick(i):
+        if i % 180 == 0:
+            battle.handle_input(key(pygame.K_LEFT if i % 360 else pygame.K_RIGHT))
+        if i % 10 == 0:
+            battle.handle_input(key(pygame.K_SPACE))
+    return tick, battle
+
+
+def mass_spawn(screen):
+    """
+    100 extra enemy tanks arrive every half second, up to 1000 at once.
+    """
+    battle = Battle("playerTank.png", hp=10 ** 6, power=20, seed=SEED)
+
+    def tick(i):
+        if i % 30 == 0 and len(battle.world.ids(ENEMY)) < 1000:
+            battle.spawn_enemies(100)
+        if i % 10 == 0:
+            battle.handle_input(key(pygame.K_SPACE))
+    return tick, battle
+
+
+def bullet_spam(screen):
+    """
+    The player fires every tick and every enemy fires every 5-10 ticks.
+    """
+    battle = Battle("Player2tank.png", hp=10 ** 6, power=40, seed=SEED)
+    weapon = battle.world.weapon
+
+    def tick(i):
+        weapon.cooldown_min[:] = np.minimum(weapon.cooldown_min, 5)
+        weapon.cooldown_max[:] = np.minimum(weapon.cooldown_max, 10)
+        if i % 60 == 0:
+            battle.handle_input(key(pygame.K_LEFT if i % 120 else pygame.K_RIGHT))
+        battle.handle_input(key(pygame.K_SPACE))
+    return tick, battle
+
+
+def boss_phase(screen):
+    """
+    The boss fight: the player follows the boss and fires every 4 ticks.
+    """
+    battle = Battle("Player2tank.png", hp=10 ** 6, power=40, seed=SEED)
+    battle.boss_coming = 0
+    t = battle.world.transform
+
+    def tick(i):
+        if battle.boss is not None:
+            dx = t.x[battle.boss] - t.x[battle.player]
+            battle.handle_input(key(pygame.K_RIGHT if dx > 0 else pygame.K_LEFT))
+        if i % 4 == 0:
+            battle.handle_input(key(pygame.K_SPACE))
+    return tick, battle
+
+
+SCENARIOS = {
+    "menu idle": menu_idle,
+    "early waves": early_waves,
+    "mass spawn": mass_spawn,
+    "bullet spam": bullet_spam,
+    "boss phase": boss_phase,
+}
+COUNTED = {"enemies": (ENEMY,), "bullets": (PLAYER_BULLET, ENEMY_BULLET, BOSS_BULLET), "landmines": (MINE,)}
+
+
+def run(scenario, screen, ticks, trace):
+    """
+    Run one scenario from a fresh start.
+    Args:
+        scenario: A value of SCENARIOS.
+        screen (pygame.Surface): The surface to draw on.
+        ticks (int): Number of ticks.
+        trace (bool): Measure allocations instead of time.
+    Returns:
+        dict: "samples" (ms per tick, or bytes per tick when tracing), "peaks" (peak count
+        per entity group) and "damage" (hp the player lost, None without a battle).
+    """
+    tick, battle = scenario(screen)
+    start_hp = battle.hp if battle is not None else None
+    peaks = dict.fromkeys(list(COUNTED) + ["effects"], 0)
+    samples = []
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    for i in range(ticks):
+        if trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        else:
+            start = time.perf_counter()
+        tick(i)
+        if battle is not None:
+            if not battle.step():
+                break
+            battle.draw(screen)
+        if trace:
+            samples.append(tracemalloc.get_traced_memory()[1] - before)
+        else:
+            samples.append((time.perf_counter() - start) * 1000)
+        if battle is not None:
+            for name, kinds in COUNTED.items():
+                peaks[name] = max(peaks[name], len(battle.world.ids(*kinds)))
+            peaks["effects"] = max(peaks["effects"], len(battle.effects))
+    if trace:
+        tracemalloc.stop()
+    damage = start_hp - battle.hp if battle is not None else None
+    return {"samples": samples, "peaks": peaks, "damage": damage}
+
+
+def measure(name, screen, ticks):
+    """
+    Time a scenario, then run it again to measure its allocations.
+    Returns:
+        dict: "ticks", "tick_ms" and "alloc_kb" (p50, p95, p99), the peak counts and the
+        player's damage.
+    """
+    timed = run(SCENARIOS[name], screen, ticks, trace=False)
+    traced = run(SCENARIOS[name], screen, ticks, trace=True)
+    return {
+        "ticks": len(timed["samples"]),
+        "tick_ms": [round(float(v), 3) for v in np.percentile(timed["samples"], [50, 95, 99])],
+        "alloc_kb": [round(float(v) / 1024, 1) for v in np.percentile(traced["samples"], [50, 95, 99])],
+        "peaks": traced["peaks"],
+        "player_damage": traced["damage"],
+    }
+
+
+def compare(results, baseline, time_threshold):
+    """
+    Find the measurements that regressed against a baseline.
+    Args:
+        results (dict): Scenario name -> measure() result.
+        baseline (dict): The same structure, from the baseline file.
+        time_threshold (float): Allowed relative slowdown of the tick time p50 and p95, or
+            None to skip the tick times, which depend on the machine.
+    Returns:
+        list: One message per regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result["player_damage"] == 0:
+            regressions.append(f"{name}: the player took no damage")
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for label, i in (("p50", 0), ("p95", 1)):
+            new, old = result["tick_ms"][i], base["tick_ms"][i]
+            if time_threshold is not None and new > old * (1 + time_threshold) and new - old > MIN_REGRESSION_MS:
+                regressions.append(f"{name}: tick time {label} {old:.2f} -> {new:.2f} ms")
+            new, old = result["alloc_kb"][i], base["alloc_kb"][i]
+            if new > old * (1 + ALLOC_THRESHOLD) and new - old > MIN_REGRESSION_KB:
+                regressions.append(f"{name}: allocations per tick {label} {old:.1f} -> {new:.1f} KB")
+        if result["ticks"] != base["ticks"]:
+            # A shorter or longer run reaches different peaks
+            continue
+        for group, new in result["peaks"].items():
+            old = base["peaks"].get(group, 0)
+            if new > old * (1 + COUNT_THRESHOLD) + 1:
+                regressions.append(f"{name}: peak {group} {old} -> {new}")
+        # Same seed and ticks, same damage: a change means the combat rules changed
+        if result["player_damage"] != base.get("player_damage"):
+            regressions.append(f"{name}: player damage {base.get('player_damage')} -> {result['player_damage']}")
+    return regressions
+
+
+def print_report(results, baseline):
+    """
+    Print one line per scenario, with the baseline's tick time p50 for reference.
+    """
+    print(f"{'scenario':<14}{'ticks':>6}  {'tick ms p50/p95/p99':>22}{'base p50':>10}  {'alloc KB p50/p95/p99':>22}  "
+          f"peak enemies/bullets/mines/effects  damage")
+    for name, r in results.items():
+        base = baseline.get(name)
+        base_p50 = f"{base['tick_ms'][0]:.2f}" if base else "-"
+        peaks = "/".join(str(r["peaks"][group]) for group in list(COUNTED) + ["effects"])
+        print(f"{name:<14}{r['ticks']:>6}  {'/'.join(f'{v:.2f}' for v in r['tick_ms']):>22}{base_p50:>10}  "
+              f"{'/'.join(f'{v:.1f}' for v in r['alloc_kb']):>22}  {peaks:<34}{r['player_damage']}")
+
+
+def main():
+    """
+    Run the scenarios and check them against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Headless frame-time and allocation checks for the game.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--ticks", type=int, default=TICKS, help="ticks per scenario")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--update", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=TIME_THRESHOLD,
+                        help="allowed relative slowdown of tick times (default 0.5 = 50%%)")
+    args = parser.parse_args()
+
+    # Asset paths are relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    results = {name: measure(name, screen, args.ticks) for name in args.scenarios}
+    print_report(results, baseline)
+    pygame.quit()
+
+    if args.update:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(dict(baseline, **results), file, indent=2)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update to create one.")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for message in regressions:
+        print("REGRESSION " + message)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
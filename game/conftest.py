@@ -0,0 +1,28 @@
+"""
+pytest setup for the game: a headless display, and the game directory as the
+working directory, since asset paths are relative to it.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def screen():
+    """
+    The 800x600 game screen, created once for all tests.
+    """
+    cwd = os.getcwd()
+    os.chdir(GAME_DIR)
+    pygame.display.init()
+    pygame.font.init()
+    yield pygame.display.set_mode((800, 600))
+    pygame.quit()
+    os.chdir(cwd)
@@ -0,0 +1,328 @@
+"""
+Array-backed entity-component model for the tank game.
+
+An entity is a row index. Each component is a small slotted class holding one
+numpy array per field, so the data for a field of every entity is contiguous
+and an entity costs a few dozen bytes instead of a Python object, a __dict__, a
+Rect and its own Surface. Systems are plain functions that update every entity
+of the world with a handful of array operations per frame.
+
+What an entity looks like when it is spawned comes from its archetype (see
+ARCHETYPES). Sprites are integer ids into a shared table (see sprites.py).
+"""
+import numpy as np
+
+# Entity kinds
+PLAYER, ENEMY, BOSS, MINE, PLAYER_BULLET, ENEMY_BULLET, BOSS_BULLET = range(1, 8)
+BULLETS = (PLAYER_BULLET, ENEMY_BULLET, BOSS_BULLET)
+
+SCREEN_W, SCREEN_H = 800, 600
+
+
+class Component:
+    """
+    A group of per-entity fields, each stored as a numpy array of the world's capacity.
+    """
+    __slots__ = ()
+    FIELDS = {}
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Number of entity rows to allocate.
+        """
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+
+    def grow(self, capacity):
+        """
+        Reallocate every field with a larger capacity, keeping the existing rows.
+        Args:
+            capacity (int): The new number of rows.
+        """
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def clear(self, ids):
+        """
+        Zero the fields of some entities.
+        Args:
+            ids: Entity ids (int array or slice).
+        """
+        for name in self.FIELDS:
+            getattr(self, name)[ids] = 0
+
+    def nbytes(self):
+        """
+        Returns:
+            int: Bytes used by the field arrays.
+        """
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+
+class Transform(Component):
+    """
+    Top-left position and size of the entity's bounding box, in screen pixels.
+    """
+    __slots__ = ("x", "y", "w", "h")
+    FIELDS = {"x": np.float32, "y": np.float32, "w": np.int16, "h": np.int16}
+
+
+class Velocity(Component):
+    """
+    Movement per frame, in pixels.
+    """
+    __slots__ = ("vx", "vy")
+    FIELDS = {"vx": np.float32, "vy": np.float32}
+
+
+class Health(Component):
+    """
+    Hit points. Entities are despawned when they run out; their explosion is an effect (see effects.py).
+    """
+    __slots__ = ("hp", "max_hp")
+    FIELDS = {"hp": np.int32, "max_hp": np.int32}
+
+
+class Weapon(Component):
+    """
+    Bullets fired when the cooldown runs out, then reset to a random number of
+    frames in [cooldown_min, cooldown_max]. A bullet kind of 0 means unarmed.
+    """
+    __slots__ = ("bullet", "cooldown", "cooldown_min", "cooldown_max", "damage")
+    FIELDS = {"bullet": np.uint8, "cooldown": np.int16, "cooldown_min": np.int16, "cooldown_max": np.int16,
+              "damage": np.int16}
+
+
+class Render(Component):
+    """
+    The id of the entity's sprite.
+    """
+    __slots__ = ("sprite",)
+    FIELDS = {"sprite": np.int16}
+
+
+# Spawn values per kind. Fields not listed are zero; "fire" is (min, max) cooldown frames.
+ARCHETYPES = {
+    PLAYER: {"w": 64, "h": 64, "hp": 100},
+    ENEMY: {"w": 64, "h": 64, "vx": 1, "vy": 0.5, "hp": 100, "bullet": ENEMY_BULLET, "fire": (60, 120),
+            "damage": 5},
+    # The boss used to be updated twice per frame; its speed and timers are doubled to match
+    BOSS: {"w": 64, "h": 64, "vx": 3, "hp": 1000, "bullet": BOSS_BULLET, "fire": (30, 60), "damage": 20},
+    # Likewise landmines, which moved twice per frame
+    MINE: {"w": 32, "h": 32, "vy": 2, "hp": 1, "damage": 10},
+    PLAYER_BULLET: {"w": 24, "h": 24, "vy": -10},
+    ENEMY_BULLET: {"w": 24, "h": 24, "vy": 7},
+    BOSS_BULLET: {"w": 32, "h": 32, "vy": 10},
+}
+
+
+class World:
+    """
+    All entities of one battle, stored as component arrays indexed by entity id.
+    Ids of despawned entities are reused.
+    """
+    def __init__(self, capacity=256, seed=None):
+        """
+        Args:
+            capacity (int, optional): Initial number of entity rows. Grows as needed. Defaults to 256.
+            seed (int, optional): Seed for spawn positions and firing cooldowns.
+        """
+        self.capacity = capacity
+        self.count = 0  # Rows in use so far; systems only look at [:count]
+        self.alive = np.zeros(capacity, bool)
+        self.kind = np.zeros(capacity, np.uint8)
+        self.transform = Transform(capacity)
+        self.velocity = Velocity(capacity)
+        self.health = Health(capacity)
+        self.weapon = Weapon(capacity)
+        self.render = Render(capacity)
+        self.components = [self.transform, self.velocity, self.health, self.weapon, self.render]
+        self.sprites = {}  # Kind -> sprite id
+        self.rng = np.random.default_rng(seed)
+        self._free = []
+
+    def nbytes(self):
+        """
+        Returns:
+            int: Bytes used by the component arrays.
+        """
+        return self.alive.nbytes + self.kind.nbytes + sum(c.nbytes() for c in self.components)
+
+    def _grow(self, needed):
+        """
+        Double the capacity until `needed` rows fit.
+        """
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in ("alive", "kind"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for component in self.components:
+            component.grow(capacity)
+        self.capacity = capacity
+
+    def _allocate(self, n):
+        """
+        Take n entity ids, reusing freed ones first.
+        """
+        reused = [self._free.pop() for _ in range(min(n, len(self._free)))]
+        fresh = n - len(reused)
+        if self.count + fresh > self.capacity:
+            self._grow(self.count + fresh)
+        ids = np.array(reused + list(range(self.count, self.count + fresh)), np.intp)
+        self.count += fresh
+        return ids
+
+    def spawn(self, kind, x, y, n=None, **overrides):
+        """
+        Create entities of one kind from its archetype.
+        Args:
+            kind (int): The entity kind, a key of ARCHETYPES.
+            x: X position, a number or an array with one value per entity.
+            y: Y position, likewise.
+            n (int, optional): Number of entities. Defaults to the length of x or y, or 1.
+            **overrides: Values that replace archetype fields, e.g. hp=200.
+        Returns:
+            numpy.ndarray: The new entity ids.
+        """
+        if n is None:
+            n = max(np.size(x), np.size(y))
+        spec = dict(ARCHETYPES[kind], **overrides)
+        ids = self._allocate(n)
+        for component in self.components:
+            component.clear(ids)
+        self.alive[ids] = True
+        self.kind[ids] = kind
+        t, v, hp, w, r = self.transform, self.velocity, self.health, self.weapon, self.render
+        t.x[ids], t.y[ids], t.w[ids], t.h[ids] = x, y, spec["w"], spec["h"]
+        v.vx[ids], v.vy[ids] = spec.get("vx", 0), spec.get("vy", 0)
+        hp.hp[ids] = hp.max_hp[ids] = spec.get("hp", 0)
+        w.bullet[ids], w.damage[ids] = spec.get("bullet", 0), spec.get("damage", 0)
+        if "fire" in spec:
+            w.cooldown_min[ids], w.cooldown_max[ids] = spec["fire"]
+            w.cooldown[ids] = self.rng.integers(spec["fire"][0], spec["fire"][1] + 1, len(ids))
+        r.sprite[ids] = self.sprites.get(kind, 0)
+        return ids
+
+    def despawn(self, ids):
+        """
+        Remove entities. Their ids are reused by later spawns.
+        Args:
+            ids: Entity ids.
+        """
+        ids = np.asarray(ids, np.intp)
+        ids = ids[self.alive[ids]]
+        self.alive[ids] = False
+        self._free.extend(ids.tolist())
+
+    def ids(self, *kinds):
+        """
+        Ids of the living entities of the given kinds.
+        Args:
+            *kinds (int): Entity kinds. No kinds means every kind.
+        Returns:
+            numpy.ndarray: The ids, in ascending order.
+        """
+        n = self.count
+        mask = self.alive[:n]
+        if kinds:
+            mask = mask & np.isin(self.kind[:n], kinds)
+        return np.flatnonzero(mask)
+
+    def damage(self, ids, amounts):
+        """
+        Subtract hit points.
+        Args:
+            ids (numpy.ndarray): Entity ids. An id may appear more than once.
+            amounts: Damage per id, a number or an array.
+        Returns:
+            numpy.ndarray: Ids of the entities whose hit points ran out. They are still alive;
+            the caller despawns them.
+        """
+        ids = np.asarray(ids, np.intp)
+        if not len(ids):
+            return ids
+        np.subtract.at(self.health.hp, ids, amounts)
+        ids = np.unique(ids)
+        return ids[self.health.hp[ids] <= 0]
+
+
+def move(world):
+    """
+    Movement system: add each entity's velocity to its position.
+    """
+    n = world.count
+    world.transform.x[:n] += world.velocity.vx[:n]
+    world.transform.y[:n] += world.velocity.vy[:n]
+
+
+def bounce(world, min_x=0, max_x=SCREEN_W - 64):
+    """
+    Reverse the horizontal velocity of tanks and the boss at the sides of the screen.
+    """
+    ids = world.ids(ENEMY, BOSS)
+    x = world.transform.x[ids]
+    world.velocity.vx[ids[(x <= min_x) | (x >= max_x)]] *= -1
+
+
+def fire(world):
+    """
+    Weapon system: count down cooldowns and spawn a bullet for every entity whose cooldown
+    has run out, centred under it and doing the shooter's damage.
+    Returns:
+        numpy.ndarray: Ids of the new bullets.
+    """
+    n = world.count
+    w, t = world.weapon, world.transform
+    armed = np.flatnonzero(world.alive[:n] & (w.bullet[:n] > 0))
+    ready = armed[w.cooldown[armed] <= 0]
+    w.cooldown[armed] -= 1
+    if not len(ready):
+        return ready
+    w.cooldown[ready] = world.rng.integers(w.cooldown_min[ready], w.cooldown_max[ready] + 1)
+    new = []
+    for kind in np.unique(w.bullet[ready]):
+        shooters = ready[w.bullet[ready] == kind]
+        # Bullets carry their shooter's damage
+        new.append(world.spawn(int(kind), t.x[shooters] + t.w[shooters] // 2 - 5, t.y[shooters] + t.h[shooters],
+                               damage=w.damage[shooters]))
+    return np.concatenate(new)
+
+
+def cull(world, height=SCREEN_H):
+    """
+    Despawn bullets that left the screen and tanks and mines that drove off the bottom.
+    Returns:
+        numpy.ndarray: Ids of the tanks and mines that were removed (not bullets).
+    """
+    bullets = world.ids(*BULLETS)
+    y = world.transform.y[bullets]
+    world.despawn(bullets[(y < 0) | (y > height)])
+    ground = world.ids(ENEMY, MINE)
+    gone = ground[world.transform.y[ground] > height + 50]
+    world.despawn(gone)
+    return gone
+
+
+def overlaps(world, a, b):
+    """
+    Bounding-box collision test between two groups of entities.
+    Args:
+        world (World): The world.
+        a (numpy.ndarray): Entity ids.
+        b (numpy.ndarray): Entity ids.
+    Returns:
+        numpy.ndarray: Boolean matrix of shape (len(a), len(b)), True where they overlap.
+    """
+    t = world.transform
+    ax, ay = t.x[a][:, None], t.y[a][:, None]
+    bx, by = t.x[b][None, :], t.y[b][None, :]
+    return ((ax < bx + t.w[b][None, :]) & (bx < ax + t.w[a][:, None]) &
+            (ay < by + t.h[b][None, :]) & (by < ay + t.h[a][:, None]))
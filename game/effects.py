@@ -0,0 +1,130 @@
+"""
+Batched explosion and particle effects for the tank game.
+
+Every active effect is a row in a few fixed-size numpy arrays: sprite id,
+position, velocity and frames left. step() moves all of them and counts their
+timers down in one vectorized pass and drops the finished ones, and draw() hands
+them to a single Surface.blits call. The arrays are allocated once at the cap;
+when it is reached, new effects push out the oldest ones, so a mass kill costs
+a bounded amount of work per frame.
+"""
+import numpy as np
+
+import sprites
+
+MAX_EFFECTS = 512
+
+
+class Effects:
+    """
+    All active effects, oldest first.
+    """
+    def __init__(self, cap=MAX_EFFECTS, seed=None):
+        """
+        Args:
+            cap (int, optional): Maximum number of active effects. Defaults to MAX_EFFECTS.
+            seed (int, optional): Seed for particle directions.
+        """
+        self.cap = cap
+        self.count = 0
+        self.sprite = np.zeros(cap, np.int16)
+        self.x = np.zeros(cap, np.float32)
+        self.y = np.zeros(cap, np.float32)
+        self.vx = np.zeros(cap, np.float32)
+        self.vy = np.zeros(cap, np.float32)
+        self.frames = np.zeros(cap, np.int16)
+        self.dropped = 0  # Effects pushed out early because the cap was reached
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, sprite, x, y, frames, vx=0, vy=0):
+        """
+        Start effects. All arguments are numbers or arrays of the same length.
+        Args:
+            sprite: Sprite id to show.
+            x: X position of the sprite's top-left corner.
+            y: Y position of the sprite's top-left corner.
+            frames: Number of frames to show it.
+            vx (optional): Horizontal movement per frame. Defaults to 0.
+            vy (optional): Vertical movement per frame. Defaults to 0.
+        """
+        n = np.broadcast(sprite, x, y, frames, vx, vy).size
+        if n == 0:
+            return
+        if n > self.cap:
+            # Only the newest fit
+            self.dropped += n - self.cap
+            sprite, x, y, frames, vx, vy = (np.broadcast_to(a, n)[-self.cap:] for a in (sprite, x, y, frames, vx, vy))
+            n = self.cap
+        overflow = self.count + n - self.cap
+        if overflow > 0:
+            self._drop_oldest(overflow)
+        rows = slice(self.count, self.count + n)
+        self.sprite[rows], self.x[rows], self.y[rows] = sprite, x, y
+        self.vx[rows], self.vy[rows], self.frames[rows] = vx, vy, frames
+        self.count += n
+
+    def burst(self, sprite, x, y, n, speed=3.0, frames=20):
+        """
+        Start particles flying out of one or more points in random directions.
+        Args:
+            sprite (int): Sprite id of one particle.
+            x: X position of the centre, a number or an array with one value per burst.
+            y: Y position of the centre, likewise.
+            n (int): Number of particles per burst.
+            speed (float, optional): Maximum speed in pixels per frame. Defaults to 3.0.
+            frames (int, optional): Lifetime in frames; each particle gets 50-100% of it. Defaults to 20.
+        """
+        x, y = np.repeat(np.atleast_1d(x), n), np.repeat(np.atleast_1d(y), n)
+        total = len(x)
+        angle = self.rng.uniform(0, 2 * np.pi, total)
+        v = self.rng.uniform(0.3, 1.0, total) * speed
+        life = np.maximum(self.rng.uniform(0.5, 1.0, total) * frames, 1).astype(np.int16)
+        self.add(sprite, x, y, life, v * np.cos(angle), v * np.sin(angle))
+
+    def _drop_oldest(self, n):
+        """
+        Remove the n oldest effects.
+        """
+        keep = slice(n, self.count)
+        for a in (self.sprite, self.x, self.y, self.vx, self.vy, self.frames):
+            a[:self.count - n] = a[keep]
+        self.count -= n
+        self.dropped += n
+
+    def step(self):
+        """
+        Advance every effect by one frame and remove the finished ones.
+        """
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.frames[:n] -= 1
+        live = self.frames[:n] > 0
+        if not live.all():
+            m = int(np.count_nonzero(live))
+            for a in (self.sprite, self.x, self.y, self.vx, self.vy, self.frames):
+                a[:m] = a[:n][live]
+            self.count = m
+
+    def draw(self, screen):
+        """
+        Draw every active effect with one batched blit.
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+        """
+        n = self.count
+        if n:
+            screen.blits([(sprites.surface(s), (x, y)) for s, x, y in zip(self.sprite[:n].tolist(),
+                                                                          self.x[:n].tolist(), self.y[:n].tolist())],
+                         doreturn=False)
+
+    def clear(self):
+        """
+        Remove every effect.
+        """
+        self.count = 0
@@ -0,0 +1,243 @@
+"""
+A small shared leaderboard service for the tank game.
+
+Game instances submit scores over TCP and read back the best ones. The protocol
+is one JSON object per line in each direction, so a connection stays open and
+carries any number of requests:
+
+    {"op": "submit", "scores": [{"id": "...", "name": "kiosk-3", "score": 1240}, ...]}
+    -> {"ok": true, "accepted": 1}
+    {"op": "top", "n": 5}
+    -> {"ok": true, "top": [["kiosk-3", 1240], ...], "submitted": 52}
+
+Every score carries a client-made id, so a batch that is sent again after a lost
+reply is not counted twice. The best KEEP scores are kept in memory and saved to
+a JSON file a few times a minute, off the event loop.
+
+Run it locally as a stand-in for the shared service:
+
+    python leaderboard.py --port 8765 --data assets/files/leaderboard.json
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import signal
+from collections import OrderedDict
+
+HOST, PORT = "127.0.0.1", 8765
+KEEP = 1000  # Best scores kept
+SEEN_IDS = 100000  # Recent submission ids remembered to drop repeats
+SAVE_INTERVAL = 5.0  # Seconds between saves of a changed board
+MAX_NAME = 32
+MAX_LINE = 1 << 20
+
+
+class Leaderboard:
+    """
+    The best scores submitted so far.
+    """
+    def __init__(self, keep=KEEP):
+        """
+        Args:
+            keep (int, optional): Number of best scores kept. Defaults to KEEP.
+        """
+        self.keep = keep
+        self.heap = []  # (score, order, name), smallest first
+        self.seen = OrderedDict()  # Recent ids, oldest first
+        self.submitted = 0
+        self.changed = False
+
+    def submit(self, entries):
+        """
+        Add scores, skipping ids that were already submitted.
+        Args:
+            entries (list): Dicts with "id", "name" and "score".
+        Returns:
+            int: Number of new scores.
+        Raises:
+            ValueError: If an entry is malformed. No entry of the batch is added then.
+        """
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get("id"), str):
+                raise ValueError("every score needs a string id")
+            score, name = entry.get("score"), entry.get("name")
+            if not isinstance(score, int) or isinstance(score, bool) or score < 0:
+                raise ValueError(f"invalid score: {score!r}")
+            if not isinstance(name, str) or not 0 < len(name) <= MAX_NAME:
+                raise ValueError(f"invalid name: {name!r}")
+        accepted = 0
+        for entry in entries:
+            if entry["id"] in self.seen:
+                continue
+            self.seen[entry["id"]] = None
+            if len(self.seen) > SEEN_IDS:
+                self.seen.popitem(last=False)
+            self.submitted += 1
+            accepted += 1
+            item = (entry["score"], -self.submitted, entry["name"])  # Earlier scores win ties
+            if len(self.heap) < self.keep:
+                heapq.heappush(self.heap, item)
+            elif item > self.heap[0]:
+                heapq.heapreplace(self.heap, item)
+        self.changed = self.changed or accepted > 0
+        return accepted
+
+    def top(self, n):
+        """
+        Args:
+            n (int): Number of scores.
+        Returns:
+            list: [name, score] pairs, best first.
+        """
+        return [[name, score] for score, _, name in heapq.nlargest(n, self.heap)]
+
+    def to_json(self):
+        """
+        Returns:
+            dict: The board, for save().
+        """
+        return {"submitted": self.submitted, "top": self.top(self.keep)}
+
+    def load(self, path):
+        """
+        Restore a board written by save(). Does nothing if the file does not exist.
+        """
+        if not os.path.exists(path):
+            return
+        with open(path) as file:
+            data = json.load(file)
+        self.submitted = data["submitted"]
+        self.heap = [(score, -i, name) for i, (name, score) in enumerate(data["top"])]
+        heapq.heapify(self.heap)
+
+
+def save(data, path):
+    """
+    Write a board to a JSON file, replacing the old one in one step.
+    """
+    with open(path + ".tmp", "w") as file:
+        json.dump(data, file)
+    os.replace(path + ".tmp", path)
+
+
+def handle_request(board, request):
+    """
+    Answer one request.
+    Args:
+        board (Leaderboard): The board.
+        request: The decoded request line.
+    Returns:
+        dict: The reply.
+    """
+    if not isinstance(request, dict):
+        return {"ok": False, "error": "request must be an object"}
+    op = request.get("op")
+    try:
+        if op == "submit":
+            scores = request.get("scores")
+            if not isinstance(scores, list):
+                raise ValueError("scores must be a list")
+            return {"ok": True, "accepted": board.submit(scores)}
+        if op == "top":
+            n = request.get("n", 10)
+            if not isinstance(n, int) or not 0 < n <= board.keep:
+                raise ValueError(f"n must be between 1 and {board.keep}")
+            return {"ok": True, "top": board.top(n), "submitted": board.submitted}
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": False, "error": f"unknown op: {op!r}"}
+
+
+async def serve_client(board, reader, writer):
+    """
+    Answer requests from one connection until it closes.
+    """
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                reply = handle_request(board, json.loads(line))
+            except json.JSONDecodeError:
+                reply = {"ok": False, "error": "invalid JSON"}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+        # ValueError: a line longer than MAX_LINE
+        pass
+    except asyncio.CancelledError:
+        # The service is stopping; end quietly instead of logging every open connection
+        pass
+    finally:
+        writer.close()
+
+
+async def save_periodically(board, path):
+    """
+    Save the board whenever it changed, every SAVE_INTERVAL seconds.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(SAVE_INTERVAL)
+        if board.changed:
+            board.changed = False
+            await loop.run_in_executor(None, save, board.to_json(), path)
+
+
+async def start(board, host=HOST, port=PORT):
+    """
+    Start serving a board.
+    Args:
+        board (Leaderboard): The board.
+        host (str, optional): Address to listen on. Defaults to HOST.
+        port (int, optional): Port to listen on, 0 for any free one. Defaults to PORT.
+    Returns:
+        asyncio.Server: The started server.
+    """
+    return await asyncio.start_server(lambda r, w: serve_client(board, r, w), host, port, limit=MAX_LINE)
+
+
+async def run(host, port, path):
+    """
+    Serve until cancelled, saving to path if given.
+    """
+    board = Leaderboard()
+    if path:
+        board.load(path)
+    server = await start(board, host, port)
+    print(f"Leaderboard listening on {host}:{server.sockets[0].getsockname()[1]}", flush=True)
+    saver = asyncio.create_task(save_periodically(board, path)) if path else None
+    try:
+        # Stop like on Ctrl+C, so the board is saved
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # Windows
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if saver:
+            saver.cancel()
+            save(board.to_json(), path)
+
+
+def main():
+    """
+    Run the leaderboard service.
+    """
+    parser = argparse.ArgumentParser(description="Shared leaderboard service for the tank game.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--data", help="JSON file to keep the board in across restarts")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.host, args.port, args.data))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Background score submission to the shared leaderboard (see leaderboard.py).
+
+A ScoreClient runs its own asyncio event loop on a daemon thread. submit() only
+hands the score to that loop, so it never blocks a frame; the loop collects
+scores into batches, sends them over one kept-open connection, and retries with
+exponential backoff while the service is unreachable, holding at most
+MAX_PENDING scores. After every batch, and every REFRESH_INTERVAL seconds, it
+fetches the top scores into a cache that the home page reads with top().
+
+Set LEADERBOARD to the service's address to turn it on:
+
+    LEADERBOARD=127.0.0.1:8765 python main.py
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+import uuid
+from collections import deque
+
+TOP_N = 5
+BATCH_SIZE = 100
+BATCH_WAIT = 0.2  # Seconds to wait for more scores before sending a batch
+MAX_PENDING = 10000  # Unsent scores kept while the service is down; the oldest are dropped
+REFRESH_INTERVAL = 30.0
+REQUEST_TIMEOUT = 5.0
+RETRY_MIN, RETRY_MAX = 0.5, 30.0
+CLOSE_TIMEOUT = 1.0  # Seconds close() waits for the last scores to go out
+RETRYABLE = (OSError, asyncio.TimeoutError, ValueError)
+
+
+class ScoreClient:
+    """
+    Submits scores and caches the leaderboard's top scores, off the calling thread.
+    """
+    def __init__(self, host, port, name, top_n=TOP_N, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT,
+                 max_pending=MAX_PENDING):
+        """
+        Args:
+            host (str): Address of the leaderboard service.
+            port (int): Its port.
+            name (str): Name shown next to this game's scores.
+            top_n (int, optional): Number of top scores to cache. Defaults to TOP_N.
+            batch_size (int, optional): Maximum scores per request. Defaults to BATCH_SIZE.
+            batch_wait (float, optional): Seconds to collect a batch. Defaults to BATCH_WAIT.
+            max_pending (int, optional): Maximum unsent scores. Defaults to MAX_PENDING.
+        """
+        self.host, self.port, self.name = host, port, name
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_pending = max_pending
+        self.sent = 0
+        self.dropped = 0  # Scores given up on: over max_pending, or rejected by the service
+        self.connected = False
+        self._top = []
+        self._pending = deque()  # submit() appends from the game's thread; everything else runs on the client's
+        self._wake_scheduled = False
+        self._reader = self._writer = None
+        self._closing = False
+        self._loop = asyncio.new_event_loop()
+        self._wake = None  # Created by _run(), on the client's loop
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                        name="score-client", daemon=True)
+        self._thread.start()
+
+    def submit(self, score):
+        """
+        Queue a score for the leaderboard. Returns at once.
+        Args:
+            score (int): The score.
+        """
+        if not self._closing:
+            self._pending.append({"id": uuid.uuid4().hex, "name": self.name, "score": int(score)})
+            # Wake the client's thread once per burst, not once per score
+            if not self._wake_scheduled:
+                self._wake_scheduled = True
+                self._loop.call_soon_threadsafe(self._scores_queued)
+
+    def top(self):
+        """
+        Returns:
+            list: The cached [name, score] pairs, best first; empty until the first fetch.
+        """
+        return self._top
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """
+        Send the scores still queued, if the service answers in time, and stop.
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to CLOSE_TIMEOUT.
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self._loop.call_soon_threadsafe(self._notify)
+        self._thread.join(timeout)
+
+    def _scores_queued(self):
+        self._wake_scheduled = False
+        self._trim()
+        self._notify()
+
+    def _notify(self):
+        # Callbacks can run before _run() has started; it checks for scores and closing first
+        if self._wake is not None:
+            self._wake.set()
+
+    def _trim(self):
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+
+    async def _sleep(self, seconds):
+        """
+        Sleep, waking early when a score is queued or the client is closed.
+        """
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), max(seconds, 0))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        # Before Python 3.10 an Event belongs to the loop current where it is made
+        self._wake = asyncio.Event()
+        backoff = RETRY_MIN
+        refresh_at = 0.0
+        while not self._closing:
+            if not self._pending:
+                await self._sleep(refresh_at - loop.time())
+                if self._pending:
+                    # Let a burst of scores share one request
+                    await asyncio.sleep(self.batch_wait)
+            try:
+                if self._pending:
+                    await self._send_batch()
+                    refresh_at = 0.0  # Show the new scores
+                elif loop.time() >= refresh_at:
+                    reply = await self._request({"op": "top", "n": self.top_n})
+                    self._top = reply.get("top", self._top)
+                    refresh_at = loop.time() + REFRESH_INTERVAL
+                self.connected = True
+                backoff = RETRY_MIN
+            except RETRYABLE:
+                self.connected = False
+                await self._sleep(backoff)
+                backoff = min(backoff * 2, RETRY_MAX)
+        try:
+            while self._pending:
+                await self._send_batch()
+        except RETRYABLE:
+            pass
+        finally:
+            self._disconnect()
+
+    async def _send_batch(self):
+        """
+        Send the oldest queued scores. They go back to the front of the queue if sending fails.
+        """
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        try:
+            reply = await self._request({"op": "submit", "scores": batch})
+        except BaseException:
+            self._pending.extendleft(reversed(batch))
+            self._trim()
+            raise
+        if reply.get("ok"):
+            self.sent += len(batch)
+        else:
+            # The service refuses the batch itself; sending it again would not help
+            self.dropped += len(batch)
+
+    async def _request(self, request):
+        """
+        Send one request over the open connection, connecting first if needed.
+        Returns:
+            dict: The reply.
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                                REQUEST_TIMEOUT)
+        try:
+            self._writer.write(json.dumps(request).encode() + b"\n")
+            await self._writer.drain()
+            line = await asyncio.wait_for(self._reader.readline(), REQUEST_TIMEOUT)
+            if not line:
+                raise ConnectionError("the leaderboard closed the connection")
+            return json.loads(line)
+        except BaseException:
+            # A reply may still be on its way; never read it as the answer to the next request
+            self._disconnect()
+            raise
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def from_environment():
+    """
+    Build a client from the LEADERBOARD ("host:port") and LEADERBOARD_NAME environment
+    variables. The name defaults to the machine's host name.
+    Returns:
+        ScoreClient: The client, or None if LEADERBOARD is not set.
+    """
+    address = os.environ.get("LEADERBOARD")
+    if not address:
+        return None
+    host, _, port = address.rpartition(":")
+    name = os.environ.get("LEADERBOARD_NAME") or socket.gethostname()
+    return ScoreClient(host or "127.0.0.1", int(port), name[:32])
@@ -0,0 +1,104 @@
+"""
+Shared sprite cache for the tank game.
+
+Every image is loaded from disk once, and every scaled or rotated variant is
+built once, no matter how many entities use it. Entities refer to sprites by
+integer id; id 0 means "draw nothing". preload() decodes images on a background
+thread ahead of their first use, so startup does not wait for them.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+IMAGE_DIR = "assets/images/"
+
+_surfaces = [None]  # Sprite id -> Surface
+_ids = {}  # (name, size, angle), or (None, size, color) for solid sprites -> sprite id
+_decoded = {}  # File name -> Future of the decoded image, from preload()
+_loader = None
+
+
+def preload(names):
+    """
+    Start decoding images on a background thread, in order.
+    Args:
+        names (list): File names in assets/images.
+    """
+    global _loader
+    if _loader is None:
+        _loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sprites")
+    for name in names:
+        if name not in _decoded:
+            _decoded[name] = _loader.submit(pygame.image.load, IMAGE_DIR + name)
+
+
+def preloaded():
+    """
+    Returns:
+        bool: True once every image passed to preload() has been decoded.
+    """
+    return all(future.done() for future in _decoded.values())
+
+
+def sprite_id(name, size=None, angle=0):
+    """
+    Get the id of a sprite, loading and transforming the image the first time.
+    Args:
+        name (str): File name in assets/images.
+        size (tuple, optional): (width, height) to scale to. Defaults to the image's own size.
+        angle (int, optional): Rotation in degrees, counter-clockwise. Defaults to 0.
+    Returns:
+        int: The sprite id.
+    """
+    key = (name, size, angle)
+    if key not in _ids:
+        future = _decoded.get(name)
+        # Waits if the image is still being decoded in the background
+        surface = future.result() if future is not None else pygame.image.load(IMAGE_DIR + name)
+        if size is not None and surface.get_size() != tuple(size):
+            surface = pygame.transform.scale(surface, size)
+        if angle:
+            surface = pygame.transform.rotate(surface, angle)
+        if pygame.display.get_surface() is not None:
+            # Match the screen's pixel format once instead of on every blit
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+        _ids[key] = len(_surfaces)
+        _surfaces.append(surface)
+    return _ids[key]
+
+
+def solid(size, color):
+    """
+    Get the id of a plain rectangle sprite, e.g. for particles.
+    Args:
+        size (tuple): (width, height).
+        color (tuple): RGB colour.
+    Returns:
+        int: The sprite id.
+    """
+    key = (None, size, color)
+    if key not in _ids:
+        surface = pygame.Surface(size)
+        surface.fill(color)
+        _ids[key] = len(_surfaces)
+        _surfaces.append(surface)
+    return _ids[key]
+
+
+def load(name, size=None, angle=0):
+    """
+    Get a cached sprite Surface. Takes the same arguments as sprite_id().
+    Returns:
+        pygame.Surface: The sprite. Do not draw on it, it is shared.
+    """
+    return _surfaces[sprite_id(name, size, angle)]
+
+
+def surface(sprite):
+    """
+    Args:
+        sprite (int): A sprite id.
+    Returns:
+        pygame.Surface: The sprite, or None for id 0.
+    """
+    return _surfaces[sprite]
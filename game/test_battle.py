@@ -0,0 +1,29 @@
+"""
+Checks of the damage rules in ecs.py and battle.py.
+"""
+import numpy as np
+
+from battle import Battle
+from ecs import ARCHETYPES, BOSS, BOSS_BULLET, ENEMY, ENEMY_BULLET, MINE, World, fire
+
+
+def test_bullets_carry_shooter_damage():
+    world = World(seed=0)
+    shooters = np.concatenate([world.spawn(ENEMY, 100, 100), world.spawn(BOSS, 300, 50)])
+    world.weapon.cooldown[shooters] = 0
+    bullets = fire(world)
+    damage = dict(zip(world.kind[bullets].tolist(), world.weapon.damage[bullets].tolist()))
+    assert damage == {ENEMY_BULLET: ARCHETYPES[ENEMY]["damage"], BOSS_BULLET: ARCHETYPES[BOSS]["damage"]}
+
+
+def test_enemy_bullet_hit_lowers_player_hp():
+    battle = Battle("playerTank.png", hp=100, seed=0)
+    world = battle.world
+    t = world.transform
+    world.despawn(world.ids(ENEMY, MINE))
+    # One tank right above the player, about to fire
+    enemy = world.spawn(ENEMY, t.x[battle.player], t.y[battle.player] - 150, vx=0, vy=0)
+    world.weapon.cooldown[enemy] = 0
+    for _ in range(20):
+        battle.step()
+    assert battle.hp == 100 - ARCHETYPES[ENEMY]["damage"]
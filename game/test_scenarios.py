@@ -0,0 +1,26 @@
+"""
+The benchScenarios.py regression checks as pytest tests, one per scenario.
+
+Allocations, peak entity counts and player damage are compared with
+baselines/scenarios.json. Tick times depend on the machine, so they are only
+checked by running benchScenarios.py itself.
+"""
+import json
+
+import pytest
+
+from benchScenarios import BASELINE, SCENARIOS, TICKS, compare, measure
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    with open(BASELINE) as file:
+        return json.load(file)
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_scenario_matches_baseline(name, screen, baseline):
+    result = measure(name, screen, TICKS)
+    assert compare({name: result}, baseline, time_threshold=None) == []
+    if name != "menu idle":
+        assert result["player_damage"] > 0
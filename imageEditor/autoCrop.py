@@ -0,0 +1,243 @@
+"""
+Automatic crop suggestions, computed on a small proxy of the image.
+
+The proxy is taken with strided slicing, so it reads about 512 x 512 pixels
+whatever the image size, and is then shrunk to at most 256 pixels per side.
+On the proxy:
+- "Trim borders" removes uniform borders around the picture. Each edge found on the
+  proxy is then refined at full resolution, within two proxy pixels of where it was found.
+- "Subject" boxes the salient part of the image, found with the spectral residual method.
+- The aspect-ratio crops are the largest crops of that shape centered on the subject.
+All rectangles are mapped back to full-resolution pixels with imageCore's
+canvas/image mapping, treating the proxy as a canvas with the image drawn at
+the proxy's scale. No GUI is needed, so batchProcess uses the same code.
+"""
+import cv2
+import numpy as np
+
+import imageCore
+
+PROXY_SIZE = 256
+REFINE_SAMPLES = PROXY_SIZE  # Pixels sampled along each full-resolution row or column when refining edges
+ASPECT_RATIOS = {"1:1": 1.0, "4:3": 4 / 3, "3:2": 3 / 2, "16:9": 16 / 9}
+KINDS = ["Trim borders", "Subject"] + list(ASPECT_RATIOS)
+
+
+def proxy(img, size=PROXY_SIZE):
+    """
+    Make a small copy of an image cheaply.
+    Args:
+        img: The image (numpy array).
+        size (int, optional): Longest side of the proxy. Defaults to PROXY_SIZE.
+    Returns:
+        tuple: (proxy image, scale from full resolution to the proxy).
+    """
+    h, w = img.shape[:2]
+    scale = min(1.0, size / max(w, h))
+    # Strided slicing first, so only about (2 * size)^2 pixels are ever read
+    step = max(1, int(1 / scale) // 2)
+    sampled = img[::step, ::step]
+    small_w, small_h = max(1, round(w * scale)), max(1, round(h * scale))
+    return cv2.resize(sampled, (small_w, small_h), interpolation=cv2.INTER_AREA), scale
+
+
+def border_colour(small):
+    """
+    Returns:
+        numpy.ndarray: The median colour of the image's outermost pixels.
+    """
+    perimeter = np.concatenate([small[0], small[-1], small[:, 0], small[:, -1]])
+    return np.median(perimeter, axis=0)
+
+
+def content_mask(pixels, colour, tolerance):
+    """
+    Returns:
+        numpy.ndarray: True where a pixel differs from the border colour by more than tolerance.
+    """
+    # An integer colour keeps the difference in int16; a float one would make it float64
+    colour = np.round(colour).astype(np.int16)
+    return np.abs(pixels.astype(np.int16) - colour).max(axis=2) > tolerance
+
+
+def trim_borders(small, tolerance=12, min_fraction=0.02):
+    """
+    Find the rectangle inside uniform borders.
+    Args:
+        small: The proxy image (numpy array, RGB).
+        tolerance (int, optional): Largest channel difference from the border colour
+            still counted as border. Defaults to 12.
+        min_fraction (float, optional): Share of non-border pixels a row or column
+            needs to count as content. Defaults to 0.02.
+    Returns:
+        Tuple (x0, y0, x1, y1) in proxy pixels, or None if there is no border or no content.
+    """
+    h, w = small.shape[:2]
+    content = content_mask(small, border_colour(small), tolerance)
+    rows = np.flatnonzero(content.mean(axis=1) > min_fraction)
+    cols = np.flatnonzero(content.mean(axis=0) > min_fraction)
+    if not len(rows) or not len(cols):
+        return None
+    rect = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+    return None if rect == (0, 0, w, h) else rect
+
+
+def refine_borders(img, rect, colour, band, tolerance=12, min_fraction=0.02):
+    """
+    Move the edges of a trim rectangle found on the proxy to the exact full-resolution
+    rows and columns where content starts. Each edge is searched only within `band`
+    pixels of its proxy estimate, and rows and columns are sampled at about
+    REFINE_SAMPLES pixels along their length, so the cost does not grow with the image.
+    Args:
+        img: The full-resolution image (numpy array, RGB).
+        rect: Tuple (x0, y0, x1, y1) from the proxy, in full-resolution pixels.
+        colour: The border colour.
+        band (int): Search distance on each side of an edge, in full-resolution pixels.
+        tolerance (int, optional): As for trim_borders(). Defaults to 12.
+        min_fraction (float, optional): As for trim_borders(). Defaults to 0.02.
+    Returns:
+        Tuple (x0, y0, x1, y1) in full-resolution pixels. An edge without content in
+        its band keeps its proxy estimate.
+    """
+    h, w = img.shape[:2]
+    x0, y0, x1, y1 = rect
+    step_x = max(1, (x1 - x0) // REFINE_SAMPLES)
+    step_y = max(1, (y1 - y0) // REFINE_SAMPLES)
+
+    def content_lines(lo, hi, axis):
+        # Indices in [lo, hi) of the rows (axis 0) or columns (axis 1) that hold content
+        if axis == 0:
+            pixels = img[lo:hi, x0:x1:step_x]
+        else:
+            pixels = img[y0:y1:step_y, lo:hi]
+        found = content_mask(pixels, colour, tolerance).mean(axis=1 - axis) > min_fraction
+        return lo + np.flatnonzero(found)
+
+    top = content_lines(max(0, y0 - band), min(h, y0 + band), 0)
+    bottom = content_lines(max(0, y1 - band), min(h, y1 + band), 0)
+    left = content_lines(max(0, x0 - band), min(w, x0 + band), 1)
+    right = content_lines(max(0, x1 - band), min(w, x1 + band), 1)
+    return (int(left[0]) if len(left) else x0, int(top[0]) if len(top) else y0,
+            int(right[-1]) + 1 if len(right) else x1, int(bottom[-1]) + 1 if len(bottom) else y1)
+
+
+def saliency_map(small):
+    """
+    Spectral residual saliency (Hou and Zhang, 2007).
+    Args:
+        small: The proxy image (numpy array, RGB).
+    Returns:
+        Saliency per proxy pixel (numpy array, float32, same height and width).
+    """
+    h, w = small.shape[:2]
+    gray = cv2.resize(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY), (64, 64), interpolation=cv2.INTER_AREA)
+    spectrum = np.fft.fft2(gray.astype(np.float32))
+    log_amplitude = np.log(np.abs(spectrum) + 1e-8).astype(np.float32)
+    residual = log_amplitude - cv2.blur(log_amplitude, (3, 3))
+    saliency = np.abs(np.fft.ifft2(np.exp(residual + 1j * np.angle(spectrum)))) ** 2
+    saliency = cv2.GaussianBlur(saliency.astype(np.float32), (0, 0), 3)
+    # Keep only clearly salient parts, as in the paper: above three times the mean
+    saliency[saliency < 3 * saliency.mean()] = 0
+    return cv2.resize(saliency, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def subject_box(saliency, coverage=0.8):
+    """
+    Find the box holding most of the saliency, and its centroid.
+    Args:
+        saliency: Saliency map (numpy array).
+        coverage (float, optional): Share of the saliency along each axis the box keeps.
+            Defaults to 0.8.
+    Returns:
+        tuple: ((x0, y0, x1, y1), (cx, cy)) in saliency map pixels.
+    """
+    tail = (1 - coverage) / 2
+    bounds, centre = [], []
+    for axis in (0, 1):
+        profile = saliency.sum(axis=axis)
+        total = profile.sum()
+        if total <= 0:
+            bounds.append((0, len(profile)))
+            centre.append(len(profile) / 2)
+            continue
+        cumulative = np.cumsum(profile) / total
+        lo = int(np.searchsorted(cumulative, tail))
+        hi = int(np.searchsorted(cumulative, 1 - tail)) + 1
+        bounds.append((lo, max(lo + 1, min(len(profile), hi))))
+        centre.append(float(profile @ np.arange(len(profile)) / total) + 0.5)
+    (x0, x1), (y0, y1) = bounds
+    return (x0, y0, x1, y1), tuple(centre)
+
+
+def aspect_crop(area, ratio, centre):
+    """
+    The largest rectangle with a given aspect ratio inside an area, as close to centered
+    on a point as the area allows.
+    Args:
+        area: Tuple (x0, y0, x1, y1) the crop must stay inside.
+        ratio (float): Width / height of the crop.
+        centre: Tuple (cx, cy) to center on.
+    Returns:
+        Tuple (x0, y0, x1, y1).
+    """
+    ax0, ay0, ax1, ay1 = area
+    w, h = ax1 - ax0, ay1 - ay0
+    if w / h > ratio:
+        crop_w, crop_h = max(1, round(h * ratio)), h
+    else:
+        crop_w, crop_h = w, max(1, round(w / ratio))
+    cx, cy = centre
+    x0 = int(min(max(ax0, round(cx - crop_w / 2)), ax1 - crop_w))
+    y0 = int(min(max(ay0, round(cy - crop_h / 2)), ay1 - crop_h))
+    return x0, y0, x0 + crop_w, y0 + crop_h
+
+
+def suggestions(img, kinds=KINDS):
+    """
+    Propose crop rectangles for an image.
+    Args:
+        img: The image (numpy array, RGB).
+        kinds (list, optional): Which suggestions to compute, from KINDS. Defaults to all.
+    Returns:
+        dict: Kind -> (x0, y0, x1, y1) in full-resolution pixels, or None where there is
+        nothing to suggest (an image without borders has no "Trim borders" crop).
+    """
+    h, w = img.shape[:2]
+    small, scale = proxy(img)
+    small_h, small_w = small.shape[:2]
+
+    def to_full(rect):
+        # The proxy plays the canvas: the image is drawn at `scale` with no offset
+        x0, y0, x1, y1 = imageCore.canvas_to_image_rect(rect, (0, 0), scale, img.shape)
+        # Snap edges that touch the proxy edge, which rounding could leave a pixel short
+        return (x0, y0, w if rect[2] >= small_w else x1, h if rect[3] >= small_h else y1)
+
+    result = {}
+    trimmed = trim_borders(small)
+    trimmed_full = None
+    if trimmed:
+        # Sampling and area averaging put the proxy's edges up to two proxy pixels off
+        band = int(np.ceil(2 / scale)) + 2
+        trimmed_full = refine_borders(img, to_full(trimmed), border_colour(small), band)
+        if trimmed_full == (0, 0, w, h):
+            trimmed, trimmed_full = None, None
+    if "Trim borders" in kinds:
+        result["Trim borders"] = trimmed_full
+    if not any(kind in kinds for kind in ["Subject"] + list(ASPECT_RATIOS)):
+        return result
+    area = trimmed or (0, 0, small_w, small_h)
+    # Look for the subject a little inside the trimmed edges so leftover border pixels do not count
+    ax0, ay0, ax1, ay1 = area
+    if trimmed and ax1 - ax0 > 8 and ay1 - ay0 > 8:
+        ax0, ay0, ax1, ay1 = ax0 + 2, ay0 + 2, ax1 - 2, ay1 - 2
+    box, (cx, cy) = subject_box(saliency_map(small[ay0:ay1, ax0:ax1]))
+    if "Subject" in kinds:
+        result["Subject"] = to_full((box[0] + ax0, box[1] + ay0, box[2] + ax0, box[3] + ay0))
+    # Aspect crops are laid out at full resolution so their ratio is exact
+    full_area = trimmed_full or to_full(area)
+    centre = ((cx + ax0) / scale, (cy + ay0) / scale)
+    portrait = full_area[3] - full_area[1] > full_area[2] - full_area[0]
+    for name, ratio in ASPECT_RATIOS.items():
+        if name in kinds:
+            result[name] = aspect_crop(full_area, 1 / ratio if portrait else ratio, centre)
+    return result
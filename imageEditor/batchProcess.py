@@ -0,0 +1,275 @@
+"""
+Headless batch crop/resize using the same image operations as the editor.
+
+Examples:
+    python batchProcess.py photos/ -o out/ --crop 100 50 900 650 --scale 0.5
+    python batchProcess.py jobs.csv -o out/ --workers 8 --max-worker-mem 2048
+    python batchProcess.py scans/ -o out/ --auto-crop "Trim borders"
+
+A manifest is a CSV file with a header row. Recognised columns are
+path, x0, y0, x1, y1, scale and output; empty cells fall back to the
+command-line defaults. Relative paths are resolved against the manifest's folder.
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+
+import autoCrop
+import imageCore
+import tiledExec
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class Job:
+    """
+    One image to process: where to read it, what to do to it, and where to write it.
+    """
+    __slots__ = ("src", "dst", "crop", "scale")
+
+    def __init__(self, src, dst, crop=None, scale=1.0):
+        """
+        Args:
+            src (str): Input image path.
+            dst (str): Output image path.
+            crop (tuple or str, optional): (x0, y0, x1, y1) crop rectangle in source pixels,
+                or the name of an autoCrop suggestion to compute per image.
+            scale (float, optional): Scale factor applied after cropping. Defaults to 1.0.
+        """
+        self.src = src
+        self.dst = dst
+        self.crop = crop
+        self.scale = scale
+
+
+def jobs_from_directory(directory, out_dir, crop, scale, recursive=False):
+    """
+    Yield a job for every image file in a directory.
+    Args:
+        directory (str): Folder to scan.
+        out_dir (str): Output folder; the relative layout under `directory` is kept.
+        crop (tuple or str): Default crop rectangle or autoCrop suggestion name, or None.
+        scale (float): Default scale factor.
+        recursive (bool, optional): Also scan sub-folders. Defaults to False.
+    """
+    for root, dirs, files in os.walk(directory):
+        if not recursive:
+            dirs.clear()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                src = os.path.join(root, name)
+                dst = os.path.join(out_dir, os.path.relpath(src, directory))
+                yield Job(src, dst, crop, scale)
+
+
+def jobs_from_manifest(manifest, out_dir, crop, scale):
+    """
+    Yield a job for every row of a CSV manifest.
+    Args:
+        manifest (str): Path to the CSV file.
+        out_dir (str): Output folder used when a row has no `output` column.
+        crop (tuple or str): Default crop rectangle or autoCrop suggestion name, or None.
+        scale (float): Default scale factor.
+    Raises:
+        ValueError: If a row has no path or only some of the crop columns.
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, newline="") as file:
+        for line_no, row in enumerate(csv.DictReader(file), start=2):
+            path = (row.get("path") or "").strip()
+            if not path:
+                raise ValueError(f"{manifest}:{line_no}: missing path")
+            src = os.path.join(base, path)
+            corners = [(row.get(k) or "").strip() for k in ("x0", "y0", "x1", "y1")]
+            if all(corners):
+                row_crop = tuple(int(v) for v in corners)
+            elif any(corners):
+                raise ValueError(f"{manifest}:{line_no}: crop needs all of x0, y0, x1, y1")
+            else:
+                row_crop = crop
+            row_scale = float(row["scale"]) if (row.get("scale") or "").strip() else scale
+            output = (row.get("output") or "").strip()
+            dst = os.path.join(out_dir, output or os.path.basename(path))
+            yield Job(src, dst, row_crop, row_scale)
+
+
+def collect_jobs(inputs, out_dir, crop, scale, recursive=False):
+    """
+    Expand directories and manifest files from the command line into jobs.
+    Args:
+        inputs (list): Directories, CSV manifests or single image files.
+        out_dir (str): Output folder.
+        crop (tuple or str): Default crop rectangle or autoCrop suggestion name, or None.
+        scale (float): Default scale factor.
+        recursive (bool, optional): Scan directories recursively. Defaults to False.
+    Returns:
+        list: The jobs to run.
+    Raises:
+        ValueError: If an input is neither a directory, a manifest nor an image.
+    """
+    jobs = []
+    for item in inputs:
+        if os.path.isdir(item):
+            jobs.extend(jobs_from_directory(item, out_dir, crop, scale, recursive))
+        elif item.lower().endswith(".csv"):
+            jobs.extend(jobs_from_manifest(item, out_dir, crop, scale))
+        elif item.lower().endswith(IMAGE_EXTENSIONS):
+            jobs.append(Job(item, os.path.join(out_dir, os.path.basename(item)), crop, scale))
+        else:
+            raise ValueError(f"Not a directory, manifest or image: {item}")
+    return jobs
+
+
+def process_job(job):
+    """
+    Load, crop, resize and save one image. Runs inside a worker process.
+    Args:
+        job (Job): The job to run.
+    Returns:
+        tuple: (source path, megapixels read, error message or None).
+    """
+    try:
+        img = imageCore.load_image(job.src)
+        megapixels = img.shape[0] * img.shape[1] / 1e6
+        rect = job.crop
+        if isinstance(rect, str):
+            rect = autoCrop.suggestions(img, [rect])[rect]
+        if rect is not None:
+            img = imageCore.crop(img, rect)
+        if job.scale != 1.0:
+            # imageCore.resize picks the interpolation, as in the editor: INTER_AREA when
+            # shrinking, INTER_LINEAR when enlarging
+            img = imageCore.resize(img, job.scale)
+        os.makedirs(os.path.dirname(job.dst) or ".", exist_ok=True)
+        imageCore.save_image(img, job.dst)
+        return job.src, megapixels, None
+    except (ValueError, MemoryError, OSError, cv2.error) as e:
+        # OSError: e.g. no permission to create the output folder or write the file
+        return job.src, 0.0, f"{type(e).__name__}: {e}"
+
+
+def init_worker(max_mem_mb):
+    """
+    Limit a worker process before it starts taking jobs.
+    Args:
+        max_mem_mb (int): Address-space cap in megabytes, or 0 for no cap.
+    """
+    # One OpenCV thread and no tile pool per worker; the process pool provides the parallelism
+    cv2.setNumThreads(1)
+    tiledExec.configure(workers=1)
+    if max_mem_mb:
+        try:
+            import resource
+        except ImportError:  # Not available on Windows
+            return
+        limit = max_mem_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run(jobs, workers, max_mem_mb=0, tasks_per_worker=200, progress=None):
+    """
+    Run jobs across a process pool.
+    Args:
+        jobs (list): The jobs to run.
+        workers (int): Number of worker processes.
+        max_mem_mb (int, optional): Per-worker address-space cap in MB, 0 for none. Defaults to 0.
+        tasks_per_worker (int, optional): Recycle a worker after this many images so
+            fragmentation cannot build up. Defaults to 200.
+        progress (callable, optional): Called with each (src, megapixels, error) result.
+    Returns:
+        dict: Counts, elapsed seconds, images/sec, megapixels/sec and the failures.
+    """
+    start = time.perf_counter()
+    done = megapixels = 0
+    failures = []
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(max_mem_mb,),
+                              maxtasksperchild=tasks_per_worker) as pool:
+        # Unordered results with chunksize 1 keep at most one decoded image per worker alive
+        for result in pool.imap_unordered(process_job, jobs, chunksize=1):
+            src, mp, error = result
+            if error:
+                failures.append((src, error))
+            else:
+                done += 1
+                megapixels += mp
+            if progress:
+                progress(result)
+    elapsed = time.perf_counter() - start
+    return {
+        "processed": done,
+        "failed": len(failures),
+        "seconds": elapsed,
+        "images_per_sec": done / elapsed if elapsed else 0.0,
+        "megapixels_per_sec": megapixels / elapsed if elapsed else 0.0,
+        "failures": failures,
+    }
+
+
+def parse_args(argv=None):
+    """
+    Parse and validate the command-line arguments.
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv[1:].
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Batch crop and resize images without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="directories, CSV manifests or image files")
+    parser.add_argument("-o", "--output", required=True, help="output folder")
+    parser.add_argument("--crop", nargs=4, type=int, metavar=("X0", "Y0", "X1", "Y1"),
+                        help="crop rectangle in source pixels")
+    parser.add_argument("--auto-crop", choices=autoCrop.KINDS, metavar="KIND",
+                        help="crop each image to this automatic suggestion: " + ", ".join(autoCrop.KINDS))
+    parser.add_argument("--scale", type=float, default=1.0, help="scale factor applied after cropping")
+    parser.add_argument("-r", "--recursive", action="store_true", help="scan directories recursively")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--max-worker-mem", type=int, default=0, metavar="MB",
+                        help="address-space cap per worker in MB (default: no cap)")
+    parser.add_argument("--tasks-per-worker", type=int, default=200,
+                        help="restart each worker after this many images (default: 200)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+    if args.crop and args.auto_crop:
+        parser.error("--crop and --auto-crop cannot be combined")
+    if args.scale <= 0:
+        parser.error("--scale must be positive")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv=None):
+    """
+    Entry point for the batch command line.
+    Returns:
+        int: Process exit code, 1 if any image failed.
+    """
+    args = parse_args(argv)
+    crop = tuple(args.crop) if args.crop else args.auto_crop
+    try:
+        jobs = collect_jobs(args.inputs, args.output, crop, args.scale, args.recursive)
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    def progress(result):
+        src, _, error = result
+        if error:
+            print(f"FAILED {src}: {error}", file=sys.stderr)
+        elif not args.quiet:
+            print(src)
+
+    stats = run(jobs, args.workers, args.max_worker_mem, args.tasks_per_worker, progress)
+    print(f"Processed {stats['processed']} images ({stats['failed']} failed) in {stats['seconds']:.2f}s: "
+          f"{stats['images_per_sec']:.1f} images/sec, {stats['megapixels_per_sec']:.1f} MP/sec")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Frames/sec micro-benchmark for pushing 600x400 frames to a Tk canvas.
+
+Compares the old display path (new PIL image, new PhotoImage and a new
+canvas item per frame) with CanvasImage, which pastes into one persistent
+PhotoImage. Each frame is followed by update_idletasks() so Tk really redraws.
+Needs a display.
+
+Example:
+    python benchDisplay.py --frames 300
+"""
+import argparse
+import sys
+import time
+import tkinter as tk
+
+import numpy as np
+from PIL import Image, ImageTk
+
+from canvasImage import CanvasImage
+
+WIDTH, HEIGHT = 600, 400
+
+
+def make_frames(count, channels):
+    """
+    Build a few distinct random frames to cycle through.
+    Args:
+        count (int): Number of frames.
+        channels (int): 3 for RGB or 4 for RGBA.
+    Returns:
+        list: The frames (numpy arrays).
+    """
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (HEIGHT, WIDTH, channels), dtype=np.uint8) for _ in range(count)]
+    if channels == 4:
+        for frame in frames:
+            frame[:, :, 3] = 255
+    return frames
+
+
+def legacy_path(root, canvas, frames, n):
+    """
+    The display_image implementation before CanvasImage.
+    Args:
+        root (tk.Tk): The Tk root, used to flush redraws.
+        canvas (tk.Canvas): The canvas to draw on.
+        frames (list): Frames to cycle through.
+        n (int): Number of frames to show.
+    """
+    keep = None
+    for i in range(n):
+        image = Image.fromarray(frames[i % len(frames)])
+        keep = ImageTk.PhotoImage(image)
+        canvas.delete("all")
+        canvas.create_image(0, 0, anchor='nw', image=keep)
+        root.update_idletasks()
+
+
+def persistent_path(root, canvas, frames, n):
+    """
+    One persistent canvas item and PhotoImage, pixels pasted in place.
+    Args:
+        root (tk.Tk): The Tk root, used to flush redraws.
+        canvas (tk.Canvas): The canvas to draw on.
+        frames (list): Frames to cycle through.
+        n (int): Number of frames to show.
+    """
+    display = CanvasImage(canvas)
+    for i in range(n):
+        display.show(frames[i % len(frames)])
+        root.update_idletasks()
+
+
+def time_path(name, path, root, canvas, frames, n):
+    """
+    Time one display path and print its frame rate.
+    Args:
+        name (str): Label for the output line.
+        path (callable): legacy_path or persistent_path.
+        root, canvas, frames, n: Passed to `path`.
+    Returns:
+        float: Frames per second.
+    """
+    path(root, canvas, frames, 5)  # Warm-up
+    start = time.perf_counter()
+    path(root, canvas, frames, n)
+    fps = n / (time.perf_counter() - start)
+    print(f"{name:<28}{fps:>8.1f} frames/sec")
+    canvas.delete("all")
+    return fps
+
+
+def main():
+    """
+    Run each display path and print frames/sec.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark 600x400 frame updates on a Tk canvas.")
+    parser.add_argument("--frames", type=int, default=300, help="frames per measurement")
+    args = parser.parse_args()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Cannot open a display: {e}", file=sys.stderr)
+        return 1
+    canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT)
+    canvas.pack()
+    root.update()
+
+    rgb, rgba = make_frames(4, 3), make_frames(4, 4)
+    legacy = time_path("legacy (fromarray + new)", legacy_path, root, canvas, rgb, args.frames)
+    time_path("persistent, RGB input", persistent_path, root, canvas, rgb, args.frames)
+    fast = time_path("persistent, RGBA input", persistent_path, root, canvas, rgba, args.frames)
+    print(f"speedup: {fast / legacy:.2f}x")
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
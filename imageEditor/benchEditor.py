@@ -0,0 +1,311 @@
+"""
+Benchmark suite for the image editor's code paths.
+
+Each image size runs in its own process, so peak RSS is measured per size.
+The operations timed are the ones ImageEditorApp runs, called headlessly through
+the same modules: opening a file, the fitted view, crop, undo, slider resize,
+zooming to 400%, converting a frame for Tk and saving. The Tk conversion is
+skipped when there is no display.
+
+Examples:
+    python benchEditor.py --sizes 1 12 50 --output results.json
+    python benchEditor.py --save-baseline baseline.json
+    python benchEditor.py --baseline baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+import imageCore
+from editGraph import Crop, EditGraph, Resize
+from imageCache import DecodeCache
+from viewport import Viewport
+
+DEFAULT_SIZES = [1, 12, 50, 100, 200]
+# Differences smaller than this are treated as noise when comparing with a baseline
+MIN_REGRESSION_SECONDS = 0.002
+
+
+def synthetic_image(megapixels, seed=0):
+    """
+    Build a smooth random RGB image of roughly the given size with a 3:2 aspect ratio.
+    Upscaling a small random image keeps generation cheap even at 200 MP.
+    Args:
+        megapixels (float): Target size in megapixels.
+        seed (int, optional): Random seed. Defaults to 0.
+    Returns:
+        The image (numpy array, uint8).
+    """
+    h = max(2, int((megapixels * 1e6 / 1.5) ** 0.5))
+    w = max(2, int(h * 1.5))
+    small = np.random.default_rng(seed).integers(0, 256, (64, 96, 3), dtype=np.uint8)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def timed(fn, repeat, setup=None):
+    """
+    Time a function several times and return the median.
+    Args:
+        fn (callable): Called with the result of `setup`, or with no arguments.
+        repeat (int): Number of timed runs.
+        setup (callable, optional): Untimed preparation run before each call.
+    Returns:
+        float: Median wall time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state) if setup else fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def peak_rss_mb():
+    """
+    Returns:
+        float: Peak resident set size of this process in MB, or None if unavailable.
+    """
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def tk_conversion(frame, repeat):
+    """
+    Time pasting a frame into a persistent PhotoImage, if a display is available.
+    Args:
+        frame: An RGBA frame (numpy array).
+        repeat (int): Number of timed runs.
+    Returns:
+        float: Median seconds, or None without a display.
+    """
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    from canvasImage import CanvasImage
+    canvas = tk.Canvas(root, width=frame.shape[1], height=frame.shape[0])
+    canvas.pack()
+    display = CanvasImage(canvas)
+    display.show(frame)
+
+    def convert():
+        display.show(frame)
+        root.update_idletasks()
+    result = timed(convert, repeat)
+    root.destroy()
+    return result
+
+
+def run_size(megapixels, repeat, save_format):
+    """
+    Time every editor operation on one synthetic image.
+    Args:
+        megapixels (float): Image size.
+        repeat (int): Timed runs per operation.
+        save_format (str): File extension used for the save benchmark.
+    Returns:
+        dict: Operation name -> median seconds, plus image size and peak RSS.
+    """
+    img = synthetic_image(megapixels)
+    h, w = img.shape[:2]
+    crop_rect = (w // 4, h // 4, 3 * w // 4, 3 * h // 4)
+    results = {"width": w, "height": h}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "source.jpg")
+        imageCore.save_image(img, path)
+        del img
+        cache = DecodeCache(workers=1)
+        view = Viewport(600, 400, workers=1)
+
+        def show(graph, keep_view=False):
+            view.set_source(graph.sampler, graph.output_size(), keep_view)
+            return view.render_now()
+
+        results["load"] = timed(lambda: imageCore.load_image(path), repeat)
+        # What opening a file costs in the editor: decode, pyramid and thumbnail
+        results["open"] = timed(lambda: cache.decode(path), repeat)
+        entry = cache.decode(path)
+
+        def fresh_graph(*ops):
+            graph = EditGraph(entry.image, pyramid=entry.pyramid)
+            for op in ops:
+                graph.push(op)
+            return graph
+
+        results["fit_view"] = timed(lambda graph: show(graph), repeat, setup=fresh_graph)
+
+        def crop(graph):
+            graph.push(Crop(crop_rect))
+            show(graph)
+        results["crop"] = timed(crop, repeat, setup=fresh_graph)
+
+        def undo(graph):
+            graph.pop(graph.find(Resize))
+            graph.pop(graph.find(Crop))
+            show(graph)
+        results["undo"] = timed(undo, repeat, setup=lambda: fresh_graph(Crop(crop_rect), Resize(1.5)))
+
+        scales = np.linspace(0.3, 2.0, 10)
+
+        def slider(graph):
+            for scale in scales:
+                index = graph.find(Resize)
+                if index is None:
+                    graph.push(Resize(scale))
+                else:
+                    graph.replace(index, Resize(scale))
+                show(graph, keep_view=True)
+        # Reported per slider tick
+        results["slider_tick"] = timed(slider, repeat, setup=lambda: fresh_graph(Crop(crop_rect))) / len(scales)
+
+        def zoom(graph):
+            show(graph)
+            view.zoom_at(4.0 / view.zoom, 300, 200)
+            view.render_now()
+        results["zoom_400"] = timed(zoom, repeat, setup=fresh_graph)
+
+        frame = show(fresh_graph())
+        results["tk_convert"] = tk_conversion(frame.copy(), repeat)
+
+        out_path = os.path.join(tmp, "saved." + save_format)
+        results["save"] = timed(lambda graph: imageCore.save_image(graph.export(), out_path), repeat,
+                                setup=lambda: fresh_graph(Crop(crop_rect), Resize(0.5)))
+        view.shutdown()
+        cache.shutdown()
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def run_suite(sizes, repeat, save_format):
+    """
+    Run every size in a separate process.
+    Args:
+        sizes (list): Image sizes in megapixels.
+        repeat (int): Timed runs per operation.
+        save_format (str): File extension used for the save benchmark.
+    Returns:
+        dict: Machine description and per-size results.
+    """
+    report = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count(), "opencv": cv2.__version__, "numpy": np.__version__},
+        "repeat": repeat,
+        "results": {},
+    }
+    for mp in sizes:
+        print(f"{mp:g} MP ...", file=sys.stderr)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", str(mp),
+                               "--repeat", str(repeat), "--save-format", save_format],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            report["results"][f"{mp:g}"] = {"error": proc.stderr.strip().splitlines()[-1:]}
+            continue
+        report["results"][f"{mp:g}"] = json.loads(proc.stdout)
+    return report
+
+
+def compare(report, baseline, threshold):
+    """
+    Find operations that got slower (or used more memory) than the baseline allows.
+    Args:
+        report (dict): Current results from run_suite.
+        baseline (dict): Earlier results from run_suite.
+        threshold (float): Allowed relative increase, e.g. 0.2 for 20%.
+    Returns:
+        list: (size, metric, baseline value, current value) for each regression.
+    """
+    regressions = []
+    for size, base in baseline.get("results", {}).items():
+        current = report["results"].get(size)
+        if not current or "error" in base or "error" in current:
+            continue
+        for metric, old in base.items():
+            new = current.get(metric)
+            if metric in ("width", "height") or old is None or new is None:
+                continue
+            noise = 0 if metric == "peak_rss_mb" else MIN_REGRESSION_SECONDS
+            if new > old * (1 + threshold) and new - old > noise:
+                regressions.append((size, metric, old, new))
+    return regressions
+
+
+def print_report(report):
+    """
+    Print results as a table, times in milliseconds.
+    """
+    rows = [(size, r) for size, r in report["results"].items()]
+    metrics = [m for m in next((r for _, r in rows if "error" not in r), {}) if m not in ("width", "height")]
+    print(f"{'MP':>6}" + "".join(f"{m:>13}" for m in metrics))
+    for size, r in rows:
+        if "error" in r:
+            print(f"{size:>6}  failed: {' '.join(r['error'])}")
+            continue
+        cells = []
+        for m in metrics:
+            value = r.get(m)
+            if value is None:
+                cells.append(f"{'-':>13}")
+            elif m == "peak_rss_mb":
+                cells.append(f"{value:>10.0f} MB")
+            else:
+                cells.append(f"{value * 1000:>10.1f} ms")
+        print(f"{size:>6}" + "".join(cells))
+
+
+def main():
+    """
+    Entry point: run the suite, store the results and check them against a baseline.
+    Returns:
+        int: Process exit code, 1 if any regression was found.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the image editor operations.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=DEFAULT_SIZES, help="image sizes in megapixels")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per operation (median is kept)")
+    parser.add_argument("--save-format", default="png", choices=["png", "jpg", "bmp"], help="format for the save test")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the results as a new baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (default 0.2)")
+    parser.add_argument("--worker", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_size(args.worker, args.repeat, args.save_format)))
+        return 0
+
+    report = run_suite(args.sizes, args.repeat, args.save_format)
+    print_report(report)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.threshold)
+        for size, metric, old, new in regressions:
+            print(f"REGRESSION {size} MP {metric}: {old:.4g} -> {new:.4g} (+{(new / old - 1) * 100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Throughput benchmark for the editor filters, in megapixels per second.
+
+Example:
+    python benchFilters.py --sizes 1 12 48 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+import filters
+
+
+def synthetic_image(megapixels, seed=0):
+    """
+    Build a noisy gradient RGB image of roughly the given size with a 3:2 aspect ratio.
+    Args:
+        megapixels (float): Target size in megapixels.
+        seed (int, optional): Random seed. Defaults to 0.
+    Returns:
+        The image (numpy array, uint8).
+    """
+    h = max(1, int((megapixels * 1e6 / 1.5) ** 0.5))
+    w = max(1, int(h * 1.5))
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, w, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 20, (h, w, 3)).astype(np.float32)
+    return np.clip(gradient + noise, 0, 255).astype(np.uint8)
+
+
+def bench_filter(name, img, repeat):
+    """
+    Time one filter on one image with its default parameter.
+    Args:
+        name (str): A key of filters.FILTERS.
+        img: The input image (numpy array).
+        repeat (int): Number of timed runs; the best one is reported.
+    Returns:
+        float: Megapixels per second for the fastest run.
+    """
+    _, param, limits = filters.FILTERS[name]
+    params = {param: limits[2]} if param else {}
+    filters.apply(name, img, **params)  # Warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        filters.apply(name, img, **params)
+        best = min(best, time.perf_counter() - start)
+    return img.shape[0] * img.shape[1] / 1e6 / best
+
+
+def main():
+    """
+    Run every filter on synthetic images of each requested size and print a table.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark editor filters in MP/s.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1, 12, 48], help="image sizes in megapixels")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'filter':<12}" + "".join(f"{f'{mp:g} MP':>14}" for mp in args.sizes))
+    images = [synthetic_image(mp) for mp in args.sizes]
+    for name in filters.FILTERS:
+        row = [bench_filter(name, img, args.repeat) for img in images]
+        print(f"{name:<12}" + "".join(f"{mps:>9.1f} MP/s" for mps in row))
+
+
+if __name__ == "__main__":
+    main()
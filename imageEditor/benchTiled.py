@@ -0,0 +1,76 @@
+"""
+Scaling benchmark for tile-parallel resize and filters on one large image.
+
+Times each operation as a single OpenCV call and through tiledExec with an
+increasing number of workers, and prints the speedup over the single call.
+
+Example:
+    python benchTiled.py --megapixels 500 --workers 1 4 16 32 --backend thread
+"""
+import argparse
+import os
+import time
+
+import cv2
+
+import tiledExec
+from benchFilters import synthetic_image
+
+OPERATIONS = {
+    "resize 0.5x": lambda img, ex: tiledExec.resize(img, (img.shape[1] // 2, img.shape[0] // 2), executor=ex),
+    "resize 0.3x": lambda img, ex: tiledExec.resize(img, (int(img.shape[1] * 0.3), int(img.shape[0] * 0.3)),
+                                                    executor=ex),
+    "resize 1.5x": lambda img, ex: tiledExec.resize(img, (int(img.shape[1] * 1.5), int(img.shape[0] * 1.5)),
+                                                    executor=ex),
+    "Blur": lambda img, ex: tiledExec.apply_filter("Blur", img, executor=ex, radius=4.0),
+    "Sharpen": lambda img, ex: tiledExec.apply_filter("Sharpen", img, executor=ex, amount=1.0),
+    "Brightness": lambda img, ex: tiledExec.apply_filter("Brightness", img, executor=ex, brightness=30.0),
+}
+
+
+def best_time(fn, repeat):
+    """
+    Returns:
+        float: Fastest of `repeat` runs of fn(), in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """
+    Print the time of each operation and its speedup for each worker count.
+    """
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark tile-parallel image operations.")
+    parser.add_argument("--megapixels", type=float, default=100, help="image size in megapixels")
+    parser.add_argument("--workers", nargs="+", type=int,
+                        default=sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1))),
+                        help="worker counts to try")
+    parser.add_argument("--backend", default="thread", choices=["thread", "process"])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    img = synthetic_image(args.megapixels)
+    # The single call gets OpenCV's own threading, as before tiling
+    single = tiledExec.TiledExecutor(workers=1)
+    print(f"{args.megapixels:g} MP, {cpus} CPUs, OpenCV threads {cv2.getNumThreads()}, {args.backend} backend")
+    print(f"{'operation':<14}{'single':>10}" + "".join(f"{f'{n} workers':>18}" for n in args.workers))
+    for name, op in OPERATIONS.items():
+        base = best_time(lambda: op(img, single), args.repeat)
+        cells = []
+        for n in args.workers:
+            executor = tiledExec.TiledExecutor(workers=n, backend=args.backend, min_pixels=0)
+            op(img, executor)  # Warm-up: starts the pool
+            t = best_time(lambda: op(img, executor), args.repeat)
+            executor.shutdown()
+            cells.append(f"{t * 1000:>9.0f} ms {base / t:>4.1f}x")
+        print(f"{name:<14}{base * 1000:>7.0f} ms" + "".join(f"{c:>18}" for c in cells))
+
+
+if __name__ == "__main__":
+    main()
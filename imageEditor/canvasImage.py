@@ -0,0 +1,85 @@
+"""
+Persistent image item for a Tk canvas.
+
+Creating a PIL image, a new PhotoImage and a new canvas item for every frame
+allocates and copies the pixels several times. CanvasImage keeps one canvas
+item and one PhotoImage and pastes new frames into it. PIL stores RGB as four
+bytes per pixel, so only RGBA arrays can be wrapped without a copy; frames
+that are already RGBA (like Viewport frames) go straight to Tk, and RGB
+images are converted into a reused RGBA staging buffer. Tk's paste then makes
+the copies it needs. A new PhotoImage is only created when the size changes.
+"""
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+def as_pil(img):
+    """
+    Wrap an RGBA uint8 array in a PIL image that shares its memory.
+    Args:
+        img: The image (numpy array, H x W x 4, uint8, C-contiguous).
+    Returns:
+        PIL.Image.Image: A view of the array.
+    """
+    h, w = img.shape[:2]
+    return Image.frombuffer("RGBA", (w, h), img, "raw", "RGBA", 0, 1)
+
+
+class CanvasImage:
+    """
+    One image item on a canvas whose pixels are replaced in place.
+    """
+    def __init__(self, canvas, tags="frame"):
+        """
+        Args:
+            canvas (tk.Canvas): The canvas to draw on.
+            tags (str, optional): Tag for the canvas item. Defaults to "frame".
+        """
+        self.canvas = canvas
+        self.tags = tags
+        self.photo = None
+        self.item = None
+        self._staging = None
+
+    def show(self, img, x=0, y=0):
+        """
+        Display an image with its top-left corner at (x, y).
+        Args:
+            img: The image (numpy array, RGB or RGBA uint8).
+            x (int, optional): Canvas x coordinate. Defaults to 0.
+            y (int, optional): Canvas y coordinate. Defaults to 0.
+        Returns:
+            PIL.Image.Image: The RGBA PIL view that was displayed.
+        """
+        if img.shape[2] != 4 or not img.flags.c_contiguous:
+            h, w = img.shape[:2]
+            if self._staging is None or self._staging.shape[:2] != (h, w):
+                self._staging = np.empty((h, w, 4), dtype=np.uint8)
+            if img.shape[2] == 3:
+                cv2.cvtColor(img, cv2.COLOR_RGB2RGBA, dst=self._staging)
+            else:
+                np.copyto(self._staging, img)
+            img = self._staging
+        pil = as_pil(img)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != pil.size:
+            # Size changed: this is the only case that allocates a new Tk image
+            self.photo = ImageTk.PhotoImage(pil)
+            if self.item is None:
+                self.item = self.canvas.create_image(x, y, anchor='nw', image=self.photo, tags=self.tags)
+                self.canvas.tag_lower(self.item)
+            else:
+                self.canvas.itemconfig(self.item, image=self.photo)
+        else:
+            self.photo.paste(pil)
+        self.canvas.coords(self.item, x, y)
+        return pil
+
+    def clear(self):
+        """
+        Remove the canvas item and release the PhotoImage.
+        """
+        if self.item is not None:
+            self.canvas.delete(self.item)
+        self.item = None
+        self.photo = None
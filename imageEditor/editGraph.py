@@ -0,0 +1,392 @@
+"""
+Non-destructive edit graph for the image editor.
+
+Edits are stored as a list of operations on the source image. Nothing is
+computed until a result is requested; adjacent geometric operations are fused
+first (crop followed by resize becomes a single ROI resize), and every step
+of the evaluated plan is cached, so changing one operation only re-evaluates
+the steps after it. Results can be requested at a reduced resolution, in
+which case evaluation starts from a downsampled level of the source pyramid.
+"""
+import threading
+from collections import OrderedDict
+
+import imageCore
+import tiledExec
+
+
+class Crop:
+    """
+    Crop to a rectangle given in the coordinates of the operation's input.
+    """
+    def __init__(self, rect):
+        """
+        Args:
+            rect: Tuple (x0, y0, x1, y1) in full-resolution input coordinates.
+        """
+        self.rect = tuple(int(v) for v in rect)
+
+    def key(self):
+        """
+        Return a hashable description of the operation, used as its cache key.
+        """
+        return ("crop", self.rect)
+
+    def output_size(self, size):
+        """
+        Compute the full-resolution output size for a given input size.
+        Args:
+            size: Tuple (width, height) of the input.
+        Returns:
+            Tuple (width, height) of the output.
+        """
+        w, h = size
+        x0, y0, x1, y1 = self.rect
+        return min(w, x1) - max(0, x0), min(h, y1) - max(0, y0)
+
+    def apply(self, img, res):
+        """
+        Apply the operation to an image.
+        Args:
+            img: The input image (numpy array) at resolution `res`.
+            res: Resolution of `img` relative to full resolution.
+        Returns:
+            The output image (numpy array) at resolution `res`.
+        """
+        x0, y0, x1, y1 = self.rect
+        # Round outwards so the proxy never loses an edge row or column
+        rect = (int(x0 * res), int(y0 * res), max(int(x0 * res) + 1, -int(-x1 * res)),
+                max(int(y0 * res) + 1, -int(-y1 * res)))
+        return imageCore.crop(img, rect)
+
+
+class Resize:
+    """
+    Resize by a uniform scale factor.
+    """
+    def __init__(self, scale):
+        """
+        Args:
+            scale: The scale factor.
+        """
+        self.scale = float(scale)
+
+    def key(self):
+        """
+        Return a hashable description of the operation, used as its cache key.
+        """
+        return ("resize", self.scale)
+
+    def output_size(self, size):
+        """
+        Compute the full-resolution output size for a given input size.
+        """
+        w, h = size
+        return max(1, int(w * self.scale)), max(1, int(h * self.scale))
+
+    def apply(self, img, res):
+        """
+        Resize an image at any resolution; the scale factor does not depend on it.
+        """
+        return imageCore.resize(img, self.scale)
+
+
+class RoiResize:
+    """
+    A crop and a resize evaluated as one step: the region of interest is resized
+    straight out of the input without materialising the crop.
+    """
+    def __init__(self, rect, scale):
+        """
+        Args:
+            rect: Tuple (x0, y0, x1, y1) in full-resolution input coordinates.
+            scale: The scale factor applied to the region.
+        """
+        self.crop = Crop(rect)
+        self.resize = Resize(scale)
+
+    def key(self):
+        """
+        Return a hashable description of the operation, used as its cache key.
+        """
+        return ("roi_resize", self.crop.rect, self.resize.scale)
+
+    def output_size(self, size):
+        """
+        Compute the full-resolution output size for a given input size.
+        """
+        return self.resize.output_size(self.crop.output_size(size))
+
+    def apply(self, img, res):
+        """
+        Resize the region straight out of `img`, which is at resolution `res`.
+        """
+        roi = self.crop.apply(img, res)
+        # Size the output from the full-resolution geometry so proxies keep the exact aspect ratio
+        x0, y0, x1, y1 = self.crop.rect
+        w, h = self.resize.output_size((x1 - x0, y1 - y0))
+        new_size = (max(1, round(w * res)), max(1, round(h * res)))
+        if new_size == (roi.shape[1], roi.shape[0]):
+            return roi
+        return tiledExec.resize(roi, new_size)
+
+
+class Filter:
+    """
+    One of the adjustments from filters.FILTERS. Filters never change the image size.
+    """
+    def __init__(self, name, **params):
+        """
+        Args:
+            name: A key of filters.FILTERS.
+            **params: Parameters passed to the filter function.
+        """
+        self.name = name
+        self.params = params
+
+    def key(self):
+        """
+        Return a hashable description of the operation, used as its cache key.
+        """
+        return ("filter", self.name, tuple(sorted(self.params.items())))
+
+    def output_size(self, size):
+        """
+        Compute the full-resolution output size for a given input size.
+        """
+        return size
+
+    def apply(self, img, res):
+        """
+        Filter an image at resolution `res`; spatial parameters are scaled to match.
+        """
+        return tiledExec.apply_filter(self.name, img, res, **self.params)
+
+
+def fuse(ops):
+    """
+    Combine adjacent geometric operations into fewer evaluation steps.
+    Args:
+        ops: List of operations in the order they were applied.
+    Returns:
+        A new list of operations with the same result.
+    """
+    plan = []
+    for op in ops:
+        prev = plan[-1] if plan else None
+        if isinstance(op, Resize) and op.scale == 1.0:
+            continue
+        if isinstance(op, Crop) and isinstance(prev, Crop):
+            px0, py0, px1, py1 = prev.rect
+            x0, y0, x1, y1 = op.rect
+            plan[-1] = Crop((px0 + x0, py0 + y0, min(px1, px0 + x1), min(py1, py0 + y1)))
+        elif isinstance(op, Resize) and isinstance(prev, Crop):
+            plan[-1] = RoiResize(prev.rect, op.scale)
+        elif isinstance(op, Resize) and isinstance(prev, RoiResize):
+            plan[-1] = RoiResize(prev.crop.rect, prev.resize.scale * op.scale)
+        elif isinstance(op, Resize) and isinstance(prev, Resize):
+            plan[-1] = Resize(prev.scale * op.scale)
+        else:
+            plan.append(op)
+    return plan
+
+
+class Pyramid:
+    """
+    Lazily built image pyramid. Level n has half the width and height of level n - 1.
+    """
+    def __init__(self, img):
+        """
+        Args:
+            img: The full-resolution image (numpy array).
+        """
+        self.levels = [img]
+
+    def level_for(self, res):
+        """
+        Pick the smallest level that still has at least the requested resolution.
+        Args:
+            res: Requested resolution relative to full resolution.
+        Returns:
+            The level index.
+        """
+        h, w = self.levels[0].shape[:2]
+        level = 0
+        while res <= 0.5 ** (level + 1) and min(w, h) >> (level + 1) >= 1:
+            level += 1
+        return level
+
+    def level(self, n):
+        """
+        Return level n, building any missing levels.
+        Args:
+            n: The level index.
+        Returns:
+            The image (numpy array) at that level.
+        """
+        while len(self.levels) <= n:
+            prev = self.levels[-1]
+            h, w = prev.shape[:2]
+            self.levels.append(tiledExec.resize(prev, (max(1, w // 2), max(1, h // 2))))
+        return self.levels[n]
+
+
+class EditGraph:
+    """
+    An ordered list of edit operations on a source image, evaluated lazily.
+    """
+    def __init__(self, source, cache_bytes=512 * 1024 * 1024, pyramid=None):
+        """
+        Args:
+            source: The original image (numpy array). It is never modified.
+            cache_bytes (int, optional): Memory budget for cached intermediate results.
+                Defaults to 512 MB.
+            pyramid (Pyramid, optional): An already started pyramid of `source` to reuse.
+        """
+        self.source = source
+        self.pyramid = pyramid if pyramid is not None else Pyramid(source)
+        self.ops = []
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        # Guards ops, the cache and the pyramid; rendering itself runs unlocked so
+        # background tile renders do not hold up the UI thread
+        self._lock = threading.RLock()
+
+    def push(self, op):
+        """
+        Append an operation.
+        Args:
+            op: The operation to append.
+        """
+        with self._lock:
+            self.ops.append(op)
+
+    def pop(self, index=-1):
+        """
+        Remove and return an operation.
+        Args:
+            index (int, optional): Position of the operation. Defaults to the last one.
+        Returns:
+            The removed operation.
+        """
+        with self._lock:
+            return self.ops.pop(index)
+
+    def replace(self, index, op):
+        """
+        Replace an operation in place, e.g. after one of its parameters changed.
+        Args:
+            index (int): Position of the operation.
+            op: The new operation.
+        """
+        with self._lock:
+            self.ops[index] = op
+
+    def find(self, kind):
+        """
+        Find the last operation of a given type.
+        Args:
+            kind: The operation class to look for.
+        Returns:
+            The index of the operation, or None if there is none.
+        """
+        for i in range(len(self.ops) - 1, -1, -1):
+            if isinstance(self.ops[i], kind):
+                return i
+        return None
+
+    def output_size(self):
+        """
+        Compute the full-resolution size of the edited image without evaluating it.
+        Returns:
+            Tuple (width, height).
+        """
+        h, w = self.source.shape[:2]
+        size = (w, h)
+        for op in self.ops:
+            size = op.output_size(size)
+        return size
+
+    def render(self, res=1.0):
+        """
+        Evaluate the edits at a given resolution, reusing cached steps.
+        Args:
+            res (float, optional): Minimum resolution relative to full resolution. Defaults to 1.0.
+        Returns:
+            Tuple (image, actual resolution). The actual resolution is a power of two
+            no lower than `res`, or 1.0 for a full-resolution render.
+        """
+        with self._lock:
+            level = self.pyramid.level_for(res)
+            actual = 0.5 ** level
+            steps = fuse(self.ops)
+            keys = []
+            prefix = (level,)
+            for step in steps:
+                prefix = prefix + (step.key(),)
+                keys.append(prefix)
+            # Resume from the longest prefix of the plan that is already cached
+            start, img = 0, None
+            for i in range(len(keys) - 1, -1, -1):
+                if keys[i] in self._cache:
+                    self._cache.move_to_end(keys[i])
+                    start, img = i + 1, self._cache[keys[i]]
+                    break
+            if img is None:
+                img = self.pyramid.level(level)
+        for i in range(start, len(steps)):
+            img = steps[i].apply(img, actual)
+            with self._lock:
+                self._store(keys[i], img)
+        return img, actual
+
+    def sampler(self, res):
+        """
+        Find the cheapest image from which a view of the edited result can be resampled.
+        When every edit is geometric (crops and resizes) this is a level of the source
+        pyramid, so a zoomed view never evaluates the edits over the whole image.
+        Args:
+            res (float): Display pixels per full-resolution output pixel.
+        Returns:
+            Tuple (image, a, (bx, by)) where a point p in output coordinates lies at
+            a * p + b in the returned image (both in continuous pixel coordinates).
+        """
+        with self._lock:
+            steps = fuse(self.ops)
+            if all(isinstance(step, (Crop, Resize, RoiResize)) for step in steps):
+                # Compose the steps into one mapping from output to source coordinates
+                a, bx, by = 1.0, 0.0, 0.0
+                for step in steps:
+                    crop = step if isinstance(step, Crop) else getattr(step, "crop", None)
+                    resize = step if isinstance(step, Resize) else getattr(step, "resize", None)
+                    if crop is not None:
+                        bx, by = bx + a * crop.rect[0], by + a * crop.rect[1]
+                    if resize is not None:
+                        a /= resize.scale
+                level = self.pyramid.level_for(res / a)
+                img = self.pyramid.level(level)
+                level_res = 0.5 ** level
+                return img, a * level_res, (bx * level_res, by * level_res)
+        img, actual = self.render(res)
+        return img, actual, (0.0, 0.0)
+
+    def export(self):
+        """
+        Evaluate the edits at full resolution.
+        Returns:
+            The edited image (numpy array).
+        """
+        return self.render(1.0)[0]
+
+    def _store(self, key, img):
+        """
+        Add a step result to the cache, evicting the least recently used entries over budget.
+        """
+        if key in self._cache:
+            self._cached_bytes -= self._cache.pop(key).nbytes
+        self._cache[key] = img
+        self._cached_bytes += img.nbytes
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._cached_bytes -= old.nbytes
@@ -0,0 +1,155 @@
+"""
+Image adjustments for the editor, written as whole-array NumPy/OpenCV operations.
+
+Every filter takes an RGB uint8 image and returns a new RGB uint8 image of the
+same size. Spatial parameters (radii) are given in full-resolution pixels and
+scaled by `res`, so a preview rendered from a proxy looks like the export.
+"""
+import math
+
+import cv2
+import numpy as np
+
+
+def brightness_contrast(img, res=1.0, brightness=0.0, contrast=1.0):
+    """
+    Adjust brightness and contrast through a 256-entry lookup table.
+    Args:
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution (unused).
+        brightness: Value added to every channel, -255 to 255.
+        contrast: Multiplier around mid-grey, 0 and up.
+    Returns:
+        The adjusted image (numpy array).
+    """
+    lut = np.clip((np.arange(256, dtype=np.float32) - 128.0) * contrast + 128.0 + brightness, 0, 255)
+    return cv2.LUT(img, lut.astype(np.uint8))
+
+
+def grayscale(img, res=1.0):
+    """
+    Convert to grayscale, keeping three channels so later steps see the same layout.
+    Args:
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution (unused).
+    Returns:
+        The grayscale image (numpy array).
+    """
+    return cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_RGB2GRAY), cv2.COLOR_GRAY2RGB)
+
+
+def blur(img, res=1.0, radius=2.0):
+    """
+    Gaussian blur.
+    Args:
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution.
+        radius: Standard deviation of the Gaussian in full-resolution pixels.
+    Returns:
+        The blurred image (numpy array).
+    """
+    sigma = radius * res
+    if sigma < 0.1:
+        return img.copy()
+    return cv2.GaussianBlur(img, (0, 0), sigma)
+
+
+def sharpen(img, res=1.0, amount=1.0, radius=1.0):
+    """
+    Unsharp mask: add back the difference between the image and a blurred copy.
+    Args:
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution.
+        amount: Strength of the sharpening.
+        radius: Blur radius in full-resolution pixels.
+    Returns:
+        The sharpened image (numpy array).
+    """
+    blurred = cv2.GaussianBlur(img, (0, 0), max(radius * res, 0.5))
+    return cv2.addWeighted(img, 1.0 + amount, blurred, -amount, 0)
+
+
+def edges(img, res=1.0, threshold=100.0):
+    """
+    Canny edge detection, drawn white on black.
+    Args:
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution (unused).
+        threshold: Upper hysteresis threshold; the lower one is half of it.
+    Returns:
+        The edge image (numpy array).
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    return cv2.cvtColor(cv2.Canny(gray, threshold / 2, threshold), cv2.COLOR_GRAY2RGB)
+
+
+def equalize(img, res=1.0):
+    """
+    Histogram equalization of the luma channel, leaving colour untouched.
+    Args:
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution (unused).
+    Returns:
+        The equalized image (numpy array).
+    """
+    ycrcb = cv2.cvtColor(img, cv2.COLOR_RGB2YCrCb)
+    ycrcb[:, :, 0] = cv2.equalizeHist(ycrcb[:, :, 0])
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2RGB)
+
+
+# name -> (function, adjustable parameter or None, (min, max, default) for that parameter)
+FILTERS = {
+    "Brightness": (brightness_contrast, "brightness", (-100.0, 100.0, 30.0)),
+    "Contrast": (brightness_contrast, "contrast", (0.2, 3.0, 1.3)),
+    "Grayscale": (grayscale, None, None),
+    "Blur": (blur, "radius", (0.5, 20.0, 2.0)),
+    "Sharpen": (sharpen, "amount", (0.1, 3.0, 1.0)),
+    "Edges": (edges, "threshold", (20.0, 400.0, 100.0)),
+    "Equalize": (equalize, None, None),
+}
+
+
+def apply(name, img, res=1.0, **params):
+    """
+    Run a filter by its display name.
+    Args:
+        name: A key of FILTERS.
+        img: The image (numpy array).
+        res: Resolution of `img` relative to full resolution.
+        **params: Filter parameters.
+    Returns:
+        The filtered image (numpy array).
+    Raises:
+        ValueError: If the filter name is unknown.
+    """
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter: {name}")
+    return FILTERS[name][0](img, res, **params)
+
+
+def tile_halo(name, res=1.0, **params):
+    """
+    How far a filter reaches around each pixel, so it can be run on overlapping tiles.
+    Args:
+        name: A key of FILTERS.
+        res: Resolution of the image relative to full resolution.
+        **params: Filter parameters.
+    Returns:
+        int: Margin in pixels that makes tiled output identical to a single call, or None
+        if the filter depends on the whole image (edge hysteresis, histograms).
+    Raises:
+        ValueError: If the filter name is unknown.
+    """
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter: {name}")
+    func = FILTERS[name][0]
+    if func in (brightness_contrast, grayscale):
+        return 0
+    if func is blur:
+        sigma = params.get("radius", 2.0) * res
+    elif func is sharpen:
+        sigma = max(params.get("radius", 1.0) * res, 0.5)
+    else:
+        return None
+    # OpenCV sizes 8-bit Gaussian kernels to about 3 sigma on each side
+    return math.ceil(4 * sigma) + 1
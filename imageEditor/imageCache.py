@@ -0,0 +1,193 @@
+"""
+LRU cache of decoded images for browsing a folder.
+
+Each entry keeps the decoded image, its pyramid built down to display size,
+a reference thumbnail and the crop statistics, so switching to a cached image
+needs no decoding or resizing at all. The statistics tables are only built when
+a crop is first dragged, and are not counted in the budget. Neighbouring files are decoded ahead of time on a small
+thread pool; OpenCV releases the GIL while decoding and resizing. Decodes in
+flight reserve the size of the last decoded entry against the memory budget, and
+a prefetch that does not fit is skipped rather than pushing the cache over it.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+import imageCore
+from editGraph import Pyramid
+from regionStats import RegionStats
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def list_images(folder):
+    """
+    List the image files in a folder, sorted by name.
+    Args:
+        folder (str): The folder to scan.
+    Returns:
+        list: Full paths of the image files.
+    """
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+    return [os.path.join(folder, name) for name in names]
+
+
+class CachedImage:
+    """
+    A decoded image together with the display data derived from it.
+    """
+    __slots__ = ("path", "image", "pyramid", "thumbnail", "stats", "nbytes")
+
+    def __init__(self, path, image, pyramid, thumbnail, stats):
+        """
+        Args:
+            path (str): File the image was read from.
+            image: The full-resolution image (numpy array, RGB).
+            pyramid (Pyramid): Pyramid of `image`, built down to display size.
+            thumbnail: Image fitted to the reference canvas (numpy array).
+            stats (RegionStats): Statistics of any rectangle, with its tables not built yet.
+        """
+        self.path = path
+        self.image = image
+        self.pyramid = pyramid
+        self.thumbnail = thumbnail
+        self.stats = stats
+        self.nbytes = sum(level.nbytes for level in pyramid.levels) + thumbnail.nbytes
+
+
+class DecodeCache:
+    """
+    Memory-capped LRU cache of CachedImage entries with background prefetching.
+    """
+    def __init__(self, max_bytes=1024 * 1024 * 1024, display_size=(600, 400), thumb_size=(300, 200), workers=2):
+        """
+        Args:
+            max_bytes (int, optional): Memory budget for all entries. Defaults to 1 GB.
+            display_size (tuple, optional): Main canvas size the pyramid is built down to.
+            thumb_size (tuple, optional): Reference canvas size for the thumbnail.
+            workers (int, optional): Number of decode threads. Defaults to 2.
+        """
+        self.max_bytes = max_bytes
+        self.display_size = display_size
+        self.thumb_size = thumb_size
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._loading = {}
+        self._reserved = 0  # Bytes set aside for decodes in flight
+        self._estimate = 0  # Size of the last decoded entry, reserved for each new decode
+        self._lock = threading.Lock()
+
+    def decode(self, path):
+        """
+        Read an image and prepare its display data. Runs on a worker thread.
+        Args:
+            path (str): The image file.
+        Returns:
+            CachedImage: The new entry.
+        Raises:
+            ValueError: If the file cannot be decoded.
+        """
+        image = imageCore.load_image(path)
+        h, w = image.shape[:2]
+        pyramid = Pyramid(image)
+        # Build every level the fitted view will sample from, so the first frame is ready
+        pyramid.level(pyramid.level_for(imageCore.fit_scale(w, h, *self.display_size)))
+        thumb_scale = imageCore.fit_scale(w, h, *self.thumb_size)
+        source = pyramid.level(pyramid.level_for(thumb_scale))
+        thumb_w, thumb_h = max(1, int(w * thumb_scale)), max(1, int(h * thumb_scale))
+        thumbnail = cv2.resize(source, (thumb_w, thumb_h), interpolation=cv2.INTER_AREA)
+        return CachedImage(path, image, pyramid, thumbnail, RegionStats(pyramid))
+
+    def _load(self, path, reserved):
+        """
+        Decode a file and add it to the cache. Used as the worker job.
+        Args:
+            path (str): The image file.
+            reserved (int): Bytes _submit() set aside for this decode.
+        """
+        entry = None
+        try:
+            entry = self.decode(path)
+            return entry
+        finally:
+            with self._lock:
+                self._loading.pop(path, None)
+                self._reserved -= reserved
+                if entry is not None:
+                    self._entries[path] = entry
+                    self._bytes += entry.nbytes
+                    self._estimate = entry.nbytes
+                self._evict()
+
+    def _evict(self, extra=0):
+        """
+        Drop least recently used entries until the cache, the decodes in flight and
+        `extra` more bytes fit in the budget. Keeps at least one entry.
+        Returns:
+            bool: True if they fit.
+        """
+        while self._bytes + self._reserved + extra > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.nbytes
+        return self._bytes + self._reserved + extra <= self.max_bytes
+
+    def _submit(self, path, prefetch=False):
+        """
+        Start decoding a file unless it is cached or already loading.
+        Args:
+            path (str): The image file.
+            prefetch (bool, optional): Skip the file if its decode does not fit in the budget.
+        Returns:
+            The cached entry, a Future for it, or None if a prefetch was skipped.
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+                return entry
+            future = self._loading.get(path)
+            if future is None:
+                if not self._evict(self._estimate) and prefetch:
+                    return None
+                self._reserved += self._estimate
+                future = self._loading[path] = self.executor.submit(self._load, path, self._estimate)
+            return future
+
+    def get(self, path):
+        """
+        Return the entry for a file, waiting for it to be decoded if needed.
+        Args:
+            path (str): The image file.
+        Returns:
+            CachedImage: The entry.
+        Raises:
+            ValueError: If the file cannot be decoded.
+        """
+        result = self._submit(path)
+        return result if isinstance(result, CachedImage) else result.result()
+
+    def prefetch(self, paths):
+        """
+        Decode files in the background so a later get() returns at once. Stops at the
+        first file whose decode would not fit in the memory budget.
+        Args:
+            paths (list): Files in priority order.
+        """
+        for path in paths:
+            if self._submit(path, prefetch=True) is None:
+                break
+
+    def shutdown(self):
+        """
+        Stop the decode threads, abandoning queued prefetches.
+        """
+        # shutdown(cancel_futures=True) needs Python 3.9
+        with self._lock:
+            loading = list(self._loading.values())
+        for future in loading:
+            future.cancel()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,143 @@
+import cv2
+
+import tiledExec
+
+
+def load_image(path):
+    """
+    Read an image file from disk as an RGB array.
+    Args:
+        path: Path to the image file.
+    Returns:
+        The decoded image (numpy array, RGB order).
+    Raises:
+        ValueError: If the file cannot be decoded as an image.
+    """
+    img = cv2.imread(path)
+    if img is None:
+        raise ValueError(f"Could not read image: {path}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def save_image(img, path):
+    """
+    Write an RGB image array to disk. The format is taken from the file extension.
+    Args:
+        img: The image (numpy array, RGB order) to save.
+        path: Destination file path.
+    Raises:
+        ValueError: If the image could not be encoded or written.
+    """
+    if not cv2.imwrite(path, cv2.cvtColor(img, cv2.COLOR_RGB2BGR)):
+        raise ValueError(f"Could not write image: {path}")
+
+
+def fit_scale(w, h, max_w, max_h):
+    """
+    Compute the scale factor that fits a w x h image inside max_w x max_h without upscaling.
+    Args:
+        w: Image width.
+        h: Image height.
+        max_w: Maximum width of the target area.
+        max_h: Maximum height of the target area.
+    Returns:
+        The scale factor (float, at most 1.0).
+    """
+    return min(max_w / w, max_h / h, 1.0)
+
+
+def fit_to_canvas(img, max_w, max_h):
+    """
+    Resize an image to fit a canvas and compute the offset that centers it.
+    Args:
+        img: The image (numpy array) to fit.
+        max_w: Canvas width.
+        max_h: Canvas height.
+    Returns:
+        Tuple (resized image, scale, (offset_x, offset_y)).
+    """
+    h, w = img.shape[:2]
+    scale = fit_scale(w, h, max_w, max_h)
+    new_w, new_h = int(w * scale), int(h * scale)
+    resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    return resized, scale, ((max_w - new_w) // 2, (max_h - new_h) // 2)
+
+
+def canvas_to_image_rect(canvas_rect, offset, scale, img_shape):
+    """
+    Map a rectangle in canvas coordinates to image coordinates, clamped to the image bounds.
+    Args:
+        canvas_rect: Tuple (x0, y0, x1, y1) in canvas coordinates, in any corner order.
+        offset: Tuple (offset_x, offset_y) of the image's top-left corner on the canvas.
+        scale: Display scale of the image on the canvas.
+        img_shape: Shape of the image the rectangle is mapped into.
+    Returns:
+        Tuple (x0, y0, x1, y1) in image coordinates with x0 <= x1 and y0 <= y1.
+    """
+    cx0, cy0, cx1, cy1 = canvas_rect
+    x0, y0 = min(cx0, cx1), min(cy0, cy1)
+    x1, y1 = max(cx0, cx1), max(cy0, cy1)
+    offset_x, offset_y = offset
+    h, w = img_shape[:2]
+    img_x0 = max(0, min(w, int((x0 - offset_x) / scale)))
+    img_y0 = max(0, min(h, int((y0 - offset_y) / scale)))
+    img_x1 = max(0, min(w, int((x1 - offset_x) / scale)))
+    img_y1 = max(0, min(h, int((y1 - offset_y) / scale)))
+    return img_x0, img_y0, img_x1, img_y1
+
+
+def image_to_canvas_rect(img_rect, offset, scale):
+    """
+    Map a rectangle in image coordinates to canvas coordinates.
+    Args:
+        img_rect: Tuple (x0, y0, x1, y1) in image coordinates.
+        offset: Tuple (offset_x, offset_y) of the image's top-left corner on the canvas.
+        scale: Display scale of the image on the canvas.
+    Returns:
+        Tuple (x0, y0, x1, y1) in canvas coordinates.
+    """
+    offset_x, offset_y = offset
+    x0, y0, x1, y1 = img_rect
+    return (int(x0 * scale) + offset_x, int(y0 * scale) + offset_y,
+            int(x1 * scale) + offset_x, int(y1 * scale) + offset_y)
+
+
+def crop(img, rect):
+    """
+    Crop an image to a rectangle. The result is a view into the source array.
+    Args:
+        img: The image (numpy array) to crop.
+        rect: Tuple (x0, y0, x1, y1) in image coordinates.
+    Returns:
+        The cropped image (numpy array).
+    Raises:
+        ValueError: If the rectangle is empty after clamping to the image.
+    """
+    h, w = img.shape[:2]
+    x0, y0, x1, y1 = rect
+    x0, x1 = max(0, min(w, x0)), max(0, min(w, x1))
+    y0, y1 = max(0, min(h, y0)), max(0, min(h, y1))
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError(f"Empty crop rectangle {rect} for image of size {w} x {h}")
+    return img[y0:y1, x0:x1]
+
+
+def resize(img, scale, interpolation=None):
+    """
+    Resize an image by a uniform scale factor.
+    Args:
+        img: The image (numpy array) to resize.
+        scale: The scale factor.
+        interpolation: OpenCV interpolation flag. Defaults to cv2.INTER_AREA when
+            shrinking and cv2.INTER_LINEAR when enlarging, which large images run tile-parallel.
+    Returns:
+        The resized image (numpy array). Each side is at least one pixel.
+    """
+    h, w = img.shape[:2]
+    new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    if new_size == (w, h):
+        return img
+    if interpolation is None:
+        # Large images are split into tiles and resized in parallel
+        return tiledExec.resize(img, new_size)
+    return cv2.resize(img, new_size, interpolation=interpolation)
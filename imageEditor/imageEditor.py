@@ -1,7 +1,20 @@
-import cv2
+import os
 import tkinter as tk
 from tkinter import filedialog, ttk
-from PIL import Image, ImageTk
+
+import latencyTrace
+from lazyImport import LazyModule, warm_up
+
+# These pull in OpenCV, numpy and PIL; they are imported in the background once the window is up
+autoCrop = LazyModule("autoCrop")
+canvasImage = LazyModule("canvasImage")
+editGraph = LazyModule("editGraph")
+filters = LazyModule("filters")
+imageCache = LazyModule("imageCache")
+imageCore = LazyModule("imageCore")
+regionStats = LazyModule("regionStats")
+viewport = LazyModule("viewport")
+IMAGE_MODULES = [imageCore, editGraph, imageCache, viewport, canvasImage, filters, autoCrop, regionStats]
 
 class ImageEditorApp:
     def __init__(self, root):
@@ -14,7 +27,7 @@ class ImageEditorApp:
         self.image_frame.pack()
         self.orig_canvas = tk.Canvas(self.image_frame, width=300, height=200, cursor="cross")
         self.orig_canvas.pack(side='left', padx=5, pady=5)
-        self.canvas = tk.Canvas(self.image_frame, width=300, height=200, cursor="cross")
+        self.canvas = tk.Canvas(self.image_frame, width=600, height=400, cursor="cross")
         self.canvas.pack(side='left', padx=5, pady=5)
 
         self.slider = ttk.Scale(root, from_=0.1, to=2.0, value=1.0, orient='horizontal', command=self.resize_image)
@@ -24,35 +37,109 @@ class ImageEditorApp:
         btn_frame.pack()
 
         tk.Button(btn_frame, text="Load Image", command=self.load_image).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Open Folder", command=self.open_folder).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="< Prev", command=self.prev_image).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Next >", command=self.next_image).pack(side='left', padx=5)
         tk.Button(btn_frame, text="Save Cropped Image", command=self.save_image).pack(side='left', padx=5)
         tk.Button(btn_frame, text="Undo Crop", command=self.undo_crop).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Fit View", command=self.fit_view).pack(side='left', padx=5)
+
+        # Filter controls: pick a filter, tune its parameter, apply or undo it
+        filter_frame = tk.Frame(root)
+        filter_frame.pack(fill='x', padx=10, pady=5)
+        self.filter_choice = ttk.Combobox(filter_frame, state='readonly', width=12)
+        self.filter_choice.pack(side='left')
+        self.filter_choice.bind("<<ComboboxSelected>>", self.select_filter)
+        self.filter_slider = ttk.Scale(filter_frame, orient='horizontal', command=self.adjust_filter)
+        self.filter_slider.pack(side='left', fill='x', expand=True, padx=5)
+        tk.Button(filter_frame, text="Apply Filter", command=self.apply_filter).pack(side='left', padx=5)
+        tk.Button(filter_frame, text="Undo Filter", command=self.undo_filter).pack(side='left', padx=5)
+
+        # Automatic crop: pick a suggestion to preview it, then apply it
+        auto_frame = tk.Frame(root)
+        auto_frame.pack(fill='x', padx=10, pady=5)
+        self.auto_crop_choice = ttk.Combobox(auto_frame, state='readonly', width=12)
+        self.auto_crop_choice.pack(side='left')
+        self.auto_crop_choice.bind("<<ComboboxSelected>>", self.preview_auto_crop)
+        tk.Button(auto_frame, text="Auto Crop", command=self.auto_crop).pack(side='left', padx=5)
 
         # Data members
         self.image = None
-        self.tk_img = None
-        self.orig_tk_img = None
+        # One persistent image item per canvas; new frames are pasted into it
+        self.main_display = None
+        self.orig_display = None
         self.original_cv_img = None
         self.crop_rect = None
         self.start_x = self.start_y = 0
-        self.cropped_image = None
-        self.crop_history = []  # Stack for undoing crops
-    
+        self.graph = None  # Non-destructive list of edits on original_cv_img
+        self.reference_img = None  # original_cv_img fitted to orig_canvas
+        self.region_stats = None  # Summed-area tables of original_cv_img for live crop statistics
+        self.crop_suggestions = None  # autoCrop suggestions for original_cv_img, computed on first use
+        self.auto_crop_rect = None  # Suggestion previewed on the main canvas
+        self.image_cache = None  # Recently decoded images, shared by the folder browser
+        self.folder_files = []
+        self.folder_index = 0
+        self.viewport = None  # Zoom/pan state and tile renderer for the main canvas
+        self.poll_scheduled = False
+        self.pan_start = None
+
         self.canvas.bind("<Button-1>", self.start_crop)
         self.canvas.bind("<B1-Motion>", self.draw_crop)
         self.canvas.bind("<ButtonRelease-1>", self.end_crop)
+        # Mouse wheel zooms (Windows/macOS send <MouseWheel>, X11 sends buttons 4 and 5)
+        self.canvas.bind("<MouseWheel>", self.zoom_view)
+        self.canvas.bind("<Button-4>", self.zoom_view)
+        self.canvas.bind("<Button-5>", self.zoom_view)
+        # Right-button drag pans
+        self.canvas.bind("<ButtonPress-3>", self.start_pan)
+        self.canvas.bind("<B3-Motion>", self.pan_view)
+        # Arrow keys browse the current folder
+        self.root.bind("<Left>", lambda event: self.prev_image())
+        self.root.bind("<Right>", lambda event: self.next_image())
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         self.info_label = tk.Label(root, text="", anchor='w', justify='left')
         self.info_label.pack(fill='x', padx=10, pady=2)
 
-    def update_image_info(self, img, label=None):
+        # The window is usable now; the image libraries load in the background
+        self.modules_ready = warm_up(IMAGE_MODULES)
+        self.root.after(20, self.poll_startup)
+
+    def poll_startup(self):
+        """
+        Finish starting up once the background imports are done.
+        """
+        if self.modules_ready.is_set():
+            self.finish_startup()
+        else:
+            self.root.after(20, self.poll_startup)
+
+    def finish_startup(self):
+        """
+        Create the parts of the app that need the image libraries. Runs once, when the
+        background imports finish or when an image is opened before that, whichever is first.
+        """
+        if self.viewport is not None:
+            return
+        self.main_display = canvasImage.CanvasImage(self.canvas)
+        self.orig_display = canvasImage.CanvasImage(self.orig_canvas)
+        self.image_cache = imageCache.DecodeCache()
+        self.viewport = viewport.Viewport(600, 400)
+        self.filter_choice.config(values=list(filters.FILTERS))
+        self.filter_choice.current(0)
+        self.select_filter()
+        self.auto_crop_choice.config(values=autoCrop.KINDS)
+        self.auto_crop_choice.current(0)
+
+    def update_image_info(self, size, label=None):
         """
         Update the info label with the image size and optional label.
         Args:
-            img: The image (numpy array) to get size info from.
+            size: Tuple (width, height) of the image, or None if there is no image.
             label: Optional label to prefix the info.
         """
-        if img is not None:
-            h, w = img.shape[:2]
+        if size is not None:
+            w, h = size
             info = f"Image size: {w} x {h}"
             if label:
                 info = f"{label}: " + info
@@ -63,64 +150,191 @@ class ImageEditorApp:
     def load_image(self):
         """
         Open a file dialog to load an image, display it on both canvases, and update info.
+        The other images in the same folder can then be browsed with Prev/Next.
         """
         path = filedialog.askopenfilename(filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp")])
         if path:
-            self.original_cv_img = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
-            img = self.original_cv_img
-            h, w = img.shape[:2]
-            max_w, max_h = 600, 400
-            scale = min(max_w / w, max_h / h, 1.0)
-            new_w, new_h = int(w * scale), int(h * scale)
-            # Resize image to fit main canvas
-            resized_img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            self.display_scale = scale
-            # Calculate offset to center image on canvas
-            self.display_offset = ((max_w - new_w) // 2, (max_h - new_h) // 2)
-            self.displayed_img_shape = (new_h, new_w)
-            self.display_image(resized_img)
-            # Show original image on orig_canvas (smaller reference)
-            orig_img = self.original_cv_img
-            h, w = orig_img.shape[:2]
-            max_w, max_h = 300, 200
-            scale = min(max_w / w, max_h / h, 1.0)
-            new_w, new_h = int(w * scale), int(h * scale)
-            # Resize original for reference canvas
-            resized_orig = cv2.resize(orig_img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            self.orig_tk_img = ImageTk.PhotoImage(Image.fromarray(resized_orig))
-            self.orig_canvas.delete("all")
-            x = (300 - new_w) // 2  # Center image horizontally
-            y = (200 - new_h) // 2  # Center image vertically
-            self.orig_canvas.create_image(x, y, anchor='nw', image=self.orig_tk_img)
-            self.orig_canvas.image = self.orig_tk_img  # Prevent garbage collection of Tk image
-            self.update_image_info(self.original_cv_img, label="Original")
+            self.finish_startup()
+            path = os.path.abspath(path)
+            self.folder_files = imageCache.list_images(os.path.dirname(path))
+            self.folder_index = self.folder_files.index(path) if path in self.folder_files else 0
+            if path not in self.folder_files:
+                self.folder_files.insert(0, path)
+            self.show_folder_image()
+
+    def open_folder(self):
+        """
+        Open a folder with a directory dialog and show its first image.
+        """
+        folder = filedialog.askdirectory()
+        if folder:
+            self.finish_startup()
+            files = imageCache.list_images(folder)
+            if not files:
+                self.info_label.config(text=f"No images in {folder}")
+                return
+            self.folder_files = files
+            self.folder_index = 0
+            self.show_folder_image()
+
+    def next_image(self):
+        """
+        Show the next image in the current folder.
+        """
+        if self.folder_files:
+            self.folder_index = (self.folder_index + 1) % len(self.folder_files)
+            self.show_folder_image()
+
+    def prev_image(self):
+        """
+        Show the previous image in the current folder.
+        """
+        if self.folder_files:
+            self.folder_index = (self.folder_index - 1) % len(self.folder_files)
+            self.show_folder_image()
+
+    def show_folder_image(self):
+        """
+        Show the image at folder_index, then start decoding its neighbours in the background.
+        """
+        path = self.folder_files[self.folder_index]
+        try:
+            entry = self.image_cache.get(path)
+        except ValueError as e:
+            self.info_label.config(text=str(e))
+            self.prefetch_neighbours()
+            return
+        self.original_cv_img = entry.image
+        self.reference_img = entry.thumbnail
+        self.region_stats = entry.stats
+        self.crop_suggestions = None
+        self.auto_crop_rect = None
+        # Reuse the pyramid built while decoding so the fitted view needs no resizing
+        self.graph = editGraph.EditGraph(self.original_cv_img, pyramid=entry.pyramid)
+        # Render a preview that fits the main canvas
+        self.show_preview()
+        # Show original image on orig_canvas (smaller reference)
+        self.show_reference()
+        position = f"{os.path.basename(path)} ({self.folder_index + 1}/{len(self.folder_files)})"
+        self.update_image_info(self.graph.output_size(), label=f"{position} Original")
+        self.prefetch_neighbours()
+
+    def prefetch_neighbours(self):
+        """
+        Start decoding the files around folder_index in the background.
+        """
+        # Next first, since browsing usually moves forward
+        count = len(self.folder_files)
+        neighbours = [(self.folder_index + step) % count for step in (1, -1, 2)]
+        self.image_cache.prefetch([self.folder_files[i] for i in dict.fromkeys(neighbours) if i != self.folder_index])
+
+    def show_preview(self, keep_view=False):
+        """
+        Show the edited image on the main canvas after the edits changed.
+        Args:
+            keep_view: Keep the current zoom and pan instead of fitting the image to the canvas.
+        """
+        self.viewport.set_source(self.graph.sampler, self.graph.output_size(), keep_view)
+        self.redraw()
+
+    def redraw(self):
+        """
+        Compose the visible part of the image at the current zoom and display it.
+        The mapping used for cropping (display_scale, display_offset) refers to the edited image.
+        """
+        frame = self.viewport.compose()
+        self.display_scale = self.viewport.zoom
+        self.display_offset = self.viewport.origin
+        disp_w, disp_h = self.viewport.displayed_size()
+        self.displayed_img_shape = (disp_h, disp_w)
+        self.display_image(frame)
+        self.draw_auto_crop()
+        if self.viewport.pending() and not self.poll_scheduled:
+            self.poll_scheduled = True
+            self.root.after(15, self.poll_tiles)
+
+    def poll_tiles(self):
+        """
+        Redraw when background tile renders finish; keep polling while any are pending.
+        """
+        self.poll_scheduled = False
+        if self.viewport.take_update():
+            self.redraw()
+        elif self.viewport.pending():
+            self.poll_scheduled = True
+            self.root.after(15, self.poll_tiles)
+
+    def zoom_view(self, event):
+        """
+        Zoom the main canvas around the mouse pointer.
+        Args:
+            event: Tkinter mouse wheel event.
+        """
+        if self.graph is None:
+            return
+        zoom_in = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self.viewport.zoom_at(1.25 if zoom_in else 0.8, event.x, event.y)
+        self.redraw()
+        self.info_label.config(text=f"Zoom: {self.viewport.zoom * 100:.0f}%")
+
+    def start_pan(self, event):
+        """
+        Remember where a pan drag started.
+        Args:
+            event: Tkinter event with mouse coordinates.
+        """
+        self.pan_start = (event.x, event.y)
+
+    def pan_view(self, event):
+        """
+        Pan the main canvas while the right mouse button is dragged.
+        Args:
+            event: Tkinter event with current mouse coordinates.
+        """
+        if self.graph is None or self.pan_start is None:
+            return
+        self.viewport.pan(event.x - self.pan_start[0], event.y - self.pan_start[1])
+        self.pan_start = (event.x, event.y)
+        self.redraw()
+
+    def fit_view(self):
+        """
+        Reset zoom and pan so the whole image fits the main canvas.
+        """
+        if self.graph is not None:
+            self.viewport.fit()
+            self.redraw()
+
+    def show_reference(self):
+        """
+        Draw the original image, scaled down, on the reference canvas.
+        """
+        h, w = self.reference_img.shape[:2]
+        x, y = (300 - w) // 2, (200 - h) // 2
+        self.orig_canvas.delete("crop_rect")
+        self.orig_display.show(self.reference_img, x, y)
 
     def display_image(self, img):
         """
-        Display the given image on the main canvas, centered and scaled.
+        Display the given image on the main canvas, centered.
         Args:
             img: The image (numpy array) to display.
         """
-        self.image = Image.fromarray(img)
-        self.tk_img = ImageTk.PhotoImage(self.image)
-        self.canvas.delete("all")  # Remove previous image
-        self.canvas.config(width=600, height=400)
+        h, w = img.shape[:2]
         # Calculate coordinates to center image
-        x = (600 - self.tk_img.width()) // 2  # Center image horizontally
-        y = (400 - self.tk_img.height()) // 2  # Center image vertically
-        self.canvas.create_image(x, y, anchor='nw', image=self.tk_img)
-        self.display_offset = (x, y)
-        self.displayed_img_shape = (self.tk_img.height(), self.tk_img.width())
-        self.update_image_info(img, label="Displayed")
+        x = (600 - w) // 2  # Center image horizontally
+        y = (400 - h) // 2  # Center image vertically
+        # Pixels are pasted into the existing PhotoImage; any crop rectangle stays on top
+        self.image = self.main_display.show(img, x, y)
 
     def check_if_cropped(self):
         """
-        Check if a cropped image is currently present.
+        Check if the edits currently include a crop.
         Returns:
-            True if cropped_image exists, False otherwise.
+            True if a crop has been applied, False otherwise.
         """
-        # Only allow cropping if no cropped image is present
-        if self.cropped_image is not None:
+        # Only allow cropping if no crop is present
+        if self.graph is not None and self.graph.find(editGraph.Crop) is not None:
             return True
         return False
 
@@ -134,6 +348,12 @@ class ImageEditorApp:
         if self.check_if_cropped():
             self.info_label.config(text="Cannot crop from cropped image. Please undo first.")
             return
+        if self.region_stats is not None:
+            # Build the statistics tables once per image, only for images that get cropped
+            self.region_stats.build()
+        # A hand-drawn crop replaces any previewed suggestion
+        self.auto_crop_rect = None
+        self.draw_auto_crop()
         # Store starting coordinates for cropping
         self.start_x = event.x
         self.start_y = event.y
@@ -150,6 +370,24 @@ class ImageEditorApp:
             self.info_label.config(text="Cannot crop from cropped image. Please undo first.")
             return
         self.canvas.coords(self.crop_rect, self.start_x, self.start_y, event.x, event.y)
+        if self.region_stats is not None:
+            # Constant time per mouse move, whatever the image size
+            x0, y0, x1, y1 = rect = self.drag_rect(event)
+            stats = self.region_stats.region(rect)
+            if stats is not None:
+                self.info_label.config(text=f"Selection {x1 - x0} x {y1 - y0}: " + regionStats.describe(stats))
+
+    def drag_rect(self, event):
+        """
+        Map the rectangle dragged from (start_x, start_y) to the event position onto the original image.
+        Args:
+            event: Tkinter event with current mouse coordinates.
+        Returns:
+            Tuple (x0, y0, x1, y1) in original image coordinates, clamped to the image bounds.
+        """
+        return imageCore.canvas_to_image_rect(
+            (self.start_x, self.start_y, event.x, event.y),
+            self.display_offset, getattr(self, 'display_scale', 1.0), self.original_cv_img.shape)
 
     def draw_crop_rect_on_orig(self, crop_coords):
         """
@@ -159,17 +397,10 @@ class ImageEditorApp:
         """
         img = self.original_cv_img
         h, w = img.shape[:2]
-        max_w, max_h = 300, 200
-        scale = min(max_w / w, max_h / h, 1.0)
-        new_w, new_h = int(w * scale), int(h * scale)
-        x_offset = (max_w - new_w) // 2
-        y_offset = (max_h - new_h) // 2
+        scale = imageCore.fit_scale(w, h, 300, 200)
+        offset = ((300 - int(w * scale)) // 2, (200 - int(h * scale)) // 2)
         # Map crop_coords (original image) to orig_canvas
-        (img_x0, img_y0, img_x1, img_y1) = crop_coords
-        rect_x0 = int(img_x0 * scale) + x_offset
-        rect_y0 = int(img_y0 * scale) + y_offset
-        rect_x1 = int(img_x1 * scale) + x_offset
-        rect_y1 = int(img_y1 * scale) + y_offset
+        rect_x0, rect_y0, rect_x1, rect_y1 = imageCore.image_to_canvas_rect(crop_coords, offset, scale)
         # Draw rectangle
         self.orig_canvas.delete("crop_rect")
         self.orig_canvas.create_rectangle(rect_x0, rect_y0, rect_x1, rect_y1, outline="red", width=2, tags="crop_rect")
@@ -184,54 +415,83 @@ class ImageEditorApp:
         if self.check_if_cropped():
             self.info_label.config(text="Cannot crop from cropped image. Please undo first.")
             return
-        # Map canvas coordinates to original image coordinates
-        x0, y0 = min(self.start_x, event.x), min(self.start_y, event.y)
-        x1, y1 = max(self.start_x, event.x), max(self.start_y, event.y)
-        offset_x, offset_y = self.display_offset
-        scale = getattr(self, 'display_scale', 1.0)
-        # Adjust for offset and scale
-        img_x0 = int((x0 - offset_x) / scale)
-        img_y0 = int((y0 - offset_y) / scale)
-        img_x1 = int((x1 - offset_x) / scale)
-        img_y1 = int((y1 - offset_y) / scale)
-        # Clamp to image bounds
-        h, w = self.original_cv_img.shape[:2]
-        img_x0 = max(0, min(w, img_x0))
-        img_x1 = max(0, min(w, img_x1))
-        img_y0 = max(0, min(h, img_y0))
-        img_y1 = max(0, min(h, img_y1))
-        if self.original_cv_img is not None and img_x1 > img_x0 and img_y1 > img_y0:
-            # Save current cropped_image to history for undo
-            if self.cropped_image is not None:
-                self.crop_history.append(self.cropped_image.copy())
-            else:
-                self.crop_history.append(self.original_cv_img.copy())
-            self.cropped_image = self.original_cv_img[img_y0:img_y1, img_x0:img_x1]
-            # Show cropped image, fit to canvas
-            ch, cw = self.cropped_image.shape[:2]
-            max_w, max_h = 600, 400
-            scale = min(max_w / cw, max_h / ch, 1.0)
-            new_w, new_h = int(cw * scale), int(ch * scale)
-            resized_crop = cv2.resize(self.cropped_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            self.display_scale = scale
-            self.display_offset = ((max_w - new_w) // 2, (max_h - new_h) // 2)
-            self.displayed_img_shape = (new_h, new_w)
-            self.display_image(resized_crop)
-            # Show original image again on orig_canvas (for reference)
-            orig_img = self.original_cv_img
-            h, w = orig_img.shape[:2]
-            max_w, max_h = 300, 200
-            scale = min(max_w / w, max_h / h, 1.0)
-            new_w, new_h = int(w * scale), int(h * scale)
-            resized_orig = cv2.resize(orig_img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            self.orig_tk_img = ImageTk.PhotoImage(Image.fromarray(resized_orig))
-            self.orig_canvas.delete("all")
-            x = (300 - new_w) // 2
-            y = (200 - new_h) // 2
-            self.orig_canvas.create_image(x, y, anchor='nw', image=self.orig_tk_img)
-            self.orig_canvas.image = self.orig_tk_img  # Prevent garbage collection
-            self.draw_crop_rect_on_orig((img_x0, img_y0, img_x1, img_y1))
-            self.update_image_info(self.cropped_image, label="Cropped")
+        self.canvas.delete(self.crop_rect)
+        if self.original_cv_img is None:
+            return
+        # Map canvas coordinates to original image coordinates, clamped to image bounds
+        img_x0, img_y0, img_x1, img_y1 = self.drag_rect(event)
+        if img_x1 > img_x0 and img_y1 > img_y0:
+            self.apply_crop((img_x0, img_y0, img_x1, img_y1))
+
+    def apply_crop(self, rect):
+        """
+        Crop the image to a rectangle and display the result.
+        Args:
+            rect: Tuple (x0, y0, x1, y1) in original image coordinates.
+        """
+        # Record the crop as an edit; pixels are only computed for the preview
+        self.graph.push(editGraph.Crop(rect))
+        # Show cropped image, fit to canvas
+        self.show_preview()
+        self.draw_crop_rect_on_orig(rect)
+        self.update_image_info(self.graph.output_size(), label="Cropped")
+
+    def suggested_crop(self):
+        """
+        Look up the suggestion chosen in the auto crop combobox. Suggestions for the
+        current image are computed on a small proxy the first time one is needed.
+        Returns:
+            Tuple (x0, y0, x1, y1) in original image coordinates, or None if there is nothing to suggest.
+        """
+        if self.crop_suggestions is None:
+            self.crop_suggestions = autoCrop.suggestions(self.original_cv_img)
+        return self.crop_suggestions[self.auto_crop_choice.get()]
+
+    def preview_auto_crop(self, event=None):
+        """
+        Outline the chosen crop suggestion on the main canvas.
+        Args:
+            event: Tkinter event from the combobox (unused).
+        """
+        if self.original_cv_img is None:
+            return
+        if self.check_if_cropped():
+            self.info_label.config(text="Cannot crop from cropped image. Please undo first.")
+            return
+        kind = self.auto_crop_choice.get()
+        self.auto_crop_rect = self.suggested_crop()
+        self.draw_auto_crop()
+        if self.auto_crop_rect is None:
+            self.info_label.config(text=f"No {kind} suggestion for this image.")
+        else:
+            x0, y0, x1, y1 = self.auto_crop_rect
+            self.info_label.config(text=f"{kind} suggestion: {x1 - x0} x {y1 - y0}. Click Auto Crop to apply it.")
+
+    def draw_auto_crop(self):
+        """
+        Draw the previewed suggestion at the current zoom and pan, or remove it if there is none.
+        """
+        self.canvas.delete("auto_crop")
+        if self.auto_crop_rect is not None:
+            x0, y0, x1, y1 = imageCore.image_to_canvas_rect(self.auto_crop_rect, self.display_offset, self.display_scale)
+            self.canvas.create_rectangle(x0, y0, x1, y1, outline="yellow", dash=(4, 2), tags="auto_crop")
+
+    def auto_crop(self):
+        """
+        Apply the crop suggestion chosen in the combobox.
+        """
+        if self.original_cv_img is None:
+            return
+        if self.check_if_cropped():
+            self.info_label.config(text="Cannot crop from cropped image. Please undo first.")
+            return
+        rect = self.suggested_crop()
+        self.auto_crop_rect = None
+        if rect is None:
+            self.draw_auto_crop()
+            self.info_label.config(text=f"No {self.auto_crop_choice.get()} suggestion for this image.")
+            return
+        self.apply_crop(rect)
 
     def resize_image(self, val):
         """
@@ -239,60 +499,137 @@ class ImageEditorApp:
         Args:
             val: The scale factor from the slider (string or float).
         """
-        if self.cropped_image is not None:
-            scale = float(val)
-            height, width = self.cropped_image.shape[:2]
-            new_size = (int(width * scale), int(height * scale))
-            resized = cv2.resize(self.cropped_image, new_size, interpolation=cv2.INTER_LINEAR)
-            self.display_image(resized)
+        if self.check_if_cropped():
+            # Update the existing resize edit in place so earlier cached steps are reused
+            index = self.graph.find(editGraph.Resize)
+            if index is None:
+                self.graph.push(editGraph.Resize(float(val)))
+            else:
+                self.graph.replace(index, editGraph.Resize(float(val)))
+            self.show_preview(keep_view=True)
+            self.update_image_info(self.graph.output_size(), label="Resized")
 
     def save_image(self):
         """
-        Save the currently displayed image to a file using a file dialog.
+        Save the edited image at full resolution to a file using a file dialog.
         """
-        if self.image:
+        if self.graph is not None:
             path = filedialog.asksaveasfilename(defaultextension=".png",
                                                 filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg")])
             if path:
-                self.image.save(path)
+                try:
+                    imageCore.save_image(self.graph.export(), path)
+                except ValueError as e:
+                    self.info_label.config(text=str(e))
+
+    def select_filter(self, event=None):
+        """
+        Set up the filter slider for the filter chosen in the combobox.
+        Args:
+            event: Tkinter event from the combobox (unused).
+        """
+        _, param, limits = filters.FILTERS[self.filter_choice.get()]
+        if param is None:
+            self.filter_slider.state(['disabled'])
+        else:
+            low, high, default = limits
+            self.filter_slider.state(['!disabled'])
+            self.filter_slider.config(from_=low, to=high)
+            self.filter_slider.set(default)
+
+    def selected_filter(self):
+        """
+        Build a filter operation from the combobox and slider.
+        Returns:
+            The Filter operation.
+        """
+        name = self.filter_choice.get()
+        param = filters.FILTERS[name][1]
+        if param is None:
+            return editGraph.Filter(name)
+        return editGraph.Filter(name, **{param: float(self.filter_slider.get())})
+
+    def apply_filter(self):
+        """
+        Add the selected filter to the edits and refresh the preview.
+        """
+        if self.graph is not None:
+            op = self.selected_filter()
+            self.graph.push(op)
+            # The preview is filtered at proxy resolution; full resolution is only computed on save
+            self.show_preview(keep_view=True)
+            self.update_image_info(self.graph.output_size(), label=op.name)
+
+    def adjust_filter(self, val):
+        """
+        Update the parameter of the most recent filter while the filter slider moves.
+        Args:
+            val: The parameter value from the slider (string or float).
+        """
+        if self.graph is None or not self.graph.ops:
+            return
+        last = self.graph.ops[-1]
+        if isinstance(last, editGraph.Filter) and last.name == self.filter_choice.get() and last.params:
+            # Only the last step is re-evaluated; everything before it comes from the cache
+            self.graph.replace(len(self.graph.ops) - 1, self.selected_filter())
+            self.show_preview(keep_view=True)
+
+    def undo_filter(self):
+        """
+        Remove the most recent filter from the edits.
+        """
+        index = self.graph.find(editGraph.Filter) if self.graph is not None else None
+        if index is not None:
+            op = self.graph.pop(index)
+            self.show_preview(keep_view=True)
+            self.update_image_info(self.graph.output_size(), label=f"Undo {op.name}")
 
     def undo_crop(self):
         """
-        Undo the last crop operation and restore the previous image from history.
-        """
-        if self.crop_history:
-            self.cropped_image = self.crop_history.pop()
-            # Show the previous crop, fit to canvas
-            ch, cw = self.cropped_image.shape[:2]
-            max_w, max_h = 600, 400
-            scale = min(max_w / cw, max_h / ch, 1.0)
-            new_w, new_h = int(cw * scale), int(ch * scale)
-            resized_crop = cv2.resize(self.cropped_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
-            self.display_scale = scale
-            self.display_offset = ((max_w - new_w) // 2, (max_h - new_h) // 2)
-            self.displayed_img_shape = (new_h, new_w)
-            self.display_image(resized_crop)
-            # Show original image again on orig_canvas (for reference)
-            if self.original_cv_img is not None:
-                orig_img = self.original_cv_img
-                h, w = orig_img.shape[:2]
-                max_w, max_h = 300, 200
-                scale = min(max_w / w, max_h / h, 1.0)
-                new_w, new_h = int(w * scale), int(h * scale)
-                resized_orig = cv2.resize(orig_img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-                self.orig_tk_img = ImageTk.PhotoImage(Image.fromarray(resized_orig))
-                self.orig_canvas.delete("all")
-                x = (300 - new_w) // 2
-                y = (200 - new_h) // 2
-                self.orig_canvas.create_image(x, y, anchor='nw', image=self.orig_tk_img)
+        Undo the last crop operation and restore the previous image.
+        """
+        index = self.graph.find(editGraph.Crop) if self.graph is not None else None
+        if index is not None:
+            # Resizing only applies to crops, so it goes with the crop
+            self.graph.pop(index)
+            index = self.graph.find(editGraph.Resize)
+            while index is not None:
+                self.graph.pop(index)
+                index = self.graph.find(editGraph.Resize)
+            # Show the previous image, fit to canvas
+            self.show_preview()
             # Remove crop rectangle from original image canvas
             self.orig_canvas.delete("crop_rect")
-            self.update_image_info(self.cropped_image, label="Undo Cropped")
-            # Enable cropping again after undo
-            self.cropped_image = None if not self.crop_history else self.cropped_image
+            self.update_image_info(self.graph.output_size(), label="Undo Cropped")
+
+    def close(self):
+        """
+        Stop background rendering and close the window.
+        """
+        if self.viewport is not None:
+            self.viewport.shutdown()
+            self.image_cache.shutdown()
+        self.root.destroy()
 
 # Start the application
 if __name__ == "__main__":
+    # Opt-in handler tracing: IMAGE_EDITOR_TRACE=trace.json python imageEditor.py
+    tracer, trace_path = latencyTrace.from_environment(ImageEditorApp)
     root = tk.Tk()
     app = ImageEditorApp(root)
-    root.mainloop()
+    if tracer:
+        tracer.attach(app)
+    if os.environ.get("IMAGE_EDITOR_STARTUP_PROBE"):
+        # benchStartup.py sets this to time the first frame and the end of the background imports
+        root.wait_visibility()
+        root.update_idletasks()
+        print("first frame", flush=True)
+        app.modules_ready.wait()
+        app.finish_startup()
+        print("ready", flush=True)
+        app.close()
+    else:
+        root.mainloop()
+    if tracer:
+        tracer.export_chrome(trace_path)
+        print(tracer.format_summary())
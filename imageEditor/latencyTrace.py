@@ -0,0 +1,243 @@
+"""
+Opt-in latency tracing for ImageEditorApp event handlers.
+
+Set IMAGE_EDITOR_TRACE to an output path to turn it on:
+
+    IMAGE_EDITOR_TRACE=trace.json python imageEditor.py
+
+Handlers are wrapped on the class before the app is built, because Tk keeps
+the bound methods it was given for buttons and bindings. For every call the
+tracer records:
+- wall time of the handler itself,
+- latency from the event arriving to Tk going idle again. Tk redraws in idle
+  callbacks, so the after_idle callback queued when the handler returns runs
+  after the repaint the handler caused. For handlers called with a Tk event the
+  latency starts at the event's timestamp, so time spent waiting in Tk's queue
+  is counted; for button commands, which get no event, it starts with the handler,
+- bytes allocated, as tracemalloc's net and peak growth during the call
+  (numpy arrays are included). Set IMAGE_EDITOR_TRACE_MEMORY=0 to skip this,
+  since tracemalloc slows Python code down.
+
+A label under the info line shows p50/p95/p99 for the last handler called. On
+exit the trace is written in Chrome trace-event format (open it in
+chrome://tracing or https://ui.perfetto.dev) and a summary table is printed.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tkinter as tk
+
+TRACED_HANDLERS = ["load_image", "show_folder_image", "display_image", "start_crop", "draw_crop", "end_crop",
+                   "resize_image", "zoom_view", "pan_view", "undo_crop", "save_image"]
+HANDLER_LANE, PAINT_LANE = 1, 2
+CLOCK_RESYNC_US = 60e6  # An event this much later than expected means the event clock wrapped or was reset
+
+
+class Tracer:
+    """
+    Collects spans for wrapped methods and summarizes them.
+    """
+    def __init__(self, track_memory=True):
+        """
+        Args:
+            track_memory (bool, optional): Record allocations with tracemalloc. Defaults to True.
+        """
+        self.track_memory = track_memory
+        self.events = []
+        self.samples = {}  # Handler name -> {"wall": [...], "latency": [...], "alloc": [...]}
+        self.label = None
+        self._depth = 0
+        self._start = time.perf_counter()
+        self._clock_offset = None  # Trace clock minus event clock, in microseconds
+        if track_memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            tracemalloc.start()
+
+    def _now_us(self):
+        """
+        Microseconds since the tracer was created, the trace-event time base.
+        """
+        return (time.perf_counter() - self._start) * 1e6
+
+    def _arrival_us(self, event, now):
+        """
+        Map a Tk event's timestamp onto the trace clock.
+        Args:
+            event (tk.Event): The event.
+            now (float): Trace time when its handler started.
+        Returns:
+            float: When the event arrived, in trace microseconds.
+        """
+        # Event times are milliseconds on the windowing system's own clock. The smallest
+        # offset seen between the two clocks belongs to an event handled as soon as it
+        # arrived, so it is taken as the offset itself.
+        offset = now - event.time * 1000
+        if (self._clock_offset is None or offset < self._clock_offset
+                or offset - self._clock_offset > CLOCK_RESYNC_US):
+            self._clock_offset = offset
+        return event.time * 1000 + self._clock_offset
+
+    def instrument(self, cls, names=TRACED_HANDLERS):
+        """
+        Replace methods of a class with traced wrappers. Call before creating instances.
+        Args:
+            cls (type): The class to patch.
+            names (list, optional): Method names. Defaults to TRACED_HANDLERS.
+        """
+        for name in names:
+            setattr(cls, name, self._wrap(name, getattr(cls, name)))
+
+    def _wrap(self, name, func):
+        """
+        Build the traced version of one method.
+        """
+        @functools.wraps(func)
+        def traced(app, *args, **kwargs):
+            # Handlers run on the Tk thread; calls from other threads are not traced
+            if threading.current_thread() is not threading.main_thread():
+                return func(app, *args, **kwargs)
+            outermost = self._depth == 0
+            self._depth += 1
+            if self.track_memory:
+                if outermost and hasattr(self._tracemalloc, "reset_peak"):  # Python 3.9+
+                    self._tracemalloc.reset_peak()
+                before = self._tracemalloc.get_traced_memory()[0]
+            start = self._now_us()
+            arrival = start
+            if outermost and args and isinstance(args[0], tk.Event) and isinstance(args[0].time, int):
+                arrival = self._arrival_us(args[0], start)
+            try:
+                return func(app, *args, **kwargs)
+            finally:
+                end = self._now_us()
+                self._depth -= 1
+                event_args = {}
+                if self.track_memory:
+                    current, peak = self._tracemalloc.get_traced_memory()
+                    event_args["alloc_bytes"] = current - before
+                    if outermost:
+                        event_args["peak_bytes"] = peak - before
+                self._record(name, start, end, event_args)
+                if outermost:
+                    # Runs once Tk has processed the redraws queued by this handler
+                    app.root.after_idle(self._painted, name, arrival)
+        return traced
+
+    def _record(self, name, start, end, event_args):
+        """
+        Store one handler span.
+        """
+        self.events.append({"name": name, "cat": "handler", "ph": "X", "ts": start, "dur": end - start,
+                            "pid": os.getpid(), "tid": HANDLER_LANE, "args": event_args})
+        samples = self.samples.setdefault(name, {"wall": [], "latency": [], "alloc": []})
+        samples["wall"].append((end - start) / 1000)
+        if "peak_bytes" in event_args:
+            samples["alloc"].append(event_args["peak_bytes"])
+
+    def _painted(self, name, start):
+        """
+        after_idle callback: close the input-to-idle span of a handler, started when its event arrived.
+        """
+        end = self._now_us()
+        self.events.append({"name": f"{name} -> idle", "cat": "latency", "ph": "X", "ts": start, "dur": end - start,
+                            "pid": os.getpid(), "tid": PAINT_LANE})
+        self.samples[name]["latency"].append((end - start) / 1000)
+        if self.label is not None:
+            self.label.config(text=self.describe(name))
+
+    def attach(self, app):
+        """
+        Add the summary label to a running app, under its info label.
+        Args:
+            app (ImageEditorApp): The app.
+        """
+        self.label = tk.Label(app.root, text="Tracing handlers...", anchor='w', justify='left', fg="gray30")
+        self.label.pack(fill='x', padx=10, pady=2, after=app.info_label)
+
+    def handler_summary(self, name):
+        """
+        Percentiles for one handler.
+        Args:
+            name (str): The handler name.
+        Returns:
+            dict: "count", and "wall_ms", "latency_ms" and "peak_kb", each (p50, p95, p99)
+            or None if nothing was recorded.
+        """
+        import numpy as np  # Only needed for the summary; keeps it off the editor's startup path
+
+        def percentiles(values, scale=1.0):
+            if not values:
+                return None
+            return tuple(float(v) * scale for v in np.percentile(values, [50, 95, 99]))
+        samples = self.samples[name]
+        return {"count": len(samples["wall"]),
+                "wall_ms": percentiles(samples["wall"]),
+                "latency_ms": percentiles(samples["latency"]),
+                "peak_kb": percentiles(samples["alloc"], 1 / 1024)}
+
+    def summary(self):
+        """
+        Returns:
+            dict: Handler name -> handler_summary() for every handler that was called.
+        """
+        return {name: self.handler_summary(name) for name in self.samples}
+
+    def describe(self, name):
+        """
+        One-line percentile summary of a handler, for the label.
+        Args:
+            name (str): The handler name.
+        Returns:
+            str: The description.
+        """
+        stats = self.handler_summary(name)
+        text = f"{name} x{stats['count']}: wall p50/p95/p99 " + "/".join(f"{v:.1f}" for v in stats["wall_ms"]) + " ms"
+        if stats["latency_ms"]:
+            text += ", to idle " + "/".join(f"{v:.1f}" for v in stats["latency_ms"]) + " ms"
+        if stats["peak_kb"]:
+            text += f", peak alloc p50 {stats['peak_kb'][0]:.0f} KB"
+        return text
+
+    def format_summary(self):
+        """
+        Returns:
+            str: A table of every traced handler's percentiles.
+        """
+        lines = [f"{'handler':<20}{'calls':>6}  {'wall p50/p95/p99 ms':>24}  {'to idle p50/p95/p99 ms':>24}  "
+                 f"{'peak KB p50':>12}"]
+        for name, stats in sorted(self.summary().items()):
+            wall = "/".join(f"{v:.1f}" for v in stats["wall_ms"])
+            latency = "/".join(f"{v:.1f}" for v in stats["latency_ms"]) if stats["latency_ms"] else "-"
+            peak = f"{stats['peak_kb'][0]:.0f}" if stats["peak_kb"] else "-"
+            lines.append(f"{name:<20}{stats['count']:>6}  {wall:>24}  {latency:>24}  {peak:>12}")
+        return "\n".join(lines)
+
+    def export_chrome(self, path):
+        """
+        Write the recorded spans as Chrome trace-event JSON.
+        Args:
+            path (str): Output file.
+        """
+        lanes = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": label}}
+                 for tid, label in ((HANDLER_LANE, "handlers"), (PAINT_LANE, "input to idle"))]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": lanes + self.events, "displayTimeUnit": "ms"}, file)
+
+
+def from_environment(cls):
+    """
+    Instrument a class if IMAGE_EDITOR_TRACE is set.
+    Args:
+        cls (type): The app class, not yet instantiated.
+    Returns:
+        tuple: (Tracer, output path), or (None, None) when tracing is off.
+    """
+    path = os.environ.get("IMAGE_EDITOR_TRACE")
+    if not path:
+        return None, None
+    tracer = Tracer(track_memory=os.environ.get("IMAGE_EDITOR_TRACE_MEMORY", "1") != "0")
+    tracer.instrument(cls)
+    return tracer, path
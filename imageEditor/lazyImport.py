@@ -0,0 +1,60 @@
+"""
+Deferred imports, so the editor window can appear before the image libraries load.
+
+The editor's image modules pull in OpenCV, numpy and PIL, which take longer to
+import than Tk takes to build and show the window. A LazyModule stands in for
+such a module and imports it on first attribute access. warm_up() imports the
+modules on a background thread once the window is up, so they are normally
+loaded before the first click. If a handler needs a module that is still
+being imported, Python's import lock makes it wait for that import to finish
+instead of starting a second one.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    A module that is imported on first attribute access.
+    """
+    def __init__(self, name):
+        """
+        Args:
+            name (str): The module name, as for import_module().
+        """
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """
+        Import the module if that has not happened yet.
+        Returns:
+            module: The imported module.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def warm_up(modules):
+    """
+    Import modules on a daemon thread.
+    Args:
+        modules (list): LazyModule instances, imported in order.
+    Returns:
+        threading.Event: Set when every module has been imported.
+    """
+    done = threading.Event()
+
+    def run():
+        try:
+            for module in modules:
+                module.load()
+        finally:
+            done.set()
+
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+    return done
@@ -0,0 +1,139 @@
+"""
+Constant-time statistics for any rectangle of an image.
+
+Summed-area tables (integral images) are built on a pyramid level of bounded
+size, the first time statistics are asked for, so images that are only viewed
+never pay for them. The sum over any rectangle is then four lookups, so the
+mean, standard deviation, luminance histogram and clipped-pixel counts of the
+crop rectangle can be refreshed on every mouse move, whatever the image size.
+On large images the tables come from a downscaled level, so the standard
+deviation leaves out detail finer than one pixel of that level.
+"""
+import cv2
+import numpy as np
+
+HISTOGRAM_BINS = 16
+MAX_PIXELS = 1 << 19  # Largest pyramid level the tables are built on
+SPARK = " ▁▂▃▄▅▆▇█"
+
+
+def pyramid_level_within(pyramid, max_pixels):
+    """
+    Find the finest pyramid level with at most `max_pixels` pixels.
+    Args:
+        pyramid (Pyramid): The image pyramid.
+        max_pixels (int): Pixel budget.
+    Returns:
+        The level index.
+    """
+    h, w = pyramid.levels[0].shape[:2]
+    n = 0
+    while (w >> n) * (h >> n) > max_pixels and min(w, h) >> (n + 1) >= 1:
+        n += 1
+    return n
+
+
+def box_sum(table, x0, y0, x1, y1):
+    """
+    Sum of the source values in [x0, x1) x [y0, y1), from a summed-area table.
+    Args:
+        table: Table with one more row and column than the source (numpy array).
+        x0, y0, x1, y1 (int): The rectangle in source pixels.
+    Returns:
+        The sum per channel.
+    """
+    return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+
+class RegionStats:
+    """
+    Summed-area tables of one image, answering per-rectangle statistics in O(1).
+    """
+    def __init__(self, pyramid, max_pixels=MAX_PIXELS, bins=HISTOGRAM_BINS):
+        """
+        Args:
+            pyramid (Pyramid): Pyramid of the image (RGB uint8). Level 0 defines the
+                coordinates that region() takes.
+            max_pixels (int, optional): Pixel budget for the level the tables are built on.
+            bins (int, optional): Number of luminance histogram bins. Defaults to 16.
+        """
+        self.pyramid = pyramid
+        self.max_pixels = max_pixels
+        self.bins = bins
+        self.sums = self.squares = self.counts = None
+        self.nbytes = 0
+
+    def build(self):
+        """
+        Build the tables if they are not built yet. Call it when a crop drag starts,
+        so the first region() does not have to.
+        """
+        if self.counts is not None:
+            return
+        full_h, full_w = self.pyramid.levels[0].shape[:2]
+        img = self.pyramid.level(pyramid_level_within(self.pyramid, self.max_pixels))
+        h, w = img.shape[:2]
+        self.scale_x, self.scale_y = w / full_w, h / full_h
+        self.sums, self.squares = cv2.integral2(img, sdepth=cv2.CV_32S, sqdepth=cv2.CV_64F)
+        # Histogram bins and the dark/bright clipped flags, one plane per count,
+        # integrated one mask at a time
+        luma = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+        bin_index = (luma.astype(np.uint16) * self.bins // 256).astype(np.uint8)
+        planes = np.empty((self.bins + 2, h + 1, w + 1), dtype=np.int32)
+        mask = np.empty((h, w), dtype=bool)
+        for b in range(self.bins):
+            np.equal(bin_index, b, out=mask)
+            planes[b] = cv2.integral(mask.view(np.uint8), sdepth=cv2.CV_32S)
+        planes[self.bins] = cv2.integral((img == 0).any(axis=2).view(np.uint8), sdepth=cv2.CV_32S)
+        planes[self.bins + 1] = cv2.integral((img == 255).any(axis=2).view(np.uint8), sdepth=cv2.CV_32S)
+        # Indexed as [y, x] like the other tables, giving every count at once
+        self.counts = planes.transpose(1, 2, 0)
+        self.nbytes = self.sums.nbytes + self.squares.nbytes + planes.nbytes
+
+    def region(self, rect):
+        """
+        Statistics of a rectangle of the full-resolution image.
+        Args:
+            rect: Tuple (x0, y0, x1, y1) in full-resolution pixels.
+        Returns:
+            dict: "mean" and "std" per channel, "histogram" (fraction of pixels per
+            luminance bin), "dark" and "bright" (fraction of pixels with a channel at
+            0 or 255), or None if the rectangle is empty.
+        """
+        x0, y0, x1, y1 = rect
+        if x1 <= x0 or y1 <= y0:
+            return None
+        self.build()
+        h, w = self.counts.shape[0] - 1, self.counts.shape[1] - 1
+        # Map to table coordinates, keeping at least one pixel
+        lx0 = min(w - 1, max(0, int(x0 * self.scale_x)))
+        ly0 = min(h - 1, max(0, int(y0 * self.scale_y)))
+        lx1 = min(w, max(lx0 + 1, int(round(x1 * self.scale_x))))
+        ly1 = min(h, max(ly0 + 1, int(round(y1 * self.scale_y))))
+        n = (lx1 - lx0) * (ly1 - ly0)
+        mean = box_sum(self.sums, lx0, ly0, lx1, ly1) / n
+        var = box_sum(self.squares, lx0, ly0, lx1, ly1) / n - mean ** 2
+        counts = box_sum(self.counts, lx0, ly0, lx1, ly1) / n
+        return {
+            "mean": mean,
+            "std": np.sqrt(np.maximum(var, 0)),
+            "histogram": counts[:self.bins],
+            "dark": counts[self.bins],
+            "bright": counts[self.bins + 1],
+        }
+
+
+def describe(stats):
+    """
+    Format region statistics for a one-line label.
+    Args:
+        stats (dict): Result of RegionStats.region().
+    Returns:
+        str: The description.
+    """
+    mean = " ".join(f"{c}{v:.0f}" for c, v in zip("RGB", stats["mean"]))
+    std = " ".join(f"{c}{v:.0f}" for c, v in zip("RGB", stats["std"]))
+    peak = max(stats["histogram"].max(), 1e-9)
+    spark = "".join(SPARK[int(round(v / peak * (len(SPARK) - 1)))] for v in stats["histogram"])
+    return (f"mean {mean} | std {std} | luma [{spark}] | "
+            f"clipped {stats['dark'] * 100:.1f}% dark, {stats['bright'] * 100:.1f}% bright")
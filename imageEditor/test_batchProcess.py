@@ -0,0 +1,57 @@
+"""
+Checks of batchProcess jobs: output matches the editor's operations, and a failing
+job is reported without stopping the others.
+"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import batchProcess
+import imageCore
+from batchProcess import Job
+
+
+@pytest.fixture
+def src(tmp_path):
+    img = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    path = str(tmp_path / "in.png")
+    imageCore.save_image(img, path)
+    return path, img
+
+
+def test_job_output_matches_crop_and_resize(src, tmp_path):
+    path, img = src
+    dst = str(tmp_path / "out" / "a.png")
+    result = batchProcess.process_job(Job(path, dst, (20, 10, 220, 170), 0.5))
+    assert result == (path, 240 * 320 / 1e6, None)
+    expected = cv2.resize(img[10:170, 20:220], (100, 80), interpolation=cv2.INTER_AREA)
+    assert np.array_equal(imageCore.load_image(dst), expected)
+
+
+@pytest.mark.parametrize("problem", ["unreadable input", "empty crop", "output folder is a file"])
+def test_job_errors_are_reported(src, tmp_path, problem):
+    path, _ = src
+    dst, crop = str(tmp_path / "out.png"), None
+    if problem == "unreadable input":
+        path = str(tmp_path / "missing.png")
+    elif problem == "empty crop":
+        crop = (50, 50, 50, 90)
+    else:
+        (tmp_path / "file").write_text("")
+        dst = str(tmp_path / "file" / "out.png")
+    src_path, megapixels, error = batchProcess.process_job(Job(path, dst, crop))
+    assert (src_path, megapixels) == (path, 0.0)
+    assert error
+    assert not os.path.exists(dst)
+
+
+def test_failed_job_does_not_stop_the_batch(src, tmp_path):
+    path, img = src
+    (tmp_path / "file").write_text("")
+    jobs = [Job(path, str(tmp_path / "file" / "bad.png")), Job(path, str(tmp_path / "good.png"))]
+    stats = batchProcess.run(jobs, workers=1)
+    assert (stats["processed"], stats["failed"]) == (1, 1)
+    assert stats["failures"][0][0] == path
+    assert np.array_equal(imageCore.load_image(str(tmp_path / "good.png")), img)
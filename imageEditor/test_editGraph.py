@@ -0,0 +1,63 @@
+"""
+Checks that fused and cached EditGraph evaluation gives the same result as applying
+each edit directly with numpy and OpenCV.
+"""
+import cv2
+import numpy as np
+import pytest
+
+import filters
+from editGraph import Crop, EditGraph, Filter, Resize, RoiResize, fuse
+
+
+@pytest.fixture(scope="module")
+def img():
+    return np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+
+
+def test_fuse_combines_crops_and_resizes():
+    plan = fuse([Crop((10, 20, 400, 300)), Crop((5, 5, 100, 500)), Resize(0.5), Resize(1.0), Resize(0.5)])
+    assert [step.key() for step in plan] == [("roi_resize", (15, 25, 110, 300), 0.25)]
+    plan = fuse([Resize(0.5), Filter("Blur", radius=2.0), Resize(2.0), Resize(0.75)])
+    assert [type(step) for step in plan] == [Resize, Filter, Resize]
+    assert plan[2].scale == 1.5
+
+
+def test_crops_match_slicing(img):
+    graph = EditGraph(img)
+    graph.push(Crop((10, 20, 400, 300)))
+    graph.push(Crop((5, 5, 100, 500)))
+    out = graph.export()
+    assert np.array_equal(out, img[25:300, 15:110])
+    assert graph.output_size() == (out.shape[1], out.shape[0])
+
+
+@pytest.mark.parametrize("scale, interpolation", [(0.3, cv2.INTER_AREA), (2.5, cv2.INTER_LINEAR)])
+def test_crop_then_resize_matches_cv2(img, scale, interpolation):
+    graph = EditGraph(img)
+    graph.push(Crop((33, 41, 533, 401)))
+    graph.push(Resize(scale))
+    assert isinstance(fuse(graph.ops)[0], RoiResize)
+    expected = cv2.resize(img[41:401, 33:533], (int(500 * scale), int(360 * scale)), interpolation=interpolation)
+    assert np.array_equal(graph.export(), expected)
+
+
+def test_filter_after_crop_matches_direct_call(img):
+    graph = EditGraph(img)
+    graph.push(Crop((100, 50, 500, 350)))
+    graph.push(Filter("Sharpen", amount=1.5))
+    expected = filters.apply("Sharpen", img[50:350, 100:500], amount=1.5)
+    assert np.array_equal(graph.export(), expected)
+
+
+def test_changed_and_undone_edits_use_fresh_results(img):
+    graph = EditGraph(img)
+    graph.push(Crop((0, 0, 320, 240)))
+    graph.push(Filter("Brightness", brightness=30.0))
+    graph.export()
+    graph.replace(1, Filter("Brightness", brightness=-30.0))
+    expected = filters.apply("Brightness", img[:240, :320], brightness=-30.0)
+    assert np.array_equal(graph.export(), expected)
+    graph.pop()
+    graph.pop()
+    assert np.array_equal(graph.export(), img)
@@ -0,0 +1,56 @@
+"""
+Checks that imageCore's crop, resize and file helpers match plain numpy and OpenCV calls.
+"""
+import cv2
+import numpy as np
+import pytest
+
+import imageCore
+
+
+@pytest.fixture(scope="module")
+def img():
+    return np.random.default_rng(0).integers(0, 256, (300, 400, 3), dtype=np.uint8)
+
+
+def test_crop_is_a_clamped_view(img):
+    out = imageCore.crop(img, (-20, 50, 120, 999))
+    assert np.shares_memory(out, img)
+    assert np.array_equal(out, img[50:, :120])
+
+
+def test_empty_crop_raises(img):
+    with pytest.raises(ValueError):
+        imageCore.crop(img, (100, 100, 100, 200))
+
+
+@pytest.mark.parametrize("scale, interpolation", [(0.37, cv2.INTER_AREA), (0.5, cv2.INTER_AREA),
+                                                  (1.6, cv2.INTER_LINEAR), (3.0, cv2.INTER_LINEAR)])
+def test_resize_matches_cv2(img, scale, interpolation):
+    expected = cv2.resize(img, (int(400 * scale), int(300 * scale)), interpolation=interpolation)
+    assert np.array_equal(imageCore.resize(img, scale), expected)
+
+
+def test_resize_keeps_one_pixel(img):
+    assert imageCore.resize(img, 0.001).shape == (1, 1, 3)
+    assert imageCore.resize(img, 1.0) is img
+
+
+def test_canvas_rect_is_ordered_and_clamped():
+    rect = imageCore.canvas_to_image_rect((250, 10, 20, 180), (20, 30), 0.5, (300, 400, 3))
+    assert rect == (0, 0, 400, 300)
+    assert imageCore.canvas_to_image_rect((70, 80, 120, 130), (20, 30), 0.5, (300, 400, 3)) == (100, 100, 200, 200)
+
+
+def test_save_and_load_keep_rgb_order(img, tmp_path):
+    path = str(tmp_path / "image.png")
+    imageCore.save_image(img, path)
+    assert np.array_equal(imageCore.load_image(path), img)
+    assert np.array_equal(cv2.imread(path)[:, :, ::-1], img)
+
+
+def test_load_unreadable_file_raises(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    with pytest.raises(ValueError):
+        imageCore.load_image(str(path))
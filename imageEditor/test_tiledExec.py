@@ -0,0 +1,68 @@
+"""
+Checks that tile-parallel resizes and filters give exactly the single-call result.
+The executors split even small synthetic images, with small tiles.
+"""
+import cv2
+import numpy as np
+import pytest
+
+import filters
+import tiledExec
+from tiledExec import TiledExecutor
+
+# (input width, height) -> (output width, height): bands that line up with input rows,
+# sizes where no band can, and resizes going different ways on each axis
+RESIZES = [((1200, 900), (400, 300)), ((1000, 750), (600, 450)), ((997, 601), (401, 263)),
+           ((300, 200), (1200, 800)), ((301, 199), (700, 463)), ((400, 300), (800, 150))]
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = TiledExecutor(workers=4, tile_size=64, min_pixels=0)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture(scope="module")
+def process_executor():
+    executor = TiledExecutor(workers=2, backend="process", tile_size=64, min_pixels=0)
+    yield executor
+    executor.shutdown()
+
+
+def image(w, h, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("size, new_size", RESIZES)
+def test_resize_matches_cv2(executor, size, new_size):
+    img = image(*size)
+    interpolation = cv2.INTER_AREA if new_size[0] < size[0] else cv2.INTER_LINEAR
+    expected = cv2.resize(img, new_size, interpolation=interpolation)
+    assert np.array_equal(tiledExec.resize(img, new_size, executor), expected)
+
+
+def test_row_bands_line_up_with_input_rows():
+    for src_h, out_h in [(900, 300), (750, 450), (200, 800)]:
+        period = tiledExec.row_period(src_h, out_h)
+        bands = tiledExec.row_bands(src_h, 100, out_h, 16)
+        assert bands[0][1] == 0 and bands[-1][3] == out_h
+        assert all(y0 % period == 0 and (y0 * src_h) % out_h == 0 for _, y0, _, _ in bands)
+
+
+@pytest.mark.parametrize("name", list(filters.FILTERS))
+def test_filter_matches_single_call(executor, name):
+    img = image(300, 200)
+    _, param, spec = filters.FILTERS[name]
+    params = {param: spec[2]} if param else {}
+    for res in (1.0, 0.5):
+        expected = filters.apply(name, img, res, **params)
+        assert np.array_equal(tiledExec.apply_filter(name, img, res, executor, **params), expected)
+
+
+def test_process_backend_matches_single_call(process_executor):
+    img = image(400, 300, seed=1)
+    assert np.array_equal(tiledExec.resize(img, (600, 450), process_executor),
+                          cv2.resize(img, (600, 450), interpolation=cv2.INTER_LINEAR))
+    assert np.array_equal(tiledExec.apply_filter("Blur", img, executor=process_executor, radius=3.0),
+                          filters.apply("Blur", img, radius=3.0))
@@ -0,0 +1,338 @@
+"""
+Tile-parallel execution of image operations on one large image.
+
+The output is split into square tiles. Each tile is computed from the matching
+region of the input plus a halo wide enough for the operation's kernel, so
+tiles stitch together without seams, and is written straight into the output
+array. Two backends are available:
+- "thread" (default): tiles run on a thread pool over the same arrays. OpenCV
+  releases the GIL, so nothing is copied or pickled.
+- "process": the input and output live in multiprocessing shared memory and
+  worker processes attach to them by name. Tasks carry only the block names,
+  the tile rectangle and the operation's parameters, never pixels. Copying
+  the image into and out of shared memory costs two extra passes over it.
+
+Images below MIN_PIXELS are processed with a single call, as before.
+"""
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+import filters
+
+TILE_SIZE = 1024
+MIN_PIXELS = 16 * 1024 * 1024
+
+
+def tiles(width, height, size=TILE_SIZE):
+    """
+    Split an area into tiles.
+    Args:
+        width (int): Area width.
+        height (int): Area height.
+        size (int, optional): Tile edge. Defaults to TILE_SIZE.
+    Returns:
+        list: (x0, y0, x1, y1) rectangles covering the area.
+    """
+    return [(x, y, min(width, x + size), min(height, y + size))
+            for y in range(0, height, size) for x in range(0, width, size)]
+
+
+def row_period(src_h, out_h):
+    """
+    Returns:
+        int: Smallest number of output rows of a resize from src_h to out_h rows that spans
+        a whole number of input rows. Bands starting on multiples of it line up with input rows.
+    """
+    return out_h // math.gcd(src_h, out_h)
+
+
+def row_bands(src_h, out_w, out_h, count):
+    """
+    Split the output of a resize into full-width bands whose edges fall on whole input rows.
+    Only call it when row_period() is less than out_h; otherwise no band edge but the
+    image's own can line up.
+    Args:
+        src_h (int): Input height.
+        out_w (int): Output width.
+        out_h (int): Output height.
+        count (int): Roughly how many bands to make.
+    Returns:
+        list: (x0, y0, x1, y1) rectangles in the output.
+    """
+    period = row_period(src_h, out_h)
+    step = max(1, round(out_h / count / period)) * period
+    return [(0, y, out_w, min(out_h, y + step)) for y in range(0, out_h, step)]
+
+
+def filter_tile(src, out, rect, name, res, params, halo):
+    """
+    Filter one tile of `src` into the same rectangle of `out`.
+    Args:
+        src: The input image (numpy array).
+        out: The output image (numpy array, same size as `src`).
+        rect: Tuple (x0, y0, x1, y1) of the tile.
+        name (str): A key of filters.FILTERS.
+        res (float): Resolution passed to the filter.
+        params (dict): Filter parameters.
+        halo (int): Extra input pixels needed on each side.
+    """
+    x0, y0, x1, y1 = rect
+    h, w = src.shape[:2]
+    sx0, sy0 = max(0, x0 - halo), max(0, y0 - halo)
+    sx1, sy1 = min(w, x1 + halo), min(h, y1 + halo)
+    result = filters.FILTERS[name][0](src[sy0:sy1, sx0:sx1], res, **params)
+    out[y0:y1, x0:x1] = result[y0 - sy0:y1 - sy0, x0 - sx0:x1 - sx0]
+
+
+def shrink_tile(src, out, rect):
+    """
+    Compute one tile of `src` shrunk to the size of `out` with INTER_AREA over the tile's
+    footprint in the input. The result matches the whole-image cv2.resize only when the
+    footprint edges fall on whole input pixels, as for bands from row_bands().
+    Args:
+        src: The input image (numpy array).
+        out: The output image (numpy array, smaller than `src`).
+        rect: Tuple (x0, y0, x1, y1) of the tile in `out`.
+    """
+    x0, y0, x1, y1 = rect
+    h, w = src.shape[:2]
+    out_h, out_w = out.shape[:2]
+    kx, ky = w / out_w, h / out_h
+    region = src[round(y0 * ky):round(y1 * ky), round(x0 * kx):round(x1 * kx)]
+    out[y0:y1, x0:x1] = cv2.resize(region, (x1 - x0, y1 - y0), interpolation=cv2.INTER_AREA)
+
+
+def enlarge_band(src, out, rect, period):
+    """
+    Compute a band of full-width output rows of an enlarging resize with cv2.resize itself.
+    The band must start on a multiple of `period` rows, where output rows line up with
+    whole input rows. One period more on each side keeps cv2.resize's edge handling
+    outside the rows that are kept.
+    Args:
+        src: The input image (numpy array).
+        out: The output image (numpy array).
+        rect: Tuple (0, y0, width, y1) of the band in `out`.
+        period (int): Row alignment from row_period().
+    """
+    _, y0, _, y1 = rect
+    h, w = src.shape[:2]
+    out_h, out_w = out.shape[:2]
+    ky = h / out_h
+    start, stop = max(0, y0 - period), min(out_h, y1 + period)
+    # Given fx/fy instead of a size, cv2.resize maps pixels exactly as the whole-image call does
+    resized = cv2.resize(src[round(start * ky):round(stop * ky)], None, fx=out_w / w, fy=out_h / h,
+                         interpolation=cv2.INTER_LINEAR)
+    out[y0:y1] = resized[y0 - start:y1 - start]
+
+
+KERNELS = {"filter": filter_tile, "shrink": shrink_tile, "enlarge": enlarge_band}
+
+
+def _attach(spec):
+    """
+    Open a shared memory block described by (name, shape, dtype) as an array.
+    Returns:
+        tuple: (SharedMemory, numpy array view of it).
+    """
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _process_task(kernel, src_spec, out_spec, rect, args):
+    """
+    Run one tile inside a worker process, on arrays in shared memory.
+    """
+    src_block, src = _attach(src_spec)
+    out_block, out = _attach(out_spec)
+    try:
+        KERNELS[kernel](src, out, rect, *args)
+    finally:
+        # Views must go before the blocks can be closed
+        del src, out
+        src_block.close()
+        out_block.close()
+
+
+def _init_process():
+    """
+    Worker process initializer: the pool provides the parallelism.
+    """
+    cv2.setNumThreads(1)
+
+
+class TiledExecutor:
+    """
+    Runs tile kernels on a thread or process pool.
+    """
+    def __init__(self, workers=None, backend="thread", tile_size=TILE_SIZE, min_pixels=MIN_PIXELS):
+        """
+        Args:
+            workers (int, optional): Pool size. Defaults to the CPU count.
+            backend (str, optional): "thread" or "process". Defaults to "thread".
+            tile_size (int, optional): Tile edge in output pixels. Defaults to TILE_SIZE.
+            min_pixels (int, optional): Images smaller than this are not split. Defaults to MIN_PIXELS.
+        Raises:
+            ValueError: If the backend is unknown.
+        """
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown backend: {backend}")
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.tile_size = tile_size
+        self.min_pixels = min_pixels
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """
+        Start the pool on first use.
+        """
+        with self._lock:
+            if self._pool is None:
+                if self.backend == "thread":
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_process)
+            return self._pool
+
+    def should_tile(self, *shapes):
+        """
+        Check whether an operation on arrays of these shapes is worth splitting.
+        Args:
+            *shapes: Array shapes (height, width, ...).
+        Returns:
+            bool: True if the pool has several workers and an array is large enough.
+        """
+        return self.workers > 1 and max(s[0] * s[1] for s in shapes) >= self.min_pixels
+
+    def run(self, kernel, src, out_shape, args=(), rects=None):
+        """
+        Compute an output array tile by tile.
+        Args:
+            kernel (str): A key of KERNELS.
+            src: The input image (numpy array).
+            out_shape (tuple): Shape of the output; its dtype is the input's.
+            args (tuple, optional): Extra kernel arguments after (src, out, rect).
+            rects (list, optional): Output rectangles to use instead of square tiles.
+        Returns:
+            The output image (numpy array).
+        """
+        if rects is None:
+            rects = tiles(out_shape[1], out_shape[0], self.tile_size)
+        pool = self._get_pool()
+        if self.backend == "thread":
+            out = np.empty(out_shape, dtype=src.dtype)
+            # list() waits for every tile and re-raises the first error
+            list(pool.map(lambda rect: KERNELS[kernel](src, out, rect, *args), rects))
+            return out
+        src_block = shared_memory.SharedMemory(create=True, size=max(1, src.nbytes))
+        out_block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(out_shape)) * src.itemsize))
+        try:
+            np.ndarray(src.shape, dtype=src.dtype, buffer=src_block.buf)[...] = src
+            src_spec = (src_block.name, src.shape, src.dtype.str)
+            out_spec = (out_block.name, out_shape, src.dtype.str)
+            futures = [pool.submit(_process_task, kernel, src_spec, out_spec, rect, args) for rect in rects]
+            for future in futures:
+                future.result()
+            return np.ndarray(out_shape, dtype=src.dtype, buffer=out_block.buf).copy()
+        finally:
+            for block in (src_block, out_block):
+                block.close()
+                block.unlink()
+
+    def shutdown(self):
+        """
+        Stop the pool.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns:
+        TiledExecutor: The shared executor, created with default settings on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = TiledExecutor()
+        return _executor
+
+
+def configure(workers=None, backend="thread", tile_size=TILE_SIZE, min_pixels=MIN_PIXELS):
+    """
+    Replace the shared executor, e.g. with workers=1 inside processes that are already parallel.
+    Args:
+        See TiledExecutor.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = TiledExecutor(workers, backend, tile_size, min_pixels)
+
+
+def resize(img, new_size, executor=None):
+    """
+    Resize an image, tile-parallel when it is large. INTER_AREA is used when shrinking
+    and INTER_LINEAR when enlarging, as in imageCore.resize.
+    Args:
+        img: The image (numpy array).
+        new_size: Tuple (width, height) of the output.
+        executor (TiledExecutor, optional): Defaults to the shared executor.
+    Returns:
+        The resized image (numpy array).
+    """
+    executor = executor or get_executor()
+    new_w, new_h = new_size
+    h, w = img.shape[:2]
+    shrink = new_w < w
+    # Tiles assume both axes go the same way
+    if not executor.should_tile(img.shape, (new_h, new_w)) or shrink != (new_h < h):
+        return cv2.resize(img, new_size, interpolation=cv2.INTER_AREA if shrink else cv2.INTER_LINEAR)
+    out_shape = (new_h, new_w) + img.shape[2:]
+    # Several bands per worker keeps the pool busy when bands finish unevenly
+    count = executor.workers * 4
+    period = row_period(h, new_h)
+    if shrink and period < new_h:
+        return executor.run("shrink", img, out_shape, rects=row_bands(h, new_w, new_h, count))
+    if not shrink and period * count * 4 <= new_h:
+        return executor.run("enlarge", img, out_shape, (period,), rects=row_bands(h, new_w, new_h, count))
+    # Bands that cannot line up with input rows would not match the whole-image result;
+    # one (internally threaded) call is exact
+    return cv2.resize(img, new_size, interpolation=cv2.INTER_AREA if shrink else cv2.INTER_LINEAR)
+
+
+def apply_filter(name, img, res=1.0, executor=None, **params):
+    """
+    Run a filter, tile-parallel when the image is large and the filter is local.
+    Args:
+        name (str): A key of filters.FILTERS.
+        img: The image (numpy array).
+        res (float, optional): Resolution of `img` relative to full resolution.
+        executor (TiledExecutor, optional): Defaults to the shared executor.
+        **params: Filter parameters.
+    Returns:
+        The filtered image (numpy array).
+    Raises:
+        ValueError: If the filter name is unknown.
+    """
+    executor = executor or get_executor()
+    halo = filters.tile_halo(name, res, **params)
+    if halo is None or not executor.should_tile(img.shape):
+        return filters.apply(name, img, res, **params)
+    return executor.run("filter", img, img.shape, (name, res, params, halo))
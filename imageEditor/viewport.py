@@ -0,0 +1,315 @@
+"""
+Zoomable, pannable view of an image for a fixed-size canvas.
+
+The view is split into square tiles in display space. Each tile is resampled
+on a background thread from the cheapest image that has enough resolution
+(see EditGraph.sampler), so only the visible part of the image is ever
+resampled at the current zoom. Finished tiles are kept in an LRU cache with a
+memory cap, and compose() assembles the visible tiles into one canvas-sized
+RGBA frame, the layout PIL can hand to Tk without another copy.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import imageCore
+
+TILE_SIZE = 256
+MAX_ZOOM = 8.0
+BACKGROUND = (217, 217, 217, 255)  # Default Tk canvas colour, opaque
+
+
+class TileCache:
+    """
+    Thread-safe LRU cache of rendered tiles, bounded by total bytes.
+    """
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes (int): Memory budget for cached tiles.
+        """
+        self.max_bytes = max_bytes
+        self._tiles = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a tile and mark it as recently used.
+        Args:
+            key: The tile key.
+        Returns:
+            The tile (numpy array), or None if it is not cached.
+        """
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def put(self, key, tile):
+        """
+        Store a tile, evicting the least recently used tiles over budget.
+        Args:
+            key: The tile key.
+            tile: The tile (numpy array).
+        """
+        with self._lock:
+            if key in self._tiles:
+                self._bytes -= self._tiles.pop(key).nbytes
+            self._tiles[key] = tile
+            self._bytes += tile.nbytes
+            while self._bytes > self.max_bytes and len(self._tiles) > 1:
+                _, old = self._tiles.popitem(last=False)
+                self._bytes -= old.nbytes
+
+    def clear(self):
+        """
+        Drop every cached tile.
+        """
+        with self._lock:
+            self._tiles.clear()
+            self._bytes = 0
+
+
+class Viewport:
+    """
+    Zoom and pan state for a canvas, plus the tile renderer that fills it.
+    """
+    def __init__(self, width, height, tile_size=TILE_SIZE, cache_bytes=64 * 1024 * 1024, workers=2):
+        """
+        Args:
+            width (int): Canvas width in pixels.
+            height (int): Canvas height in pixels.
+            tile_size (int, optional): Tile edge in display pixels. Defaults to TILE_SIZE.
+            cache_bytes (int, optional): Tile cache budget. Defaults to 64 MB.
+            workers (int, optional): Background render threads. Defaults to 2.
+        """
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.cache = TileCache(cache_bytes)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.sampler = None
+        self.image_size = (0, 0)
+        self.version = 0
+        self.zoom = 1.0
+        self.fit_zoom = 1.0
+        self.origin = (0, 0)
+        self._pending = set()
+        self._futures = set()  # Queued or running render jobs, for shutdown()
+        self._updated = False
+        # Two frame buffers: one is being composed while the other holds the last frame
+        self._frames = [np.empty((height, width, 4), dtype=np.uint8) for _ in range(2)]
+        self._last_frame = None
+        self._last_view = None
+
+    def set_source(self, sampler, image_size, keep_view=False):
+        """
+        Show a new image, or the same image after its edits changed.
+        Args:
+            sampler (callable): Takes a zoom and returns (image, a, (bx, by)) as EditGraph.sampler does.
+            image_size (tuple): (width, height) of the full-resolution image.
+            keep_view (bool, optional): Keep the zoom and pan instead of fitting. Defaults to False.
+        """
+        self.sampler = sampler
+        self.image_size = image_size
+        # A new version makes every cached tile stale without having to walk the cache
+        self.version += 1
+        self.cache.clear()
+        self._pending.clear()
+        w, h = image_size
+        self.fit_zoom = imageCore.fit_scale(w, h, self.width, self.height)
+        if keep_view:
+            self._clamp()
+        else:
+            self.fit()
+
+    def fit(self):
+        """
+        Zoom so the whole image fits the canvas, centered.
+        """
+        self.zoom = self.fit_zoom
+        self._clamp()
+
+    def zoom_at(self, factor, x, y):
+        """
+        Zoom in or out, keeping the image point under (x, y) in place.
+        Args:
+            factor (float): Multiplier for the current zoom.
+            x (int): Canvas x coordinate of the zoom center.
+            y (int): Canvas y coordinate of the zoom center.
+        """
+        new_zoom = max(self.fit_zoom, min(MAX_ZOOM, self.zoom * factor))
+        ox, oy = self.origin
+        ix, iy = (x - ox) / self.zoom, (y - oy) / self.zoom
+        self.zoom = new_zoom
+        self.origin = (int(round(x - ix * new_zoom)), int(round(y - iy * new_zoom)))
+        self._clamp()
+
+    def pan(self, dx, dy):
+        """
+        Move the image by (dx, dy) canvas pixels.
+        """
+        ox, oy = self.origin
+        self.origin = (ox + int(dx), oy + int(dy))
+        self._clamp()
+
+    def displayed_size(self):
+        """
+        Returns:
+            Tuple (width, height) of the whole image at the current zoom.
+        """
+        w, h = self.image_size
+        return max(1, int(w * self.zoom)), max(1, int(h * self.zoom))
+
+    def _clamp(self):
+        """
+        Center the image along axes where it is smaller than the canvas, and keep the
+        canvas covered along axes where it is larger.
+        """
+        disp_w, disp_h = self.displayed_size()
+        ox, oy = self.origin
+        ox = (self.width - disp_w) // 2 if disp_w <= self.width else max(self.width - disp_w, min(0, ox))
+        oy = (self.height - disp_h) // 2 if disp_h <= self.height else max(self.height - disp_h, min(0, oy))
+        self.origin = (ox, oy)
+
+    def visible_tiles(self):
+        """
+        List the tiles that intersect the canvas.
+        Returns:
+            list: (tx, ty) tile indices.
+        """
+        disp_w, disp_h = self.displayed_size()
+        ox, oy = self.origin
+        size = self.tile_size
+        x0, y0 = max(0, -ox), max(0, -oy)
+        x1, y1 = min(disp_w, self.width - ox), min(disp_h, self.height - oy)
+        if x1 <= x0 or y1 <= y0:
+            return []
+        return [(tx, ty) for ty in range(y0 // size, (y1 - 1) // size + 1)
+                for tx in range(x0 // size, (x1 - 1) // size + 1)]
+
+    def render_tile(self, sampler, zoom, tx, ty):
+        """
+        Resample one tile from the sampler's image. Safe to run on a worker thread.
+        Args:
+            sampler (callable): The image sampler the tile belongs to.
+            zoom (float): Zoom the tile is rendered at.
+            tx (int): Tile column.
+            ty (int): Tile row.
+        Returns:
+            The tile (numpy array), cropped to the image edge.
+        """
+        img, a, (bx, by) = sampler(zoom)
+        disp_w, disp_h = (max(1, int(v * zoom)) for v in self.image_size)
+        size = self.tile_size
+        tile_w = min(size, disp_w - tx * size)
+        tile_h = min(size, disp_h - ty * size)
+        # Inverse map from tile pixel centers to sampler pixel indices
+        k = a / zoom
+        matrix = np.array([[k, 0.0, a * (tx * size + 0.5) / zoom + bx - 0.5],
+                           [0.0, k, a * (ty * size + 0.5) / zoom + by - 0.5]], dtype=np.float64)
+        # The sampler never returns more than twice the needed resolution, so bilinear
+        # resampling is enough and costs the same per tile at any zoom
+        return cv2.warpAffine(img, matrix, (tile_w, tile_h), flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def _render_job(self, key, sampler, zoom, tx, ty):
+        """
+        Background job: render a tile and cache it unless the view moved on to a new source.
+        """
+        try:
+            tile = self.render_tile(sampler, zoom, tx, ty)
+            if key[0] == self.version:
+                self.cache.put(key, tile)
+        finally:
+            self._pending.discard(key)
+            self._updated = True
+
+    def compose(self):
+        """
+        Build the canvas-sized frame from cached tiles and queue renders for missing ones.
+        Missing tiles show the previous frame moved to the new zoom and pan, so zooming
+        never flashes empty tiles.
+        Returns:
+            The RGBA frame (numpy array of canvas size). It stays valid until the next-but-one call.
+        """
+        frame = self._frames[1] if self._last_frame is self._frames[0] else self._frames[0]
+        view = (self.version, self.zoom, self.origin)
+        if self._last_frame is not None and self._last_view[0] == self.version:
+            _, last_zoom, (lox, loy) = self._last_view
+            k = self.zoom / last_zoom
+            ox, oy = self.origin
+            matrix = np.array([[k, 0.0, ox - lox * k], [0.0, k, oy - loy * k]], dtype=np.float64)
+            cv2.warpAffine(self._last_frame, matrix, (self.width, self.height), dst=frame,
+                           flags=cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT, borderValue=BACKGROUND)
+        else:
+            frame[:] = BACKGROUND
+        disp_w, disp_h = self.displayed_size()
+        ox, oy = self.origin
+        # Clear everything outside the image so a placeholder never bleeds past its edge
+        frame[:, :max(0, ox)] = BACKGROUND
+        frame[:, max(0, ox + disp_w):] = BACKGROUND
+        frame[:max(0, oy)] = BACKGROUND
+        frame[max(0, oy + disp_h):] = BACKGROUND
+        size = self.tile_size
+        for tx, ty in self.visible_tiles():
+            key = (self.version, self.zoom, tx, ty)
+            tile = self.cache.get(key)
+            if tile is None:
+                if key not in self._pending:
+                    self._pending.add(key)
+                    future = self.executor.submit(self._render_job, key, self.sampler, self.zoom, tx, ty)
+                    self._futures.add(future)
+                    future.add_done_callback(self._futures.discard)
+                continue
+            # Paste the part of the tile that lies on the canvas
+            x, y = ox + tx * size, oy + ty * size
+            th, tw = tile.shape[:2]
+            cx0, cy0 = max(0, x), max(0, y)
+            cx1, cy1 = min(self.width, x + tw), min(self.height, y + th)
+            frame[cy0:cy1, cx0:cx1, :3] = tile[cy0 - y:cy1 - y, cx0 - x:cx1 - x]
+        self._last_frame, self._last_view = frame, view
+        return frame
+
+    def render_now(self):
+        """
+        Render every missing visible tile on the calling thread, then compose the frame.
+        Used where nothing can wait for the background threads, such as benchmarks.
+        Returns:
+            The RGBA frame (numpy array of canvas size).
+        """
+        for tx, ty in self.visible_tiles():
+            key = (self.version, self.zoom, tx, ty)
+            if self.cache.get(key) is None:
+                self.cache.put(key, self.render_tile(self.sampler, self.zoom, tx, ty))
+        return self.compose()
+
+    def pending(self):
+        """
+        Returns:
+            bool: True while tiles for the current view are still rendering.
+        """
+        return bool(self._pending)
+
+    def take_update(self):
+        """
+        Check whether any background render finished since the last call.
+        Returns:
+            bool: True if the frame should be composed again.
+        """
+        updated, self._updated = self._updated, False
+        return updated
+
+    def shutdown(self):
+        """
+        Stop the background render threads, dropping queued tile renders.
+        """
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for future in list(self._futures):
+            future.cancel()
+        self.executor.shutdown(wait=False)